@@ -0,0 +1,64 @@
+"""
+命令分词的性能测试，对比旧的逐字符实现与基于正则的实现
+
+在项目根目录运行::
+
+    python -m benchmark.command_split_benchmark
+"""
+from timeit import repeat
+
+from src.exception.exception import QuotationUnmatchedError
+from src.utils.command_utils import tokenize
+
+
+def legacy_command_split(message: str) -> list[str]:
+    res = []
+    msg = message[1:]
+    temp = ""
+    is_quoted = False
+    quote_char = None
+    for i in msg:
+        if i in ['"', "'"]:
+            if not is_quoted:
+                is_quoted = True
+                quote_char = i
+            elif quote_char == i:
+                is_quoted = False
+                quote_char = None
+            continue
+        if is_quoted:
+            temp += i
+        else:
+            if i.isspace():
+                if len(temp) != 0:
+                    res.append(temp)
+                    temp = ""
+            else:
+                temp += i
+    if is_quoted:
+        raise QuotationUnmatchedError
+    if temp != "":
+        res.append(temp)
+    return res
+
+
+COMMANDS = {
+    "short": "/ping",
+    "common": "/mcsm start survival daemon-1",
+    "quoted": "/permission player add 123456 \"Mcsm.Command\" 'Other.Status'",
+    "long": "/mcsm command survival " + " ".join(f"arg{i}" for i in range(100)),
+    "long_quoted": "/mcsm command survival say " + " ".join(f"\"quoted {i}\"" for i in range(100)),
+}
+
+
+def main(number: int = 20000) -> None:
+    print(f"{'case':<12}{'legacy(us)':>12}{'tokenize(us)':>14}{'speedup':>10}")
+    for name, command in COMMANDS.items():
+        assert legacy_command_split(command) == tokenize(command), name
+        legacy = min(repeat(lambda: legacy_command_split(command), number=number, repeat=5)) / number * 1e6
+        current = min(repeat(lambda: tokenize(command), number=number, repeat=5)) / number * 1e6
+        print(f"{name:<12}{legacy:>12.2f}{current:>14.2f}{legacy / current:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,33 +6,41 @@ from src.base.event_bus import event_bus
 from src.base.logger import logger
 from src.bot.app import app
 from src.bus.event.event import MessageEvent
+from src.command.command_manager import CommandManager
 from src.element.message import Message
-from src.utils.model_utils import ModelUtils
-from src.utils.module_utils import dynamic_import, dynamic_import_all
+from src.module.guild_cache import GuildCache
+from src.module.message_recorder import MessageRecorder
+from src.utils.module_utils import dynamic_import_all, dynamic_import_module
 
 logger.debug("Register command handler...")
 
 dynamic_import_all("src/command", ["command_manager"])
+CommandManager.compile()
 
 logger.debug("Register event filter...")
 
 dynamic_import_all("src/filter")
-dynamic_import("src/module", "block_message")
+dynamic_import_module("src.module.block_message")
 
 logger.debug("Register event inject...")
 
 dynamic_import_all("src/inject")
 
+logger.debug("Register scheduled jobs...")
+
+dynamic_import_module("src.bot.jobs")
+
 logger.debug("Initializing message handler...")
 
 
 @app.register
 async def on_message(_: Account, event: Event):
-    message = Message(event)
+    GuildCache.update_from_event(event)
+    message = Message.from_event(event)
     if event.self_id == message.sender_id:
         return
     if not sys_config.dev:
-        ModelUtils.translate_message_to_model(message).save(True)
+        MessageRecorder.record(message)
     await event_bus.publish(MessageEvent.MESSAGE_CREATED, message, event)
 
 
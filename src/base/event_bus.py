@@ -1,10 +1,12 @@
 from typing import Union
 
 from src.base.logger import logger
-from src.bus.event.event import Event
+from src.bus.event.event import Event, ServerEvent
 from src.bus.event_bus import EventBus
 
 event_bus = EventBus()
+# 需要在数据库关闭(weight=1)之前等待线程池中的回调函数完成
+event_bus.subscribe(ServerEvent.STOPPING, event_bus.shutdown, weight=5)
 
 
 @event_bus.on_global_event_filter()
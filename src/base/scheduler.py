@@ -0,0 +1,9 @@
+from src.base.event_bus import event_bus
+from src.bus.event.event import ServerEvent
+from src.scheduler.scheduler import Scheduler
+
+scheduler = Scheduler()
+
+event_bus.subscribe(ServerEvent.STARTED, scheduler.start)
+# 先停止定时任务，再由其他模块写回剩余数据
+event_bus.subscribe(ServerEvent.STOPPING, scheduler.shutdown, weight=20)
@@ -6,8 +6,8 @@ from satori.client import Account, App, WebsocketsInfo
 from src.base.config import main_config, sys_config
 from src.base.event_bus import event_bus
 from src.base.logger import logger
-from src.bot.thread import update_mcsm_info_thread
 from src.bus.event.event import ServerEvent
+from src.module.outbound_queue import OutboundPriority
 from src.utils.message_helper import MessageHelper
 from src.utils.reply_message import ReplyMessageSender
 
@@ -29,9 +29,9 @@ async def on_startup(account: Account, status: LoginStatus):
             case LoginStatus.CONNECT:
                 await event_bus.publish(ServerEvent.STARTED)
                 MessageHelper.set_account(account)
-                update_mcsm_info_thread.start()
                 if not sys_config.dev:
-                    await MessageHelper.send_message(main_config.group_config.admin_group, f"plugin online")
+                    await MessageHelper.send_message(main_config.group_config.admin_group, f"plugin online",
+                                                     priority=OutboundPriority.HIGH)
                 logger.info("\n  _____  _                               _____                               \n"
                             " |  __ \\(_)                             / ____|                              \n"
                             " | |__) |_   __ _   ___   ___   _ __   | (___    ___  _ __ __   __ ___  _ __ \n"
@@ -0,0 +1,35 @@
+from os import getcwd
+from os.path import join
+
+from src.base.config import main_config
+from src.base.logger import logger
+from src.base.scheduler import scheduler
+from src.bot.plugin import mcsm
+from src.element.permissions import Root
+from src.module.command_cache import CommandResultCache
+from src.scheduler.trigger import IntervalTrigger, OnceTrigger
+from src.utils.file_utils import check_directory
+from src.utils.image_utils import text_to_image
+
+logger.debug("Initializing scheduled jobs...")
+
+image_dir = join(getcwd(), "image")
+permission_image_dir = join(image_dir, "permissions.png")
+
+
+@scheduler.scheduled_job(IntervalTrigger(main_config.mcsm_config.update_time), name="update_mcsm_info")
+async def update_mcsm_info() -> None:
+    logger.trace("Update MCSM info")
+    await mcsm.update_instance_status_async()
+    CommandResultCache.invalidate("/mcsm list")
+
+
+@scheduler.scheduled_job(OnceTrigger(), name="permission_node_image", offload=True)
+def permission_node_image() -> None:
+    logger.debug(f"Generating permission node image")
+    check_directory(image_dir, create_if_not_exist=True)
+    text_to_image(Root.instance, permission_image_dir)
+    logger.debug(f"Permission node image generated")
+
+
+logger.debug("Scheduled jobs initialized")
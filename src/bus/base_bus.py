@@ -3,8 +3,11 @@ from abc import ABC, abstractmethod
 from typing import Any, Type, Union, Callable, Awaitable
 
 from src.base.logger import logger
+from src.bus.bus_metrics import BusMetrics
+from src.bus.callback_executor import CallbackExecutor
 from src.bus.event.event import Event
 from src.bus.event_callback_container import EventCallbackContainer
+from src.bus.handler.event_callback import EventCallback
 
 SubScriberCallback: Type = Callable[..., Union[Any, Awaitable[Any]]]
 
@@ -14,13 +17,29 @@ class BaseBus(ABC):
     EventBus 事件基类，提供最基础的事件订阅和触发服务。
 
     :param max_concurrent_tasks: 异步任务的最大任务数
+    :param max_offload_workers: 执行offload同步函数的最大线程数
     """
 
-    def __init__(self, max_concurrent_tasks: int = 10):
+    def __init__(self, max_concurrent_tasks: int = 10, max_offload_workers: int = 4):
         self._subscribers: dict[str, EventCallbackContainer] = {}
         self._semaphore = Semaphore(max_concurrent_tasks)
+        self._callback_executor = CallbackExecutor(max_offload_workers)
+        self._metrics = BusMetrics()
 
-    def on(self, event: Union[Event, str], *, weight: int = 1) -> Callable:
+    @property
+    def metrics(self) -> BusMetrics:
+        """
+        回调函数的调用统计
+        """
+        return self._metrics
+
+    def shutdown(self) -> None:
+        """
+        关闭执行offload同步回调函数的线程池，并等待正在执行的回调函数完成
+        """
+        self._callback_executor.shutdown()
+
+    def on(self, event: Union[Event, str], *, weight: int = 1, offload: bool = False) -> Callable:
         """
         订阅事件修饰器
 
@@ -37,19 +56,25 @@ class BaseBus(ABC):
             @event_bus.on('message_create')
             async def message_recoder(message, *_, **__):
                 await ...
+            # 会阻塞的同步函数可以在线程池中执行
+            @event_bus.on('message_create', offload=True)
+            def message_saver(message, *_, **__):
+                message.save()
 
         :param event: 要订阅的事件
         :param weight: 事件的选择权重
+        :param offload: 同步函数是否在线程池中执行，适用于会阻塞的函数(如数据库查询)，执行顺序不受影响
         :return: 实际上的修饰器
         """
 
         def decorator(func: SubScriberCallback):
-            self.subscribe(event, func, weight=weight)
+            self.subscribe(event, func, weight=weight, offload=offload)
             logger.debug(f"{func.__name__} has subscribed to {event}, weight={weight}")
 
         return decorator
 
-    def subscribe(self, event: Union[Event, str], callback: SubScriberCallback, *, weight: int = 1) -> None:
+    def subscribe(self, event: Union[Event, str], callback: SubScriberCallback, *, weight: int = 1,
+                  offload: bool = False) -> None:
         """
         订阅事件
 
@@ -69,10 +94,11 @@ class BaseBus(ABC):
         :param event: 要订阅的事件
         :param callback: 事件回调函数
         :param weight: 事件的选择权重
+        :param offload: 同步函数是否在线程池中执行，适用于会阻塞的函数(如数据库查询)，执行顺序不受影响
         """
         if event not in self._subscribers:
             self._subscribers[event] = EventCallbackContainer()
-        self._subscribers[event].add_callback(callback, weight)
+        self._subscribers[event].add_callback(callback, weight, offload)
 
     def unsubscribe(self, event: Union[Event, str], callback: SubScriberCallback) -> None:
         """
@@ -101,13 +127,18 @@ class BaseBus(ABC):
         """
         run(self.publish(event, *args, **kwargs))
 
-    async def _run_with_semaphore(self, coroutine: Callable, *args, **kwargs):
+    async def _run_with_semaphore(self, event: Union[Event, str], coroutine: EventCallback, *args, **kwargs):
         """
-        带有限制器的异步函数执行器
+        带有限制器的异步函数执行器，异常会被记录到日志中
+        :param event: 触发的事件
         :param coroutine: 原异步函数
         """
         async with self._semaphore:
-            return await coroutine(*args, **kwargs)
+            try:
+                return await self._metrics.measure("subscriber", event, coroutine, coroutine(*args, **kwargs))
+            except Exception as e:
+                logger.opt(exception=e).error(f"Subscriber {BusMetrics.callback_name(coroutine)} of {event} "
+                                              f"raised an exception: {e!r}")
 
     @abstractmethod
     async def publish(self, event: Union[Event, str], *args, **kwargs) -> None:
@@ -117,6 +148,8 @@ class BaseBus(ABC):
         执行顺序:
             函数的权重越大，越先被执行，同步函数优先于异步函数执行。
 
+            声明了offload的同步函数在线程池中执行，但仍然会等待其执行完成后再执行下一个函数。
+
             其中，最后的异步事件处理函数权重没有作用，因为会使用asyncio.gather并发执行，执行先后顺序也就失去了意义
 
         示例:
@@ -126,9 +159,10 @@ class BaseBus(ABC):
         """
         if event in self._subscribers:
             for callback in self._subscribers[event].sync_callback:
-                callback(*args, **kwargs)
+                await self._metrics.measure("subscriber", event, callback,
+                                            self._callback_executor.run(callback, *args, **kwargs))
             await gather(
-                *(self._run_with_semaphore(callback, *args, **kwargs) for callback in
+                *(self._run_with_semaphore(event, callback, *args, **kwargs) for callback in
                   self._subscribers[event].async_callback),
                 return_exceptions=True)
 
@@ -0,0 +1,158 @@
+from bisect import bisect_left
+from time import perf_counter
+from typing import Any, Awaitable, Optional, Union
+
+from src.bus.event.event import Event
+from src.bus.handler.event_callback import EventCallback
+
+
+class LatencyHistogram:
+    """
+    固定分桶的耗时直方图
+
+    :param buckets: 各个桶的上界(ms)，超出最后一个上界的记录进入溢出桶
+    """
+
+    default_buckets: tuple[float, ...] = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+    def __init__(self, buckets: tuple[float, ...] = default_buckets) -> None:
+        self.buckets = buckets
+        self.counts: list[int] = [0] * (len(buckets) + 1)
+        self.total: float = 0
+        self.max: float = 0
+
+    def record(self, latency: float) -> None:
+        """
+        :param latency: 耗时(ms)
+        """
+        self.counts[bisect_left(self.buckets, latency)] += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, percent: float) -> float:
+        """
+        估算百分位耗时，返回所在桶的上界，落在溢出桶时返回最大耗时
+
+        :param percent: 百分位，取值0-100
+        :return: 耗时(ms)
+        """
+        count = self.count
+        if count == 0:
+            return 0
+        target = count * percent / 100
+        accumulated = 0
+        for index, bucket_count in enumerate(self.counts):
+            accumulated += bucket_count
+            if accumulated >= target:
+                return min(self.buckets[index], self.max) if index < len(self.buckets) else self.max
+        return self.max
+
+
+class CallbackMetrics:
+    """
+    单个回调函数的调用统计
+    """
+
+    def __init__(self) -> None:
+        self.calls: int = 0
+        self.errors: int = 0
+        self.last_error: Optional[BaseException] = None
+        self.latency = LatencyHistogram()
+
+    def statistics(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_latency": self.latency.total / self.calls if self.calls else 0,
+            "p50_latency": self.latency.percentile(50),
+            "p99_latency": self.latency.percentile(99),
+            "max_latency": self.latency.max,
+            "last_error": self.last_error
+        }
+
+
+class BusMetrics:
+    """
+    事件总线的调用统计
+
+    按 (回调类型, 事件, 回调函数) 记录每个回调函数的调用次数、异常次数和耗时直方图，
+    回调类型为 subscriber、filter、inject 之一，全局过滤器和全局注入器的事件记为 ``*``
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[tuple[str, str, str], CallbackMetrics] = {}
+        self.enabled: bool = True
+
+    @staticmethod
+    def event_name(event: Union[Event, str]) -> str:
+        return event.value if isinstance(event, Event) else str(event)
+
+    @staticmethod
+    def callback_name(callback: EventCallback) -> str:
+        func = callback.callback
+        name = getattr(func, "__qualname__", None) or repr(func)
+        module = getattr(func, "__module__", None)
+        return f"{module}.{name}" if module else name
+
+    async def measure(self, kind: str, event: Optional[Union[Event, str]], callback: EventCallback,
+                      awaitable: Awaitable) -> Any:
+        """
+        等待回调函数执行完成并记录耗时，异常会被记录后重新抛出
+
+        :param kind: 回调类型
+        :param event: 事件，全局回调为None
+        :param callback: 回调函数
+        :param awaitable: 执行回调函数的可等待对象
+        :return: 回调函数的返回值
+        """
+        if not self.enabled:
+            return await awaitable
+        key = (kind, "*" if event is None else self.event_name(event), self.callback_name(callback))
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            metrics = self._metrics[key] = CallbackMetrics()
+        start = perf_counter()
+        try:
+            return await awaitable
+        except Exception as e:
+            metrics.errors += 1
+            metrics.last_error = e
+            raise
+        finally:
+            metrics.calls += 1
+            metrics.latency.record((perf_counter() - start) * 1000)
+
+    def statistics(self, kind: Optional[str] = None, event: Optional[Union[Event, str]] = None
+                   ) -> dict[tuple[str, str, str], dict[str, Any]]:
+        """
+        获取回调函数的调用统计
+
+        :param kind: 只获取指定类型的回调
+        :param event: 只获取指定事件的回调
+        :return: (回调类型, 事件, 回调函数) -> 统计信息
+        """
+        event = None if event is None else self.event_name(event)
+        return {key: metrics.statistics() for key, metrics in self._metrics.items()
+                if (kind is None or key[0] == kind) and (event is None or key[1] == event)}
+
+    def event_statistics(self) -> dict[str, dict[str, Any]]:
+        """
+        按事件汇总调用统计
+
+        :return: 事件 -> 调用次数、异常次数、总耗时(ms)以及单个回调的最大耗时(ms)
+        """
+        result: dict[str, dict[str, Any]] = {}
+        for (_, event, _), metrics in self._metrics.items():
+            summary = result.setdefault(event, {"calls": 0, "errors": 0, "total_latency": 0, "max_latency": 0})
+            summary["calls"] += metrics.calls
+            summary["errors"] += metrics.errors
+            summary["total_latency"] += metrics.latency.total
+            summary["max_latency"] = max(summary["max_latency"], metrics.latency.max)
+        return result
+
+    def reset(self) -> None:
+        self._metrics.clear()
@@ -0,0 +1,54 @@
+from asyncio import get_running_loop
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from src.bus.handler.sync_event_callback import SyncEventCallback
+
+
+class CallbackExecutor:
+    """
+    同步回调函数的执行器
+
+    声明了offload的同步回调函数会在有界线程池中执行，其余的同步回调函数直接在事件循环中执行。
+    调用方会等待回调函数执行完成，因此回调函数仍然按权重顺序依次执行
+
+    :param max_workers: 线程池的最大线程数
+    """
+
+    def __init__(self, max_workers: int = 4) -> None:
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="event_bus")
+        return self._executor
+
+    async def run(self, callback: SyncEventCallback, *args, **kwargs) -> Any:
+        """
+        执行同步回调函数
+
+        :param callback: 同步回调函数
+        :return: 回调函数的返回值
+        """
+        if not callback.offload:
+            return callback(*args, **kwargs)
+        return await self.submit(callback, *args, **kwargs)
+
+    async def submit(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        在线程池中执行函数并等待其返回
+
+        :param func: 要执行的函数
+        :return: 函数的返回值
+        """
+        return await get_running_loop().run_in_executor(self._get_executor(), partial(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        """
+        关闭线程池，等待正在执行的函数完成，未开始的函数会被取消
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -11,8 +11,8 @@ class EventBus(BaseBus, BusFilter, BusInject):
     事件总线
     """
 
-    def __init__(self, max_concurrent_tasks: int = 10):
-        BaseBus.__init__(self, max_concurrent_tasks)
+    def __init__(self, max_concurrent_tasks: int = 10, max_offload_workers: int = 4):
+        BaseBus.__init__(self, max_concurrent_tasks, max_offload_workers)
         BusFilter.__init__(self)
         BusInject.__init__(self)
 
@@ -22,9 +22,9 @@ class EventCallbackContainer:
         self._async_callback.append(callback)
         self._async_callback.sort(key=lambda item: item.weight, reverse=True)
 
-    def add_callback(self, callback: Union[EventCallback, Callable], weight: int = 1) -> None:
+    def add_callback(self, callback: Union[EventCallback, Callable], weight: int = 1, offload: bool = False) -> None:
         if not isinstance(callback, EventCallback):
-            callback = EventCallbackFactory.create(callback, weight)
+            callback = EventCallbackFactory.create(callback, weight, offload)
         if isinstance(callback, AsyncEventCallback):
             self.add_async_callback(callback)
         elif isinstance(callback, SyncEventCallback):
@@ -10,8 +10,13 @@ class EventCallbackFactory:
     创建 EventCallback 实例的工厂
     """
     @staticmethod
-    def create(callback: T, weight: int = 1) -> EventCallback:
+    def create(callback: T, weight: int = 1, offload: bool = False) -> EventCallback:
+        """
+        :param callback: 回调函数
+        :param weight: 回调函数的权重
+        :param offload: 是否在线程池中执行，只对同步函数有效
+        """
         if iscoroutinefunction(callback):
             return AsyncEventCallback(callback, weight)
         else:
-            return SyncEventCallback(callback, weight)
+            return SyncEventCallback(callback, weight, offload)
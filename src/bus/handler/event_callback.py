@@ -4,9 +4,10 @@ T = TypeVar('T', bound=Callable)
 
 
 class EventCallback(Generic[T]):
-    def __init__(self, callback: T, weight: int = 1) -> None:
+    def __init__(self, callback: T, weight: int = 1, offload: bool = False) -> None:
         self._callback = callback
         self._weight = weight
+        self._offload = offload
         self._async = False
 
     @property
@@ -21,6 +22,10 @@ class EventCallback(Generic[T]):
     def callback(self) -> T:
         return self._callback
 
+    @property
+    def offload(self) -> bool:
+        return self._offload
+
     @property
     def is_async(self) -> bool:
         return self._async
@@ -4,8 +4,8 @@ from src.bus.handler.event_callback import EventCallback, T
 
 
 class SyncEventCallback(EventCallback):
-    def __init__(self, callback: T, weight: int = 1):
-        super().__init__(callback, weight)
+    def __init__(self, callback: T, weight: int = 1, offload: bool = False):
+        super().__init__(callback, weight, offload)
         self._async = False
 
     def __call__(self, *args, **kwargs) -> Any:
@@ -0,0 +1,91 @@
+from asyncio import Future, ensure_future, iscoroutinefunction
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from src.bus.callback_executor import CallbackExecutor
+
+_UNRESOLVED = object()
+
+
+class LazyValue:
+    """
+    延迟计算的注入值
+
+    注入时只记录事件参数，值在处理函数第一次获取时才会计算，同一事件的所有处理函数共享计算结果。
+    同步处理函数使用 :py:meth:`get` 获取，异步处理函数使用 ``await`` 获取::
+
+        @event_bus.on(MessageEvent.MESSAGE_CREATED)
+        async def handler(message, user: LazyValue, *_, **__):
+            user = await user
+
+    :param provider: 计算注入值的函数，参数与事件参数相同
+    :param args: 事件的位置参数
+    :param kwargs: 事件的关键字参数
+    :param executor: 执行offload函数的执行器
+    :param offload: 使用 ``await`` 获取时是否在线程池中计算，只对同步函数有效
+    """
+
+    __slots__ = ("_provider", "_args", "_kwargs", "_executor", "_offload", "_value", "_lock", "_future")
+
+    def __init__(self, provider: Callable[..., Any], args: tuple, kwargs: dict, executor: CallbackExecutor,
+                 offload: bool = False) -> None:
+        self._provider = provider
+        self._args = args
+        self._kwargs = kwargs
+        self._executor = executor
+        self._offload = offload
+        self._value: Any = _UNRESOLVED
+        self._lock = Lock()
+        self._future: Optional[Future] = None
+
+    @property
+    def resolved(self) -> bool:
+        """
+        值是否已经计算
+        """
+        return self._value is not _UNRESOLVED
+
+    def _set_value(self, value: Any) -> Any:
+        self._value = value
+        # 计算完成后不再需要事件参数
+        self._args = ()
+        self._kwargs = {}
+        return value
+
+    def get(self) -> Any:
+        """
+        在同步函数中获取注入值，提供函数为异步函数时只能使用 ``await`` 获取
+
+        :return: 注入值
+        """
+        if self._value is not _UNRESOLVED:
+            return self._value
+        if iscoroutinefunction(self._provider):
+            raise TypeError(f"Lazy inject {self._provider.__name__} is async, use await instead")
+        # 处理函数可能在线程池中执行，使用锁保证只计算一次
+        with self._lock:
+            if self._value is _UNRESOLVED:
+                self._set_value(self._provider(*self._args, **self._kwargs))
+        return self._value
+
+    async def _resolve(self) -> Any:
+        if iscoroutinefunction(self._provider):
+            return self._set_value(await self._provider(*self._args, **self._kwargs))
+        if self._offload:
+            return await self._executor.submit(self.get)
+        return self.get()
+
+    async def _get_async(self) -> Any:
+        if self._value is not _UNRESOLVED:
+            return self._value
+        # 多个异步处理函数同时获取时共享同一次计算
+        if self._future is None:
+            self._future = ensure_future(self._resolve())
+        return await self._future
+
+    def __await__(self):
+        return self._get_async().__await__()
+
+    def __repr__(self) -> str:
+        value = repr(self._value) if self.resolved else "<unresolved>"
+        return f"<{self.__class__.__name__}: {self._provider.__name__} {value}>"
@@ -1,10 +1,17 @@
 from abc import ABC, abstractmethod
 from typing import Union
 
+from src.bus.bus_metrics import BusMetrics
+from src.bus.callback_executor import CallbackExecutor
 from src.bus.event.event import Event
 
 
 class BaseModule(ABC):
+    # 由事件总线提供，用于执行同步回调函数
+    _callback_executor: CallbackExecutor
+    # 由事件总线提供，用于记录回调函数的调用统计
+    _metrics: BusMetrics
+
     @abstractmethod
     async def resolve(self, event: Union[Event, str], args, kwargs) -> bool:
         raise NotImplementedError
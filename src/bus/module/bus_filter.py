@@ -31,21 +31,23 @@ class BusFilter(BaseModule):
     async def _apply_filter(self, event: Union[Event, str], args, kwargs) -> bool:
         if event in self._filters:
             for callback in self._filters[event].sync_callback:
-                if callback(*args, **kwargs):
+                if await self._metrics.measure("filter", event, callback,
+                                               self._callback_executor.run(callback, *args, **kwargs)):
                     return True
             for callback in self._filters[event].async_callback:
-                if await callback(*args, **kwargs):
+                if await self._metrics.measure("filter", event, callback, callback(*args, **kwargs)):
                     return True
 
     async def _apply_global_filter(self, event: Union[Event, str], args, kwargs) -> bool:
         for callback in self._global_filters.sync_callback:
-            if callback(event, *args, **kwargs):
+            if await self._metrics.measure("filter", None, callback,
+                                           self._callback_executor.run(callback, event, *args, **kwargs)):
                 return True
         for callback in self._global_filters.async_callback:
-            if await callback(event, *args, **kwargs):
+            if await self._metrics.measure("filter", None, callback, callback(event, *args, **kwargs)):
                 return True
 
-    def on_global_event_filter(self, *, weight: int = 1) -> Callable:
+    def on_global_event_filter(self, *, weight: int = 1, offload: bool = False) -> Callable:
         """
         全局过滤器修饰器
 
@@ -64,16 +66,17 @@ class BusFilter(BaseModule):
                 await ...
 
         :param weight: 事件的选择权重
+        :param offload: 同步函数是否在线程池中执行，适用于会阻塞的函数(如数据库查询)，执行顺序不受影响
         :return: 实际上的修饰器
         """
 
         def decorator(func: FilterCallback):
-            self.add_global_filter(func, weight=weight)
+            self.add_global_filter(func, weight=weight, offload=offload)
             logger.debug(f"Global filter {func.__name__} has been added, weight={weight}")
 
         return decorator
 
-    def add_global_filter(self, callback: FilterCallback, *, weight: int = 1) -> None:
+    def add_global_filter(self, callback: FilterCallback, *, weight: int = 1, offload: bool = False) -> None:
         """
         注册全局过滤器
 
@@ -92,8 +95,9 @@ class BusFilter(BaseModule):
 
         :param callback: 事件回调函数
         :param weight: 事件的选择权重
+        :param offload: 同步函数是否在线程池中执行，适用于会阻塞的函数(如数据库查询)，执行顺序不受影响
         """
-        self._global_filters.add_callback(callback, weight)
+        self._global_filters.add_callback(callback, weight, offload)
 
     def remove_global_filter(self, callback: FilterCallback) -> None:
         """
@@ -109,7 +113,8 @@ class BusFilter(BaseModule):
         """
         self._global_filters.remove_callback(callback)
 
-    def on_event_filter(self, event: Union[Event, str], *, weight: int = 1) -> Optional[Callable]:
+    def on_event_filter(self, event: Union[Event, str], *, weight: int = 1,
+                        offload: bool = False) -> Optional[Callable]:
         """
         事件过滤器修饰器
 
@@ -133,16 +138,18 @@ class BusFilter(BaseModule):
 
         :param event: 要订阅的事件
         :param weight: 事件的选择权重
+        :param offload: 同步函数是否在线程池中执行，适用于会阻塞的函数(如数据库查询)，执行顺序不受影响
         :return: 实际上的修饰器
         """
 
         def decorator(func: FilterCallback):
-            self.add_filter(event, func, weight=weight)
+            self.add_filter(event, func, weight=weight, offload=offload)
             logger.debug(f"Event filter {func.__name__} has been added to event {event}, weight={weight}")
 
         return decorator
 
-    def add_filter(self, event: Union[Event, str], callback: FilterCallback, *, weight: int = 1) -> None:
+    def add_filter(self, event: Union[Event, str], callback: FilterCallback, *, weight: int = 1,
+                   offload: bool = False) -> None:
         """
         注册事件过滤器
 
@@ -162,10 +169,11 @@ class BusFilter(BaseModule):
         :param event: 要订阅的事件
         :param callback: 事件回调函数
         :param weight: 事件的选择权重
+        :param offload: 同步函数是否在线程池中执行，适用于会阻塞的函数(如数据库查询)，执行顺序不受影响
         """
         if event not in self._filters:
             self._filters[event] = EventCallbackContainer()
-        self._filters[event].add_callback(callback, weight)
+        self._filters[event].add_callback(callback, weight, offload)
 
     def remove_filter(self, event: Union[Event, str], callback: FilterCallback) -> None:
         """
@@ -3,9 +3,11 @@ from typing import Any, Awaitable, Callable, Type, Union
 from src.base.logger import logger
 from src.bus.event.event import Event
 from src.bus.event_callback_container import EventCallbackContainer
+from src.bus.lazy_value import LazyValue
 from src.bus.module.base_module import BaseModule
 
 InjectCallback: Type = Callable[..., Union[dict[str, Any], Awaitable[dict[str, Any]]]]
+LazyProvider: Type = Callable[..., Any]
 
 
 class BusInject(BaseModule):
@@ -16,54 +18,130 @@ class BusInject(BaseModule):
     def __init__(self):
         self._injects: dict[str, EventCallbackContainer] = {}
         self._global_injects: EventCallbackContainer = EventCallbackContainer()
+        # 参数名 -> (提供函数, 是否offload)
+        self._lazy_injects: dict[str, dict[str, tuple[LazyProvider, bool]]] = {}
+        self._global_lazy_injects: dict[str, tuple[LazyProvider, bool]] = {}
 
     def clear(self) -> None:
         self._injects.clear()
         self._global_injects.clear()
+        self._lazy_injects.clear()
+        self._global_lazy_injects.clear()
 
     async def resolve(self, event: Union[Event, str], args, kwargs) -> bool:
         await self._apply_global_injects(args, kwargs)
         await self._apply_event_injects(event, args, kwargs)
+        self._apply_lazy_injects(event, args, kwargs)
         return True
 
+    def _apply_lazy_injects(self, event: Union[Event, str], args, kwargs):
+        providers = self._global_lazy_injects
+        if event in self._lazy_injects:
+            providers = {**providers, **self._lazy_injects[event]}
+        if not providers:
+            return
+        # 提供函数获得的是普通注入完成后的参数
+        snapshot = kwargs.copy()
+        for name, (provider, offload) in providers.items():
+            kwargs[name] = LazyValue(provider, args, snapshot, self._callback_executor, offload)
+
     async def _apply_event_injects(self, event: Union[Event, str], args, kwargs):
         if event in self._injects:
             for callback in self._injects[event].sync_callback:
-                kwargs.update(callback(*args, **kwargs))
+                kwargs.update(await self._metrics.measure("inject", event, callback,
+                                                          self._callback_executor.run(callback, *args, **kwargs)))
             for callback in self._injects[event].async_callback:
-                kwargs.update(await callback(*args, **kwargs))
+                kwargs.update(await self._metrics.measure("inject", event, callback, callback(*args, **kwargs)))
 
     async def _apply_global_injects(self, args, kwargs):
         for callback in self._global_injects.sync_callback:
-            kwargs.update(callback(*args, **kwargs))
+            kwargs.update(await self._metrics.measure("inject", None, callback,
+                                                      self._callback_executor.run(callback, *args, **kwargs)))
         for callback in self._global_injects.async_callback:
-            kwargs.update(await callback(*args, **kwargs))
+            kwargs.update(await self._metrics.measure("inject", None, callback, callback(*args, **kwargs)))
 
-    def on_global_inject(self, *, weight: int = 1) -> Callable:
+    def on_global_inject(self, *, weight: int = 1, offload: bool = False) -> Callable:
         def decorator(func: InjectCallback):
-            self.add_global_inject(func, weight=weight)
+            self.add_global_inject(func, weight=weight, offload=offload)
             logger.debug(f"Global inject {func.__name__} has been added, weight={weight}")
 
         return decorator
 
-    def add_global_inject(self, callback: InjectCallback, *, weight: int = 1) -> None:
-        self._global_injects.add_callback(callback, weight)
+    def add_global_inject(self, callback: InjectCallback, *, weight: int = 1, offload: bool = False) -> None:
+        self._global_injects.add_callback(callback, weight, offload)
 
     def remove_global_inject(self, callback: InjectCallback) -> None:
         self._global_injects.remove_callback(callback)
 
-    def on_event_inject(self, event: Union[Event, str], *, weight: int = 1) -> Callable:
+    def on_event_inject(self, event: Union[Event, str], *, weight: int = 1, offload: bool = False) -> Callable:
         def decorator(func: InjectCallback):
-            self.add_inject(event, func, weight=weight)
+            self.add_inject(event, func, weight=weight, offload=offload)
             logger.debug(f"Event inject {func.__name__} has been added, weight={weight}")
 
         return decorator
 
-    def add_inject(self, event: Union[Event, str], callback: InjectCallback, *, weight: int = 1) -> None:
+    def add_inject(self, event: Union[Event, str], callback: InjectCallback, *, weight: int = 1,
+                   offload: bool = False) -> None:
         if event not in self._injects:
             self._injects[event] = EventCallbackContainer()
-        self._injects[event].add_callback(callback, weight)
+        self._injects[event].add_callback(callback, weight, offload)
 
     def remove_inject(self, event: Union[Event, str], callback: InjectCallback) -> None:
         if event in self._injects:
             self._injects[event].remove_callback(callback)
+
+    def on_global_lazy_inject(self, name: str, *, offload: bool = False) -> Callable:
+        """
+        注册全局延迟注入的修饰器，被修饰的函数直接返回注入值
+
+        :param name: 注入的参数名
+        :param offload: 使用 ``await`` 获取时同步函数是否在线程池中计算
+        :return: 实际上的修饰器
+        """
+
+        def decorator(func: LazyProvider):
+            self.add_global_lazy_inject(name, func, offload=offload)
+            logger.debug(f"Global lazy inject {func.__name__} has been added, name={name}")
+            return func
+
+        return decorator
+
+    def add_global_lazy_inject(self, name: str, provider: LazyProvider, *, offload: bool = False) -> None:
+        self._global_lazy_injects[name] = (provider, offload)
+
+    def remove_global_lazy_inject(self, name: str) -> None:
+        self._global_lazy_injects.pop(name, None)
+
+    def on_event_lazy_inject(self, event: Union[Event, str], name: str, *, offload: bool = False) -> Callable:
+        """
+        注册事件延迟注入的修饰器
+
+        被修饰的函数参数与事件参数相同，直接返回注入值。处理函数收到的是 :py:class:`LazyValue`，
+        只有在处理函数获取时才会调用被修饰的函数，同一事件中只会调用一次::
+
+            @event_bus.on_event_lazy_inject(MessageEvent.MESSAGE_CREATED, "user")
+            def inject_user(message, *_, **__) -> User:
+                return User.get_or_create(message)
+
+        :param event: 要注入的事件
+        :param name: 注入的参数名
+        :param offload: 使用 ``await`` 获取时同步函数是否在线程池中计算
+        :return: 实际上的修饰器
+        """
+
+        def decorator(func: LazyProvider):
+            self.add_lazy_inject(event, name, func, offload=offload)
+            logger.debug(f"Event lazy inject {func.__name__} has been added, name={name}")
+            return func
+
+        return decorator
+
+    def add_lazy_inject(self, event: Union[Event, str], name: str, provider: LazyProvider, *,
+                        offload: bool = False) -> None:
+        if event not in self._lazy_injects:
+            self._lazy_injects[event] = {}
+        self._lazy_injects[event][name] = (provider, offload)
+
+    def remove_lazy_inject(self, event: Union[Event, str], name: str) -> None:
+        if event in self._lazy_injects:
+            self._lazy_injects[event].pop(name, None)
@@ -5,6 +5,7 @@ from src.element.message import Message
 from src.element.permissions import BlockWords
 from src.element.result import Result
 from src.module.block_message import BlockMessage
+from src.module.command_cache import tokens_key
 
 
 def get_group_id(group_id: str) -> Optional[str]:
@@ -29,7 +30,9 @@ async def blockword_command(_: Message, __: list[str]) -> Optional[Result]:
 @CommandManager.register_command("/blockword list",
                                  command_docs="列出所有屏蔽词",
                                  alia_list=["/bw l"],
-                                 command_require_permission=BlockWords.List)
+                                 command_require_permission=BlockWords.List,
+                                 cache_ttl=60,
+                                 cache_key=tokens_key)
 async def blockword_list_command(_: Message, __: list[str]) -> Optional[Result]:
     res: list[BlockWord] = BlockWord.select().order_by(BlockWord.group_id).execute()
     data = {}
@@ -44,7 +47,8 @@ async def blockword_list_command(_: Message, __: list[str]) -> Optional[Result]:
 @CommandManager.register_command("/blockword add",
                                  command_docs="添加屏蔽词",
                                  alia_list=["/bw a"],
-                                 command_require_permission=BlockWords.Add)
+                                 command_require_permission=BlockWords.Add,
+                                 invalidates=["/blockword list"])
 async def blockword_add_command(message: Message, command_list: list[str]) -> Optional[Result]:
     if len(command_list) < 3:
         return None
@@ -59,14 +63,15 @@ async def blockword_add_command(message: Message, command_list: list[str]) -> Op
              } for word in words]
     for i in range(0, len(data), 100):
         BlockWord.insert_many(data[i:i + 100]).execute()
-    BlockMessage.update_block_words()
+    BlockMessage.add_block_words(group_id, words)
     return Result.of_success(f"为群「{group_id}」添加屏蔽词「{', '.join(words)}」")
 
 
 @CommandManager.register_command("/blockword del",
                                  command_docs="删除屏蔽词",
                                  alia_list=["/bw d"],
-                                 command_require_permission=BlockWords.Del)
+                                 command_require_permission=BlockWords.Del,
+                                 invalidates=["/blockword list"])
 async def blockword_del_command(message: Message, command_list: list[str]) -> Optional[Result]:
     if len(command_list) < 3:
         return None
@@ -77,14 +82,15 @@ async def blockword_del_command(message: Message, command_list: list[str]) -> Op
     else:
         words = command_list[3:]
     BlockWord.delete().where((BlockWord.group_id == group_id) & (BlockWord.block_word << words)).execute()
-    BlockMessage.update_block_words()
+    BlockMessage.remove_block_words(group_id, words)
     return Result.of_success(f"为群「{group_id}」删除屏蔽词「{', '.join(words)}」")
 
 
 @CommandManager.register_command("/blockword reload",
                                  command_docs="重载屏蔽词",
                                  alia_list=["/bw r"],
-                                 command_require_permission=BlockWords.Reload)
+                                 command_require_permission=BlockWords.Reload,
+                                 invalidates=["/blockword list"])
 async def blockword_del_command(_: Message, __: list[str]) -> Optional[Result]:
     BlockMessage.update_block_words()
     return Result.of_success(f"重载屏蔽词成功")
@@ -1,16 +1,20 @@
 from itertools import zip_longest
-from typing import Callable, Dict, Optional, Union
+from math import ceil
+from typing import Callable, Dict, Optional, Tuple, Union
 
 from satori import Event, Image
 
 from src.base.event_bus import event_bus
 from src.base.logger import logger
 from src.bus.event.event import MessageEvent
-from src.element.command import Command
+from src.element.command import Command, CommandCacheKey
 from src.element.message import Message
+from src.element.rate_limit import Limit, RateLimit
 from src.element.result import Result
 from src.element.tree import Tree
 from src.exception.exception import CustomError
+from src.module.command_cache import CommandResultCache
+from src.module.command_rate_limiter import CommandRateLimiter
 from src.type.types import CommandHandler
 from src.utils.command_utils import command_split
 from src.utils.image_utils import text_to_image
@@ -18,9 +22,50 @@ from src.utils.message_helper import MessageHelper
 from src.utils.permission_helper import PermissionHelper
 
 
+_MISSING = object()
+
+
 class CommandManager:
     _command_tree = Tree("/")
     _command_store: Dict[Tree, Command] = {}
+    # 命令前缀(包括别名的所有组合) -> 命令，None表示该前缀对应的节点没有注册命令
+    _dispatch_table: Optional[Dict[Tuple[str, ...], Optional[Command]]] = None
+
+    @classmethod
+    def compile(cls) -> None:
+        """
+        根据命令树构建分发表，每个前缀的各级都可以使用节点名或别名，同级节点名优先于别名
+        """
+        table: Dict[Tuple[str, ...], Optional[Command]] = {}
+        stack: list[tuple[Tuple[str, ...], Tree]] = [((), cls._command_tree)]
+        while stack:
+            prefix, node = stack.pop()
+            for name, child in node.named_children().items():
+                key = (*prefix, name)
+                table[key] = cls._command_store.get(child)
+                stack.append((key, child))
+        cls._dispatch_table = table
+        logger.debug(f"Command dispatch table compiled, {len(table)} prefixes")
+
+    @classmethod
+    def match_command(cls, command: list[str]) -> Optional[Command]:
+        """
+        最长前缀匹配，返回匹配到的最深节点上的命令
+        Args:
+            command: 分割后的命令
+        Returns:
+            匹配到的命令，最深节点没有注册命令或没有匹配到任何节点时返回None
+        """
+        if cls._dispatch_table is None:
+            cls.compile()
+        table = cls._dispatch_table
+        result: Optional[Command] = None
+        for i in range(1, len(command) + 1):
+            matched = table.get(tuple(command[:i]), _MISSING)
+            if matched is _MISSING:
+                break
+            result = matched
+        return result
 
     @classmethod
     def register_command_node(cls, command: str, alias_list: list[str]) -> Tree:
@@ -29,17 +74,11 @@ class CommandManager:
         alias_lists: list[list[str]] = [command_split(alias) for alias in alias_list]
 
         for part, *alias in zip_longest(command_parts, *alias_lists):
-            child_found = False
-            for child in current_node.children:
-                if child.root == part:
-                    current_node = child
-                    child_found = True
-                    break
-
-            if not child_found:
-                new_node = Tree(part)
-                current_node.insert(new_node)
-                current_node = new_node
+            child = current_node.get_child(part, include_alias=False)
+            if child is None:
+                child = Tree(part)
+                current_node.insert(child)
+            current_node = child
             if alias:
                 current_node.add_alias(alias)
 
@@ -52,21 +91,28 @@ class CommandManager:
                          command_docs: Optional[str] = None,
                          command_usage: Optional[str] = None,
                          *,
-                         alia_list: Optional[list[str]] = None) -> Optional[Callable]:
+                         alia_list: Optional[list[str]] = None,
+                         rate_limit: Optional[RateLimit] = None,
+                         cache_ttl: float = 0,
+                         cache_key: Optional[CommandCacheKey] = None,
+                         invalidates: Optional[list[str]] = None) -> Optional[Callable]:
         if alia_list is None:
             alia_list = []
         if isinstance(command, Command):
             command_node = cls.register_command_node(command.command, alia_list)
             cls._command_store[command_node] = command
+            cls._dispatch_table = None
             logger.debug(f"Register command {command.command}, register name: {command.name}")
             return None
 
         def decorator(func: CommandHandler):
             command_instance = Command(command, func, command_name,
                                        command_require_permission, command_docs,
-                                       command_usage)
+                                       command_usage, rate_limit,
+                                       cache_ttl, cache_key, invalidates)
             node = cls.register_command_node(command, alia_list)
             cls._command_store[node] = command_instance
+            cls._dispatch_table = None
             logger.debug(f"Register command {command}, register name: {command_instance.name}")
 
         return decorator
@@ -95,14 +141,22 @@ class CommandManager:
     @classmethod
     async def parse_command(cls, message: Message, command: list[str]) -> Optional[Result]:
         try:
-            command_node = cls._command_tree.get_node(command, match_most=True)
-            if command_node == cls._command_tree or command_node not in cls._command_store:
+            command_instance = cls.match_command(command)
+            if command_instance is None:
                 return Result.of_failure(f"未知命令 {message.message}")
-            command_instance = cls._command_store[command_node]
             if (command_instance.permission and
                     not await PermissionHelper.require_permission(message, command_instance.permission)):
                 return None
-            result = await command_instance.handler(message, command)
+            # 只有通过权限检查的调用才会消耗令牌
+            if (wait := CommandRateLimiter.check(message, command_instance)) is not None:
+                if CommandRateLimiter.should_notify(message, command_instance, wait):
+                    return Result.of_failure(f"操作过于频繁，请{ceil(wait)}秒后再试")
+                return None
+            try:
+                result = await CommandResultCache.run(command_instance, message, command)
+            finally:
+                if command_instance.invalidates:
+                    CommandResultCache.invalidate(*command_instance.invalidates)
             if result is None:
                 return Result.of_failure(f"命令参数错误：{command_instance.usage}")
             return result
@@ -115,10 +169,11 @@ class CommandManager:
         require_command = command[1:]
         if len(require_command) == 0:
             return None
-        command_node = cls._command_tree.get_node(require_command)
-        if command_node is None:
+        if cls._dispatch_table is None:
+            cls.compile()
+        command_instance = cls._dispatch_table.get(tuple(require_command))
+        if command_instance is None:
             return Result.of_failure(f"无法找到该命令{require_command}")
-        command_instance = cls._command_store[command_node]
         return Result.of_success(f"命令：{command_instance.command}\n"
                                  f"注册名：{command_instance.name}\n"
                                  f"使用：{command_instance.usage}\n"
@@ -136,7 +191,8 @@ class CommandManager:
 help_command = Command("/help", CommandManager.help_command, command_usage="/help (command)")
 CommandManager.register_command(help_command)
 
-command_list = Command("/command list", CommandManager.command_list)
+command_list = Command("/command list", CommandManager.command_list,
+                       command_rate_limit=RateLimit(user=Limit.per_minute(2), command=Limit.per_minute(6)))
 CommandManager.register_command(command_list)
 
 # event_bus.subscribe(MessageEvent.MESSAGE_CREATED, CommandManager.message_listener)
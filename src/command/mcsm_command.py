@@ -4,8 +4,11 @@ from src.bot.plugin import mcsm
 from src.command.command_manager import CommandManager
 from src.element.message import Message
 from src.element.permissions import Mcsm
+from src.element.rate_limit import Limit, RateLimit
 from src.element.result import Result
+from src.module.command_cache import tokens_key
 from src.type.types import ReplyType
+from src.utils.command_utils import CommandTokens
 from src.utils.message_helper import MessageHelper
 from src.utils.permission_helper import PermissionHelper
 from src.utils.reply_message import ReplyMessageSender
@@ -31,13 +34,16 @@ async def mcsm_help(_: Message, __: list[str]) -> Optional[Result]:
                                  command_require_permission=Mcsm.List,
                                  command_docs="列出某一守护进程的所有实例名称",
                                  command_usage="/mcsm list [ServerName]",
-                                 alia_list=["/mcsm l"])
+                                 alia_list=["/mcsm l"],
+                                 rate_limit=RateLimit(user=Limit.per_minute(4)),
+                                 cache_ttl=30,
+                                 cache_key=tokens_key)
 async def mcsm_list(_: Message, command: list[str]) -> Optional[Result]:
     if (command_length := len(command)) > 3:
         return None
     if command_length == 2:
-        return mcsm.list_instance()
-    return mcsm.list_instance(command[2])
+        return await mcsm.list_instance()
+    return await mcsm.list_instance(command[2])
 
 
 @CommandManager.register_command("/mcsm check",
@@ -49,15 +55,16 @@ async def mcsm_check(_: Message, command: list[str]) -> Optional[Result]:
     if (command_length := len(command)) < 3 or command_length > 4:
         return None
     if command_length == 3:
-        return mcsm.check_instance_status(command[2])
-    return mcsm.check_instance_status(command[2], command[3])
+        return await mcsm.check_instance_status(command[2])
+    return await mcsm.check_instance_status(command[2], command[3])
 
 
 @CommandManager.register_command("/mcsm rename",
                                  command_require_permission=Mcsm.Rename,
                                  command_docs="重命名某一守护进程或实例",
                                  command_usage="/mcsm rename (OriginalName) (NewName)",
-                                 alia_list=["/mcsm r"])
+                                 alia_list=["/mcsm r"],
+                                 invalidates=["/mcsm list"])
 async def mcsm_rename(_: Message, command: list[str]) -> Optional[Result]:
     if len(command) != 4:
         return None
@@ -68,16 +75,17 @@ async def mcsm_rename(_: Message, command: list[str]) -> Optional[Result]:
                                  command_require_permission=Mcsm.Update.Common,
                                  command_docs="（强制）更新实例信息",
                                  command_usage="/mcsm update [true]",
-                                 alia_list=["/mcsm u"])
+                                 alia_list=["/mcsm u"],
+                                 invalidates=["/mcsm list"])
 async def mcsm_update(message: Message, command: list[str]) -> Optional[Result]:
     if (command_length := len(command)) > 3:
         return None
     if command_length == 2:
-        mcsm.get_mcsm_info()
+        await mcsm.get_mcsm_info_async()
         return Result.of_success("操作成功")
     if await PermissionHelper.require_permission(message, Mcsm.Update.Force) and command[2].lower() == "true":
         msg = f"确认强制更新mcsm信息\n这将会清空所有自定义设置！\n是否继续(是/否)？"
-        target = (await MessageHelper.send_message(message.group_id, msg))[0]
+        target = (await MessageHelper.send_message(message.group_id, msg, coalesce=False))[0]
         result = await ReplyMessageSender.wait_reply_async(message, 60)
         match result:
             case ReplyType.REJECT:
@@ -86,7 +94,7 @@ async def mcsm_update(message: Message, command: list[str]) -> Optional[Result]:
                                                        message.sender_id)
                 return Result.of_success()
             case ReplyType.ACCEPT:
-                mcsm.get_mcsm_info(True)
+                await mcsm.get_mcsm_info_async(True)
                 await MessageHelper.send_quote_message(message.group_id, target.id,
                                                        "操作成功",
                                                        message.sender_id)
@@ -105,59 +113,63 @@ async def mcsm_update(message: Message, command: list[str]) -> Optional[Result]:
 async def mcsm_status(_: Message, command: list[str]) -> Optional[Result]:
     if len(command) != 2:
         return None
-    return mcsm.status()
+    return await mcsm.status()
 
 
 @CommandManager.register_command("/mcsm stop",
                                  command_require_permission=Mcsm.Stop,
                                  command_docs="停止某一实例",
                                  command_usage="/mcsm stop (InstanceName) [ServerName]",
-                                 alia_list=["/mcsm s"])
+                                 alia_list=["/mcsm s"],
+                                 invalidates=["/mcsm list"])
 async def mcsm_stop(_: Message, command: list[str]) -> Optional[Result]:
     if (command_length := len(command)) < 3 or command_length > 4:
         return None
     if command_length == 3:
-        return mcsm.stop(command[2])
-    return mcsm.stop(command[2], command[3])
+        return await mcsm.stop(command[2])
+    return await mcsm.stop(command[2], command[3])
 
 
 @CommandManager.register_command("/mcsm kill",
                                  command_require_permission=Mcsm.Kill,
                                  command_docs="强行停止某一实例",
                                  command_usage="/mcsm kill (InstanceName) [ServerName]",
-                                 alia_list=["/mcsm k"])
+                                 alia_list=["/mcsm k"],
+                                 invalidates=["/mcsm list"])
 async def mcsm_kill(_: Message, command: list[str]) -> Optional[Result]:
     if (command_length := len(command)) < 3 or command_length > 4:
         return None
     if command_length == 3:
-        return mcsm.stop(command[2], force_kill=True)
-    return mcsm.stop(command[2], command[3], True)
+        return await mcsm.stop(command[2], force_kill=True)
+    return await mcsm.stop(command[2], command[3], True)
 
 
 @CommandManager.register_command("/mcsm start",
                                  command_require_permission=Mcsm.Start,
                                  command_docs="开启某一实例",
                                  command_usage="/mcsm start (InstanceName) [ServerName]",
-                                 alia_list=["/mcsm S"])
+                                 alia_list=["/mcsm S"],
+                                 invalidates=["/mcsm list"])
 async def mcsm_start(_: Message, command: list[str]) -> Optional[Result]:
     if (command_length := len(command)) < 3 or command_length > 4:
         return None
     if command_length == 3:
-        return mcsm.start(command[2])
-    return mcsm.start(command[2], command[3])
+        return await mcsm.start(command[2])
+    return await mcsm.start(command[2], command[3])
 
 
 @CommandManager.register_command("/mcsm restart",
                                  command_require_permission=Mcsm.Restart,
                                  command_docs="重启某一实例",
                                  command_usage="/mcsm restart (InstanceName) [ServerName]",
-                                 alia_list=["/mcsm R"])
+                                 alia_list=["/mcsm R"],
+                                 invalidates=["/mcsm list"])
 async def mcsm_restart(_: Message, command: list[str]) -> Optional[Result]:
     if (command_length := len(command)) < 3 or command_length > 4:
         return None
     if command_length == 3:
-        return mcsm.restart(command[2])
-    return mcsm.restart(command[2], command[3])
+        return await mcsm.restart(command[2])
+    return await mcsm.restart(command[2], command[3])
 
 
 @CommandManager.register_command("/mcsm command",
@@ -165,9 +177,9 @@ async def mcsm_restart(_: Message, command: list[str]) -> Optional[Result]:
                                  command_docs="向某一实例执行命令",
                                  command_usage="/mcsm command (InstanceName) (Command)",
                                  alia_list=["/mcsm C"])
-async def mcsm_command(_: Message, command: list[str]) -> Optional[Result]:
+async def mcsm_command(_: Message, command: CommandTokens) -> Optional[Result]:
     if len(command) < 4:
         return None
-    command_list = command[3:]
-    res = await mcsm.run_command(command[2], " ".join(command_list))
+    # 使用原始文本，保留命令中的引号(如tellraw的json参数)
+    res = await mcsm.run_command(command[2], command.rest(3))
     return Result.of_success(res)
@@ -5,12 +5,21 @@ from re import Pattern, compile
 from typing import Optional
 
 from src.base.config import main_config, sys_config
+from src.base.event_bus import event_bus
+from src.base.scheduler import scheduler
 from src.command.command_manager import CommandManager
 from src.database.server_model import Whitelist as WhitelistModel
 from src.element.message import Message
 from src.element.permissions import Other, Whitelist
 from src.element.result import Result
+from src.module.command_cache import CommandResultCache
+from src.module.guild_cache import GuildCache
+from src.module.loop_monitor import LoopMonitor
+from src.module.message_recorder import MessageRecorder
+from src.module.outbound_queue import OutboundPriority, OutboundQueue
+from src.module.user_cache import UserCache
 from src.utils.message_helper import MessageHelper
+from src.utils.reply_message import ReplyMessageSender
 
 pattern: Pattern = compile(r"(\[回复\([\s\S]+\)])?@[\s\S]+\(\d+\)( )?")
 wordcloud_path = join(getcwd(), "image/wordcloud.png")
@@ -21,7 +30,8 @@ wordcloud_path = join(getcwd(), "image/wordcloud.png")
                                  command_docs="重启插件")
 async def bot_restart(_: Message, __: list[str]) -> None:
     if not sys_config.dev:
-        await MessageHelper.send_message(main_config.group_config.admin_group, f"plugin offline")
+        await MessageHelper.send_message(main_config.group_config.admin_group, f"plugin offline",
+                                         priority=OutboundPriority.HIGH)
     exit(0)
 
 
@@ -29,10 +39,63 @@ async def bot_restart(_: Message, __: list[str]) -> None:
                                  command_require_permission=Other.Status,
                                  command_docs="插件状态")
 async def bot_status(_: Message, __: list[str]) -> Optional[Result]:
+    record = MessageRecorder.statistics()
+    user_cache = UserCache.statistics()
+    guild_cache = GuildCache.statistics()
+    outbound = OutboundQueue.statistics()
+    command_cache = CommandResultCache.statistics()
+    jobs = "\n".join(f"  {name}: 运行{job['run_count']}次, 失败{job['error_count']}次, 跳过{job['skipped_count']}次, "
+                     f"平均{job['avg_duration']:.2f}ms, 最大{job['max_duration']:.2f}ms"
+                     for name, job in scheduler.statistics().items())
     return Result.of_success(f"插件状态:\n"
                              f"运行状态: 正常\n"
                              f"Mcsm模块: 正常\n"
-                             f"MySQL状态: 正常")
+                             f"MySQL状态: 正常\n"
+                             f"消息写入队列: {record['queue_depth']}条待写入, 已写入{record['flushed_rows']}条, "
+                             f"丢弃{record['dropped_rows']}条\n"
+                             f"消息写入耗时: 平均{record['avg_flush_latency']:.2f}ms, "
+                             f"最大{record['max_flush_latency']:.2f}ms\n"
+                             f"用户缓存: {user_cache['size']}个, 命中率{user_cache['hit_rate']:.2%}, "
+                             f"待写回{user_cache['dirty']}个\n"
+                             f"群组缓存: {guild_cache['guilds']}个群, {guild_cache['channels']}个频道, "
+                             f"{guild_cache['members']}个成员\n"
+                             f"等待回复: {ReplyMessageSender.pending_count()}个\n"
+                             f"发送队列: {outbound['queue_depth']}条待发送, 已发送{outbound['sent_items']}条"
+                             f"(合并为{outbound['sent_messages']}条), 失败{outbound['failed']}次, "
+                             f"排队平均{outbound['avg_wait']:.0f}ms, 最大{outbound['max_wait']:.0f}ms\n"
+                             f"命令缓存: {command_cache['entries']}条, 命中{command_cache['hits']}次, "
+                             f"未命中{command_cache['misses']}次, 合并{command_cache['coalesced']}次\n"
+                             f"定时任务:\n{jobs}")
+
+
+@CommandManager.register_command("/bot metrics",
+                                 command_require_permission=Other.Status,
+                                 command_docs="事件总线调用统计")
+async def bot_metrics(_: Message, __: list[str]) -> Optional[Result]:
+    events = "\n".join(f"  {event}: 调用{summary['calls']}次, 异常{summary['errors']}次, "
+                       f"总耗时{summary['total_latency']:.2f}ms"
+                       for event, summary in event_bus.metrics.event_statistics().items())
+    callbacks = sorted(event_bus.metrics.statistics().items(),
+                       key=lambda item: item[1]["avg_latency"] * item[1]["calls"], reverse=True)
+    slowest = "\n".join(f"  [{kind}]{event} {name}: 调用{stat['calls']}次, 异常{stat['errors']}次, "
+                        f"平均{stat['avg_latency']:.2f}ms, P99 {stat['p99_latency']:.2f}ms, "
+                        f"最大{stat['max_latency']:.2f}ms"
+                        for (kind, event, name), stat in callbacks[:10])
+    return Result.of_success(f"事件统计:\n{events or '  无'}\n"
+                             f"耗时最多的回调:\n{slowest or '  无'}")
+
+
+@CommandManager.register_command("/bot lag",
+                                 command_require_permission=Other.Status,
+                                 command_docs="事件循环延迟")
+async def bot_lag(_: Message, __: list[str]) -> Optional[Result]:
+    lag = LoopMonitor.statistics()
+    offenders = "\n".join(f"  {location}: {record['count']}次, 平均{record['avg_lag']:.0f}ms, "
+                          f"最大{record['max_lag']:.0f}ms"
+                          for location, record in LoopMonitor.worst_offenders())
+    return Result.of_success(f"事件循环延迟: 平均{lag['avg_lag']:.2f}ms, P99 {lag['p99_lag']:.2f}ms, "
+                             f"最大{lag['max_lag']:.2f}ms, 阻塞{lag['blocked_count']}次\n"
+                             f"阻塞位置:\n{offenders or '  无'}")
 
 
 @CommandManager.register_command("/whitelist add",
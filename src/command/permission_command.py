@@ -2,11 +2,12 @@ from typing import Dict, Optional
 
 from satori import Image
 
-from src.bot.thread import permission_image_dir
+from src.bot.jobs import permission_image_dir
 from src.command.command_manager import CommandManager
 from src.element.message import Message
 from src.element.permissions import Permission
 from src.element.result import Result
+from src.module.command_cache import tokens_key
 from src.type.types import ReplyType
 from src.utils.message_helper import MessageHelper
 from src.utils.permission_helper import PermissionHelper
@@ -99,7 +100,7 @@ async def permission_player_clone(message: Message, command: list[str]) -> Optio
     if clone_src is None or clone_dest is None:
         return None
     msg = f"确认克隆「{clone_src}」用户的`所有权限`到「{clone_dest}」(是/否)？"
-    target = (await MessageHelper.send_message(message.group_id, msg))[0]
+    target = (await MessageHelper.send_message(message.group_id, msg, coalesce=False))[0]
     result = await ReplyMessageSender.wait_reply_async(message, 60)
     match result:
         case ReplyType.REJECT:
@@ -196,7 +197,7 @@ async def permission_player_del(message: Message, command: list[str]) -> Optiona
     if user_id is None:
         return None
     msg = f"是否删除「{user_id}」用户的权限信息(是/否)？"
-    target = (await MessageHelper.send_message(message.group_id, msg))[0]
+    target = (await MessageHelper.send_message(message.group_id, msg, coalesce=False))[0]
     result = await ReplyMessageSender.wait_reply_async(message, 60)
     match result:
         case ReplyType.REJECT:
@@ -275,7 +276,8 @@ async def permission_player_create(_: Message, command: list[str]) -> Optional[R
                                  command_require_permission=Permission.Group.Add,
                                  command_docs="向某个权限组中添加某条权限",
                                  command_usage="/permission group add (groupName) (permission)",
-                                 alia_list=["/ps g a"])
+                                 alia_list=["/ps g a"],
+                                 invalidates=["/permission group list"])
 async def permission_group_add(_: Message, command: list[str]) -> Optional[Result]:
     if len(command) >= 6:
         return None
@@ -288,7 +290,8 @@ async def permission_group_add(_: Message, command: list[str]) -> Optional[Resul
                                  command_require_permission=Permission.Group.Remove,
                                  command_docs="从某个权限组中移除某条权限",
                                  command_usage="/permission group remove (groupName) (permission)",
-                                 alia_list=["/ps g r"])
+                                 alia_list=["/ps g r"],
+                                 invalidates=["/permission group list"])
 async def permission_group_remove(_: Message, command: list[str]) -> Optional[Result]:
     if len(command) >= 6:
         return None
@@ -300,12 +303,13 @@ async def permission_group_remove(_: Message, command: list[str]) -> Optional[Re
 @CommandManager.register_command("/permission group clone",
                                  command_require_permission=Permission.Group.Clone,
                                  command_docs="从某个权限组复制权限到某个权限组",
-                                 command_usage="/permission group clone (groupName) (groupName)")
+                                 command_usage="/permission group clone (groupName) (groupName)",
+                                 invalidates=["/permission group list"])
 async def permission_group_clone(message: Message, command: list[str]) -> Optional[Result]:
     if len(command) >= 6:
         return None
     msg = f"确认克隆权限组「{command[3]}」的`所有权限`到权限组「{command[4]}」(是/否)？"
-    target = (await MessageHelper.send_message(message.group_id, msg))[0]
+    target = (await MessageHelper.send_message(message.group_id, msg, coalesce=False))[0]
     result = await ReplyMessageSender.wait_reply_async(message, 60)
     match result:
         case ReplyType.REJECT:
@@ -349,7 +353,8 @@ async def permission_group_check(_: Message, command: list[str]) -> Optional[Res
                                  command_require_permission=Permission.Group.Parent.Add,
                                  command_docs="将某个权限组添加到某个权限组中",
                                  command_usage="/permission group group add (groupName) (groupName)",
-                                 alia_list=["/ps g g a"])
+                                 alia_list=["/ps g g a"],
+                                 invalidates=["/permission group list"])
 async def permission_group_group_add(_: Message, command: list[str]) -> Optional[Result]:
     if len(command) >= 7:
         return None
@@ -360,7 +365,8 @@ async def permission_group_group_add(_: Message, command: list[str]) -> Optional
                                  command_require_permission=Permission.Group.Parent.Del,
                                  command_docs="将某个权限组从某个权限组中移除",
                                  command_usage="/permission group group remove (groupName) (groupName)",
-                                 alia_list=["/ps g g r"])
+                                 alia_list=["/ps g g r"],
+                                 invalidates=["/permission group list"])
 async def permission_group_group_remove(_: Message, command: list[str]) -> Optional[Result]:
     if len(command) >= 7:
         return None
@@ -371,12 +377,13 @@ async def permission_group_group_remove(_: Message, command: list[str]) -> Optio
                                  command_require_permission=Permission.Group.Del,
                                  command_docs="从权限系统中删除某个权限组",
                                  command_usage="/permission group del (groupName)",
-                                 alia_list=["/ps g d"])
+                                 alia_list=["/ps g d"],
+                                 invalidates=["/permission group list"])
 async def permission_group_del(message: Message, command: list[str]) -> Optional[Result]:
     if len(command) >= 5:
         return None
     msg = f"是否删除权限组「{command[3]}」(是/否)？"
-    target = (await MessageHelper.send_message(message.group_id, msg))[0]
+    target = (await MessageHelper.send_message(message.group_id, msg, coalesce=False))[0]
     result = await ReplyMessageSender.wait_reply_async(message, 60)
     match result:
         case ReplyType.REJECT:
@@ -405,7 +412,9 @@ async def permission_group_del(message: Message, command: list[str]) -> Optional
                                  command_require_permission=Permission.Group.List,
                                  command_docs="列出某个权限组包含的所有权限",
                                  command_usage="/permission group list (groupName)",
-                                 alia_list=["/ps g l"])
+                                 alia_list=["/ps g l"],
+                                 cache_ttl=60,
+                                 cache_key=tokens_key)
 async def permission_group_list(_: Message, command: list[str]) -> Optional[Result]:
     if len(command) >= 5:
         return None
@@ -431,7 +440,8 @@ async def permission_group_info(_: Message, command: list[str]) -> Optional[Resu
                                  command_require_permission=Permission.Group.Create,
                                  command_docs="为权限系统创建一个新权限组",
                                  command_usage="/permission group create (groupName)",
-                                 alia_list=["/ps g c"])
+                                 alia_list=["/ps g c"],
+                                 invalidates=["/permission group list"])
 async def permission_group_create(_: Message, command: list[str]) -> Optional[Result]:
     if (command_length := len(command)) >= 6:
         return None
@@ -445,7 +455,8 @@ async def permission_group_create(_: Message, command: list[str]) -> Optional[Re
 @CommandManager.register_command("/permission reload",
                                  command_require_permission=Permission.Group.Reload.Common,
                                  command_docs="重载权限系统",
-                                 alia_list=["/ps r"])
+                                 alia_list=["/ps r"],
+                                 invalidates=["/permission group list"])
 async def permission_reload(message: Message, command: list[str]) -> Optional[Result]:
     if (command_length := len(command)) == 2:
         return Result.of_success(PermissionHelper.get_permission_manager().reload_group_permission().message)
@@ -7,6 +7,7 @@ from src.database.server_model import ServerList as ServerListModel
 from src.element.message import Message
 from src.element.permissions import ServerList
 from src.element.result import Result
+from src.module.command_cache import tokens_key
 from src.module.server_status import ServerStatus
 
 
@@ -37,7 +38,8 @@ async def server_list_command(_: Message, __: list[str]) -> Optional[Result]:
                                  command_require_permission=ServerList.Add,
                                  command_docs="添加一个服务器",
                                  command_usage="/serverlist add (ServerName) (ServerIp) [weight]",
-                                 alia_list=["/sl a"])
+                                 alia_list=["/sl a"],
+                                 invalidates=["/serverlist list", "/info"])
 async def server_list_add(_: Message, command: list[str]) -> Optional[Result]:
     if (command_length := len(command)) < 4 or command_length > 5:
         return None
@@ -54,7 +56,8 @@ async def server_list_add(_: Message, command: list[str]) -> Optional[Result]:
                                  command_require_permission=ServerList.Del,
                                  command_docs="删除某个服务器",
                                  command_usage="/serverlist del (ServerName)",
-                                 alia_list=["/sl d"])
+                                 alia_list=["/sl d"],
+                                 invalidates=["/serverlist list", "/info"])
 async def server_list_del(_: Message, command: list[str]) -> Optional[Result]:
     if len(command) < 3:
         return None
@@ -68,7 +71,8 @@ async def server_list_del(_: Message, command: list[str]) -> Optional[Result]:
                                  command_require_permission=ServerList.Enable,
                                  command_docs="/serverlist enable (ServerName)",
                                  command_usage="开启某个服务器的状态查询",
-                                 alia_list=["/sl e"])
+                                 alia_list=["/sl e"],
+                                 invalidates=["/serverlist list", "/info"])
 async def server_list_enable(_: Message, command: list[str]) -> Optional[Result]:
     if len(command) < 3:
         return None
@@ -83,7 +87,8 @@ async def server_list_enable(_: Message, command: list[str]) -> Optional[Result]
                                  command_require_permission=ServerList.Disable,
                                  command_docs="/serverlist disable (ServerName)",
                                  command_usage="关闭某个服务器的状态查询",
-                                 alia_list=["/sl D"])
+                                 alia_list=["/sl D"],
+                                 invalidates=["/serverlist list", "/info"])
 async def server_list_disable(_: Message, command: list[str]) -> Optional[Result]:
     if len(command) < 3:
         return None
@@ -98,7 +103,8 @@ async def server_list_disable(_: Message, command: list[str]) -> Optional[Result
                                  command_require_permission=ServerList.Rename,
                                  command_docs="/serverlist rename (ServerName) (NewName)",
                                  command_usage="修改某个服务器名称",
-                                 alia_list=["/sl r"])
+                                 alia_list=["/sl r"],
+                                 invalidates=["/serverlist list", "/info"])
 async def server_list_rename(_: Message, command: list[str]) -> Optional[Result]:
     if len(command) < 4:
         return None
@@ -113,7 +119,8 @@ async def server_list_rename(_: Message, command: list[str]) -> Optional[Result]
                                  command_require_permission=ServerList.Modify,
                                  command_docs="修改某个服务器ip",
                                  command_usage="/serverlist modify (ServerName) (NewServerIp)",
-                                 alia_list=["/sl m"])
+                                 alia_list=["/sl m"],
+                                 invalidates=["/serverlist list", "/info"])
 async def server_list_modify(_: Message, command: list[str]) -> Optional[Result]:
     if len(command) < 4:
         return None
@@ -128,7 +135,8 @@ async def server_list_modify(_: Message, command: list[str]) -> Optional[Result]
                                  command_require_permission=ServerList.Weight,
                                  command_docs="修改服务器权重",
                                  command_usage="/serverlist weight (ServerName) (weight)",
-                                 alia_list=["/sl w"])
+                                 alia_list=["/sl w"],
+                                 invalidates=["/serverlist list", "/info"])
 async def server_list_weight(_: Message, command: list[str]) -> Optional[Result]:
     if len(command) < 4:
         return None
@@ -142,7 +150,8 @@ async def server_list_weight(_: Message, command: list[str]) -> Optional[Result]
 @CommandManager.register_command("/serverlist reload",
                                  command_require_permission=ServerList.Reload,
                                  command_docs="重载服务器列表",
-                                 alia_list=["/sl R"])
+                                 alia_list=["/sl R"],
+                                 invalidates=["/serverlist list", "/info"])
 async def server_list_reload(_: Message, __: list[str]) -> Optional[Result]:
     ServerStatus.reload_server_list()
     return Result.of_success("重新加载服务器列表成功")
@@ -151,6 +160,8 @@ async def server_list_reload(_: Message, __: list[str]) -> Optional[Result]:
 @CommandManager.register_command("/serverlist list",
                                  command_require_permission=ServerList.List,
                                  command_docs="列出所有服务器",
-                                 alia_list=["/sl l"])
+                                 alia_list=["/sl l"],
+                                 cache_ttl=60,
+                                 cache_key=tokens_key)
 async def server_list_list(_: Message, __: list[str]) -> Optional[Result]:
     return Result.of_success("\n".join([str(item) for item in ServerListModel.select()]))
@@ -0,0 +1,147 @@
+from collections import deque
+from typing import Generic, Iterable, Optional, TypeVar
+
+V = TypeVar('V')
+
+
+class AhoCorasick(Generic[V]):
+    """
+    Aho-Corasick 多模式匹配自动机
+
+    对文本进行一次线性扫描即可找出所有命中的模式串，模式串中的正则元字符没有特殊含义。
+
+    模式串和文本都会经过 casefold 处理，因此匹配不区分大小写。
+
+    示例::
+
+        matcher = AhoCorasick({"foo": 1, "Bar": 2})
+        matcher.search("FOO bar")  # {"foo": 1, "Bar": 2}
+
+    :param words: 模式串及其关联值
+    """
+
+    def __init__(self, words: Optional[dict[str, V]] = None) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # 在该状态结束的模式串(casefold后)
+        self._output: list[Optional[str]] = [None]
+        # 沿失配链能到达的最近一个有输出的状态，0表示没有
+        self._dict_link: list[int] = [0]
+        # casefold后的模式串 -> (原始模式串, 关联值)
+        self._words: dict[str, tuple[str, V]] = {}
+        self._dirty: bool = False
+        if words:
+            self.update(words.items())
+            self.build()
+
+    def add(self, word: str, value: V) -> None:
+        """
+        添加一个模式串，已存在时覆盖其关联值
+
+        :param word: 模式串
+        :param value: 关联值
+        """
+        key = word.casefold()
+        if not key:
+            return
+        self._words[key] = (word, value)
+        state = 0
+        for char in key:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+                self._dict_link.append(0)
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state] = key
+        self._dirty = True
+
+    def remove(self, word: str) -> bool:
+        """
+        移除一个模式串，自动机的状态节点会被保留以便再次添加
+
+        :param word: 模式串
+        :return: 模式串是否存在
+        """
+        key = word.casefold()
+        if key not in self._words:
+            return False
+        del self._words[key]
+        state = 0
+        for char in key:
+            state = self._goto[state][char]
+        self._output[state] = None
+        self._dirty = True
+        return True
+
+    def update(self, words: Iterable[tuple[str, V]]) -> None:
+        """
+        批量添加模式串
+
+        :param words: (模式串, 关联值) 的可迭代对象
+        """
+        for word, value in words:
+            self.add(word, value)
+
+    def build(self) -> None:
+        """
+        使用广度优先遍历计算失配链接和输出链接
+
+        添加或移除模式串后只会标记自动机需要重建，在下一次搜索前自动调用，
+        因此连续多次修改只需要重建一次
+        """
+        queue: deque[int] = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            self._dict_link[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                self._dict_link[next_state] = fail if self._output[fail] is not None else self._dict_link[fail]
+        self._dirty = False
+
+    def search(self, text: str) -> dict[str, V]:
+        """
+        扫描文本，返回所有命中的模式串
+
+        :param text: 要扫描的文本
+        :return: 命中的原始模式串及其关联值
+        """
+        if self._dirty:
+            self.build()
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+        result: dict[str, V] = {}
+        state = 0
+        for char in text.casefold():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            node = state if output[state] is not None else dict_link[state]
+            while node:
+                word, value = self._words[output[node]]
+                result[word] = value
+                node = dict_link[node]
+        return result
+
+    @property
+    def words(self) -> dict[str, V]:
+        return {word: value for word, value in self._words.values()}
+
+    def __contains__(self, word: str) -> bool:
+        return word.casefold() in self._words
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: {len(self._words)} words>"
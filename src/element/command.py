@@ -1,9 +1,13 @@
-from typing import Optional
+from typing import Callable, Hashable, Optional
 
+from src.element.message import Message
+from src.element.rate_limit import RateLimit
 from src.element.tree import Tree
 from src.type.types import CommandHandler
 from src.utils.utils import random_string
 
+CommandCacheKey = Callable[[Message, list[str]], Hashable]
+
 
 class Command:
     def __init__(self,
@@ -12,13 +16,21 @@ class Command:
                  command_name: Optional[str] = None,
                  command_require_permission: Optional[Tree] = None,
                  command_docs: Optional[str] = None,
-                 command_usage: Optional[str] = None):
+                 command_usage: Optional[str] = None,
+                 command_rate_limit: Optional[RateLimit] = None,
+                 command_cache_ttl: float = 0,
+                 command_cache_key: Optional[CommandCacheKey] = None,
+                 command_invalidates: Optional[list[str]] = None):
         self._command = command
         self._command_name = command_name if command_name else f"{command_handler.__name__}_{random_string(8)}"
         self._command_handler = command_handler
         self._command_require_permission = command_require_permission
         self._command_docs = command_docs or "暂无"
         self._command_usage = command_usage or command
+        self._command_rate_limit = command_rate_limit
+        self._command_cache_ttl = command_cache_ttl
+        self._command_cache_key = command_cache_key
+        self._command_invalidates = command_invalidates or []
 
     @property
     def handler(self) -> CommandHandler:
@@ -40,6 +52,22 @@ class Command:
     def usage(self) -> Optional[str]:
         return self._command_usage
 
+    @property
+    def rate_limit(self) -> Optional[RateLimit]:
+        return self._command_rate_limit
+
+    @property
+    def cache_ttl(self) -> float:
+        return self._command_cache_ttl
+
+    @property
+    def cache_key(self) -> Optional[CommandCacheKey]:
+        return self._command_cache_key
+
+    @property
+    def invalidates(self) -> list[str]:
+        return self._command_invalidates
+
     @property
     def command(self) -> str:
         return self._command
@@ -1,5 +1,6 @@
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Type, Union
+from typing import List, Optional, Type, Union
 
 from satori import Channel, Element, Event
 from satori.element import At, Audio, Custom, File, Image, Quote, Text, Video
@@ -8,42 +9,83 @@ event_type: Type = Union[At, Text, Image, Audio, Video, File, Quote, Custom]
 
 
 class Message:
+    """
+    对satori消息事件的封装
+
+    纯文本、回复信息和发送者信息在第一次访问时才会计算并缓存，
+    同一个事件请使用 :py:func:`Message.from_event` 获取，以便在各处共享同一个实例
+    """
+    __slots__ = ("_event", "_send_time", "_raw_message", "_elements", "_message", "_has_quote", "_quote_id",
+                 "_group_id", "_sender_id", "_sender_name")
+    # id(事件) -> 消息，缓存中的消息持有事件的引用，因此事件的id不会被复用
+    _cache: OrderedDict[int, "Message"] = OrderedDict()
+    _cache_size: int = 64
+
     def __init__(self, event: Event):
         self._event = event
         self._send_time = event.timestamp
         self._raw_message = event.message
         self._elements = self._raw_message.message
-        self._message = ""
-        self._has_quote = False
+        self._message: Optional[str] = None
+        self._has_quote: bool = False
         self._quote_id: str = ""
+        self._group_id: Optional[str] = None
+        self._sender_id: Optional[str] = None
+        self._sender_name: Optional[str] = None
+
+    @classmethod
+    def from_event(cls, event: Event) -> "Message":
+        """
+        获取事件对应的消息，同一个事件只会创建一次
+        Args:
+            event: satori事件
+        Returns:
+            消息
+        """
+        key = id(event)
+        message = cls._cache.get(key)
+        if message is not None and message._event is event:
+            cls._cache.move_to_end(key)
+            return message
+        message = cls(event)
+        cls._cache[key] = message
+        if len(cls._cache) > cls._cache_size:
+            cls._cache.popitem(last=False)
+        return message
+
+    def _parse(self) -> str:
+        parts: list[str] = []
         for element in self._elements:
             if isinstance(element, At):
-                self._message += f"@{element.name}({element.id})"
+                parts.append(f"@{element.name}({element.id})")
                 continue
             if isinstance(element, Text):
-                self._message += element.text
+                parts.append(element.text)
                 continue
             if isinstance(element, Image):
-                self._message += "[图片]"
+                parts.append("[图片]")
                 continue
             if isinstance(element, Audio):
-                self._message += "[语音]"
+                parts.append("[语音]")
                 continue
             if isinstance(element, Video):
-                self._message += "[视频]"
+                parts.append("[视频]")
                 continue
             if isinstance(element, File):
-                self._message += "[文件]"
+                parts.append("[文件]")
                 continue
             if isinstance(element, Quote):
                 self._has_quote = True
-                self._message += f"[回复({element._children[0]._attrs['id']})]"
+                self._quote_id = element._children[0]._attrs['id']
+                parts.append(f"[回复({self._quote_id})]")
                 continue
             if isinstance(element, Custom):
                 match element.tag:
                     case "chronocat:face":
-                        self._message += f"{element._attrs['name']}"
+                        parts.append(f"{element._attrs['name']}")
                 continue
+        self._message = "".join(parts)
+        return self._message
 
     def find(self, obj_type: type) -> List[event_type]:
         return list(filter(lambda x: isinstance(x, obj_type), self._elements))
@@ -55,8 +97,22 @@ class Message:
 
     @property
     def message(self) -> str:
+        if self._message is None:
+            return self._parse()
         return self._message
 
+    @property
+    def has_quote(self) -> bool:
+        if self._message is None:
+            self._parse()
+        return self._has_quote
+
+    @property
+    def quote_id(self) -> str:
+        if self._message is None:
+            self._parse()
+        return self._quote_id
+
     @property
     def raw_message(self) -> str:
         return self._raw_message.content
@@ -67,7 +123,9 @@ class Message:
 
     @property
     def group_id(self) -> str:
-        return self._event.guild.id
+        if self._group_id is None:
+            self._group_id = self._event.guild.id
+        return self._group_id
 
     @property
     def group_name(self) -> str:
@@ -79,13 +137,15 @@ class Message:
 
     @property
     def sender_id(self) -> str:
-        return self._event.user.id
+        if self._sender_id is None:
+            self._sender_id = self._event.user.id
+        return self._sender_id
 
     @property
     def sender_name(self) -> str:
-        if self._event.member.nick:
-            return self._event.member.nick
-        return self._event.user.name
+        if self._sender_name is None:
+            self._sender_name = self._event.member.nick or self._event.user.name
+        return self._sender_name
 
     @property
     def sender_info(self) -> str:
@@ -99,27 +159,27 @@ class Message:
     def parse(elements: Union[List[Union[str, Element]], str]) -> str:
         if isinstance(elements, str):
             return elements.replace("\n", "|")
-        res = ""
+        parts: list[str] = []
         for element in elements:
             if isinstance(element, str):
-                res += element
+                parts.append(element)
             if isinstance(element, Element):
                 if isinstance(element, At):
-                    res += f"@{element.id}"
+                    parts.append(f"@{element.id}")
                     continue
                 if isinstance(element, Text):
-                    res += element.text
+                    parts.append(element.text)
                     continue
                 if isinstance(element, Image):
-                    res += "[图片]"
+                    parts.append("[图片]")
                     continue
                 if isinstance(element, Quote):
-                    res += f"[回复({element.id})]"
-        return res.replace("\n", "|")
+                    parts.append(f"[回复({element.id})]")
+        return "".join(parts).replace("\n", "|")
 
     @property
     def is_command(self) -> bool:
-        return self._message.startswith("/")
+        return self.message.startswith("/")
 
     @property
     def send_time(self) -> datetime:
@@ -129,4 +189,4 @@ class Message:
         return self.message
 
     def __repr__(self):
-        return f"<{self.__class__.__name__}: {self._message}>"
+        return f"<{self.__class__.__name__}: {self.message}>"
@@ -156,7 +156,8 @@ class Other:
     Reboot: Tree = Tree("Other.Reboot")
     Word: Tree = Tree("Other.Word")
     Status: Tree = Tree("Other.Status")
-    instance: Tree = Tree("Other.*").insert(Reboot).insert(Word).insert(Status)
+    Unlimited: Tree = Tree("Other.Unlimited")
+    instance: Tree = Tree("Other.*").insert(Reboot).insert(Word).insert(Status).insert(Unlimited)
 
 
 class Root:
@@ -0,0 +1,42 @@
+from typing import Optional
+
+
+class Limit:
+    """
+    单个令牌桶的限制
+
+    :param rate: 每秒恢复的次数
+    :param burst: 最多可以连续使用的次数
+    """
+
+    def __init__(self, rate: float, burst: float = 1) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate必须大于0，burst不能小于1")
+        self.rate = rate
+        self.burst = burst
+
+    @classmethod
+    def per_minute(cls, times: float, burst: Optional[float] = None) -> 'Limit':
+        """
+        每分钟最多使用times次，默认允许一次性用完
+        """
+        return cls(times / 60, times if burst is None else burst)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: {self.rate}/s, burst {self.burst}>"
+
+
+class RateLimit:
+    """
+    命令的频率限制
+
+    :param user: 每个用户使用该命令的限制，为None时使用配置中的默认限制
+    :param group: 每个群使用该命令的限制，为None时使用配置中的默认限制
+    :param command: 所有用户使用该命令的总限制，为None时不限制
+    """
+
+    def __init__(self, user: Optional[Limit] = None, group: Optional[Limit] = None,
+                 command: Optional[Limit] = None) -> None:
+        self.user = user
+        self.group = group
+        self.command = command
@@ -1,4 +1,4 @@
-from typing import Generic, List, Optional, Set, TypeVar, Union
+from typing import Dict, Generic, Iterable, List, Optional, Set, TypeVar, Union
 
 T = TypeVar('T')
 
@@ -8,12 +8,36 @@ class Tree(Generic[T]):
         self._root: T = root
         self._alias: Set[T] = alias or set()
         self._children: List['Tree'] = []
+        self._parent: Optional['Tree'] = None
+        # 子节点索引，节点名优先于别名
+        self._child_index: Dict[T, 'Tree'] = {}
+        self._alias_index: Dict[T, 'Tree'] = {}
+        # 子树索引(包括自身)，节点名或别名 -> 节点，同名节点以先加入的为准
+        self._node_index: Dict[T, 'Tree'] = {}
+        self._index_names(self, [root, *self._alias])
+
+    def _index_names(self, node: 'Tree', names: Iterable[T]) -> None:
+        """
+        将子树内某个节点的名称加入当前节点及所有祖先节点的子树索引
+        """
+        current: Optional[Tree] = self
+        while current is not None:
+            for name in names:
+                current._node_index.setdefault(name, node)
+            current = current._parent
 
     def insert(self, value: Union[T, 'Tree'], alias: Set[T] = None) -> 'Tree':
-        if isinstance(value, Tree):
-            self._children.append(value)
-        else:
-            self._children.append(Tree(value, alias))
+        child = value if isinstance(value, Tree) else Tree(value, alias)
+        child._parent = self
+        self._children.append(child)
+        self._child_index.setdefault(child._root, child)
+        for name in child._alias:
+            self._alias_index.setdefault(name, child)
+        current: Optional[Tree] = self
+        while current is not None:
+            for name, node in child._node_index.items():
+                current._node_index.setdefault(name, node)
+            current = current._parent
         return self
 
     def add_alias(self, alias: Union[List[T], Set[T], T]) -> 'Tree':
@@ -25,8 +49,27 @@ class Tree(Generic[T]):
             self._alias.add(alias)
         if self.root in self._alias:
             self._alias.remove(self._root)
+        if self._parent is not None:
+            for name in self._alias:
+                self._parent._alias_index.setdefault(name, self)
+        self._index_names(self, self._alias)
         return self
 
+    def get_child(self, value: T, *, include_alias: bool = True) -> Optional['Tree']:
+        """
+        通过节点名或别名获取子节点
+        """
+        child = self._child_index.get(value)
+        if child is None and include_alias:
+            child = self._alias_index.get(value)
+        return child
+
+    def named_children(self) -> Dict[T, 'Tree']:
+        """
+        节点名和别名 -> 子节点，同名时节点名优先，与get_child的匹配规则一致
+        """
+        return {**self._alias_index, **self._child_index}
+
     @property
     def is_leaf(self) -> bool:
         return len(self._children) == 0
@@ -48,33 +91,27 @@ class Tree(Generic[T]):
         return self.get_tree(self)
 
     def search(self, value: Union[T, 'Tree'], res: Optional[List['Tree']] = None) -> bool:
+        node = self._node_index.get(value.root if isinstance(value, Tree) else value)
+        if node is None:
+            return False
         if res is not None:
-            res.append(self)
-        if isinstance(value, Tree) and (self.root == value.root or value.root in self._alias):
-            return True
-        else:
-            if self._root == value or value in self._alias:
-                return True
-        for child in self._children:
-            if child.search(value, res):
-                return True
-        if res is not None:
-            res.remove(self)
-        return False
+            path: List[Tree] = []
+            while node is not self:
+                path.append(node)
+                node = node._parent
+            path.append(self)
+            res.extend(reversed(path))
+        return True
 
     def get_node(self, path_list: list[T], *, match_most: bool = False) -> Optional['Tree']:
         current_node = self
         for value in path_list:
-            child_found = False
-            for child in current_node.children:
-                if child.root == value or value in child._alias:
-                    current_node = child
-                    child_found = True
-                    break
-            if not child_found:
+            child = current_node.get_child(value)
+            if child is None:
                 if match_most:
                     return current_node
                 return None
+            current_node = child
 
         return current_node
 
@@ -62,3 +62,9 @@ class NoKeyError(CustomError):
     def __init__(self, info: str = "无法找到字典的键值"):
         super().__init__()
         self.info = info
+
+
+class JsonFileDamagedError(CustomError):
+    def __init__(self, info: str = "JSON文件已损坏"):
+        super().__init__()
+        self.info = info
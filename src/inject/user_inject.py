@@ -1,11 +1,11 @@
-from typing import Any
-
 from src.base.event_bus import event_bus
 from src.bus.event.event import MessageEvent
 from src.database.message_model import Message
 from src.database.user_model import User
+from src.module.user_cache import UserCache
 
 
-@event_bus.on_event_inject(MessageEvent.MESSAGE_CREATED)
-def inject_user(message: Message, *_, **__) -> dict[str, Any]:
-    return {"user": User.get_or_create(message)}
+# 大部分处理函数不需要用户信息，只在获取时才查询数据库
+@event_bus.on_event_lazy_inject(MessageEvent.MESSAGE_CREATED, "user", offload=True)
+def inject_user(message: Message, *_, **__) -> User:
+    return UserCache.get_or_create(message)
@@ -1,34 +1,143 @@
+from asyncio import to_thread
+from datetime import datetime, timedelta
 from typing import Optional
-from re import compile, findall, Pattern, IGNORECASE
 
 from src.base.event_bus import event_bus
 from src.base.logger import logger
 from src.bus.event.event import Event, MessageEvent
 from src.database.message_model import BlockWord
+from src.element.aho_corasick import AhoCorasick
 from src.element.message import Message
+from src.module.user_cache import UserCache
 from src.utils.message_helper import MessageHelper
 
 
 class BlockMessage:
-    _wordlist: Optional[dict[str, list[dict[str, int]]]] = None
-    _patterns: Optional[dict[str, Pattern]] = None
+    # 禁言时长(秒)
+    mute_duration: int = 60
+    # 群号 -> {屏蔽词(casefold后): 处罚等级}
+    _wordlist: Optional[dict[str, dict[str, int]]] = None
+    # 群号 -> 合并了default屏蔽词的匹配器
+    _matchers: Optional[dict[str, AhoCorasick[int]]] = None
+
+    @staticmethod
+    def _merge(*wordlists: dict[str, int]) -> AhoCorasick[int]:
+        # 重复的屏蔽词取最高的处罚等级
+        merged: dict[str, int] = {}
+        for wordlist in wordlists:
+            for word, punish_level in wordlist.items():
+                merged[word] = max(merged.get(word, punish_level), punish_level)
+        return AhoCorasick(merged)
+
+    @classmethod
+    def _punish_level(cls, group_id: str, word: str) -> Optional[int]:
+        levels = [wordlist[word] for wordlist in (cls._wordlist.get("default", {}), cls._wordlist.get(group_id, {}))
+                  if word in wordlist]
+        return max(levels) if levels else None
+
+    @classmethod
+    def _affected_groups(cls, group_id: str) -> list[str]:
+        # default屏蔽词合并在所有群的匹配器中
+        if group_id == "default":
+            return list(cls._matchers.keys())
+        return [group_id]
 
     @classmethod
     def update_block_words(cls):
-        cls._wordlist = {}
-        cls._patterns = {}
-        tmp = {}
+        """
+        从数据库重新加载全部屏蔽词并重建所有匹配器
+        """
+        wordlist: dict[str, dict[str, int]] = {}
         block_words: list[BlockWord] = BlockWord.select().execute()
         for word in block_words:
-            if word.group_id not in cls._wordlist:
-                cls._wordlist[word.group_id] = []
-            if word.group_id not in tmp:
-                tmp[word.group_id] = []
-            cls._wordlist[word.group_id].append({word.block_word: word.punish_level})
-            tmp[word.group_id].append(word.block_word)
-        for group in tmp:
-            tmp[group].sort(key=lambda x: len(x), reverse=True)
-            cls._patterns[group] = compile("|".join(tmp[group]), IGNORECASE)
+            group = wordlist.setdefault(word.group_id, {})
+            key = word.block_word.casefold()
+            group[key] = max(group.get(key, 0), word.punish_level)
+        default = wordlist.get("default", {})
+        matchers = {"default": cls._merge(default)}
+        for group_id, words in wordlist.items():
+            if group_id != "default":
+                matchers[group_id] = cls._merge(default, words)
+        cls._wordlist = wordlist
+        cls._matchers = matchers
+
+    @classmethod
+    def add_block_words(cls, group_id: str, words: list[str], punish_level: int = 1) -> None:
+        """
+        向内存中的匹配器增量添加屏蔽词，只修改受影响的群
+        Args:
+            group_id: 群号，default表示所有群
+            words: 要添加的屏蔽词
+            punish_level: 处罚等级
+        """
+        if cls._wordlist is None or cls._matchers is None:
+            return
+        group = cls._wordlist.setdefault(group_id, {})
+        keys = [word.casefold() for word in words if word]
+        for key in keys:
+            group[key] = max(group.get(key, punish_level), punish_level)
+        if group_id not in cls._matchers:
+            cls._matchers[group_id] = cls._merge(cls._wordlist.get("default", {}), group)
+            return
+        for target in cls._affected_groups(group_id):
+            matcher = cls._matchers[target]
+            for key in keys:
+                matcher.add(key, cls._punish_level(target, key))
+
+    @classmethod
+    def remove_block_words(cls, group_id: str, words: list[str]) -> None:
+        """
+        从内存中的匹配器增量移除屏蔽词，只修改受影响的群
+        Args:
+            group_id: 群号，default表示所有群
+            words: 要移除的屏蔽词
+        """
+        if cls._wordlist is None or cls._matchers is None or group_id not in cls._wordlist:
+            return
+        group = cls._wordlist[group_id]
+        keys = [key for key in (word.casefold() for word in words) if group.pop(key, None) is not None]
+        for target in cls._affected_groups(group_id):
+            matcher = cls._matchers.get(target)
+            if matcher is None:
+                continue
+            for key in keys:
+                # 同一个词可能同时存在于default和该群的屏蔽词中
+                punish_level = cls._punish_level(target, key)
+                if punish_level is None:
+                    matcher.remove(key)
+                else:
+                    matcher.add(key, punish_level)
+
+    @classmethod
+    def match(cls, group_id: str, text: str) -> dict[str, int]:
+        """
+        在一次扫描中同时匹配default和该群的屏蔽词
+        Args:
+            group_id: 群号
+            text: 要检查的文本
+        Returns:
+            命中的屏蔽词及其处罚等级
+        """
+        if cls._wordlist is None or cls._matchers is None:
+            cls.update_block_words()
+        matcher = cls._matchers.get(group_id, cls._matchers["default"])
+        return matcher.search(text)
+
+    @classmethod
+    async def record_punishment(cls, message: Message, punish_level: int) -> None:
+        """
+        累加发送者的处罚等级并记录禁言结束时间，修改由UserCache写回数据库
+        Args:
+            message: 触发屏蔽词的消息
+            punish_level: 本次的处罚等级
+        """
+        try:
+            user = await to_thread(UserCache.get_or_create, message)
+        except Exception as e:
+            logger.error(f"Failed to load user {message.sender_id}: {e}")
+            return
+        UserCache.update_punishment(user, punish_level=user.punish_level + punish_level, under_punishment=True,
+                                    punishment_end_date=datetime.now() + timedelta(seconds=cls.mute_duration))
 
     @staticmethod
     @event_bus.on_event_filter(MessageEvent.MESSAGE_CREATED)
@@ -36,19 +145,10 @@ class BlockMessage:
         logger.debug(f"Checking message: {message}")
         if message.is_command:
             return
-        if BlockMessage._wordlist is None or BlockMessage._patterns is None:
-            BlockMessage.update_block_words()
-        if "default" in BlockMessage._patterns:
-            block_word = findall(BlockMessage._patterns["default"], message.message)
-            if len(block_word) != 0:
-                logger.debug(f"Block word found: {block_word}")
-                await MessageHelper.retract_message(message)
-                await MessageHelper.mute_member(message)
-                return True
-        if message.group_id in BlockMessage._patterns:
-            block_word = findall(BlockMessage._patterns[message.group_id], message.message)
-            if len(block_word) != 0:
-                logger.debug(f"Block word found: {block_word}")
-                await MessageHelper.retract_message(message)
-                await MessageHelper.mute_member(message)
-                return True
+        block_word = BlockMessage.match(message.group_id, message.message)
+        if len(block_word) != 0:
+            logger.debug(f"Block word found: {block_word}, punish level: {max(block_word.values())}")
+            await MessageHelper.retract_message(message)
+            await MessageHelper.mute_member(message, BlockMessage.mute_duration)
+            await BlockMessage.record_punishment(message, max(block_word.values()))
+            return True
@@ -0,0 +1,118 @@
+from asyncio import Task, create_task, shield
+from time import monotonic
+from typing import Hashable, Optional
+
+from src.base.config import sys_config
+from src.base.logger import logger
+from src.base.scheduler import scheduler
+from src.element.command import Command
+from src.element.message import Message
+from src.element.result import Result
+from src.scheduler.trigger import IntervalTrigger
+
+CacheKey = tuple[str, Hashable]
+
+
+def tokens_key(_: Message, command: list[str]) -> Hashable:
+    """
+    只按命令内容缓存，所有群共享同一结果
+    """
+    return tuple(command)
+
+
+def tokens_group_key(message: Message, command: list[str]) -> Hashable:
+    """
+    按命令内容和群缓存，命令未指定缓存键时的默认值
+    """
+    return tuple(command), message.group_id
+
+
+class CommandResultCache:
+    """
+    只读命令的结果缓存
+
+    声明了 cache_ttl 的命令在有效期内直接返回缓存的结果，相同的命令同时执行时只运行一次处理函数；
+    只缓存成功的结果。修改数据的命令通过 invalidates 声明需要失效的命令，执行后这些命令的缓存会被清除，
+    清除时仍在执行中的处理函数的结果也不会被缓存
+    """
+    # (命令, 缓存键) -> (过期时间, 结果)
+    _entries: dict[CacheKey, tuple[float, Result]] = {}
+    _inflight: dict[CacheKey, Task] = {}
+    # 命令 -> 失效次数，用于判断执行期间缓存是否被清除
+    _generation: dict[str, int] = {}
+    _hits: int = 0
+    _misses: int = 0
+    _coalesced: int = 0
+
+    @classmethod
+    async def run(cls, command: Command, message: Message, tokens: list[str]) -> Optional[Result]:
+        """
+        执行命令处理函数，命令声明了缓存时优先使用缓存
+        Args:
+            command: 命令
+            message: 命令消息
+            tokens: 分割后的命令
+        Returns:
+            处理函数的返回值
+        """
+        if command.cache_ttl <= 0 or not sys_config.command_cache.enable:
+            return await command.handler(message, tokens)
+        key = (command.command, (command.cache_key or tokens_group_key)(message, tokens))
+        entry = cls._entries.get(key)
+        if entry is not None:
+            if entry[0] > monotonic():
+                cls._hits += 1
+                return entry[1]
+            del cls._entries[key]
+        task = cls._inflight.get(key)
+        if task is not None:
+            cls._coalesced += 1
+            return await shield(task)
+        cls._misses += 1
+        task = create_task(cls._execute(command, message, tokens, key))
+        cls._inflight[key] = task
+        task.add_done_callback(lambda _: cls._inflight.pop(key, None))
+        # 发起调用的协程被取消时，其他等待的调用仍然可以获得结果
+        return await shield(task)
+
+    @classmethod
+    async def _execute(cls, command: Command, message: Message, tokens: list[str],
+                       key: CacheKey) -> Optional[Result]:
+        generation = cls._generation.get(command.command, 0)
+        result = await command.handler(message, tokens)
+        if result is not None and result.is_success and cls._generation.get(command.command, 0) == generation:
+            cls._entries[key] = (monotonic() + command.cache_ttl, result)
+        return result
+
+    @classmethod
+    def invalidate(cls, *commands: str) -> None:
+        """
+        清除命令的缓存
+        Args:
+            commands: 命令，如 /serverlist list
+        """
+        for command in commands:
+            cls._generation[command] = cls._generation.get(command, 0) + 1
+        targets = set(commands)
+        for key in [key for key in cls._entries if key[0] in targets]:
+            del cls._entries[key]
+        logger.trace(f"Invalidated command cache: {', '.join(commands)}")
+
+    @classmethod
+    def prune(cls) -> None:
+        now = monotonic()
+        for key in [key for key, (expire, _) in cls._entries.items() if expire <= now]:
+            del cls._entries[key]
+
+    @classmethod
+    def statistics(cls) -> dict[str, int]:
+        return {
+            "entries": len(cls._entries),
+            "hits": cls._hits,
+            "misses": cls._misses,
+            "coalesced": cls._coalesced
+        }
+
+
+scheduler.add_job(CommandResultCache.prune, IntervalTrigger(sys_config.command_cache.prune_interval),
+                  name="command_cache_prune")
@@ -0,0 +1,110 @@
+from time import monotonic
+from typing import Optional
+
+from src.base.config import sys_config
+from src.base.logger import logger
+from src.base.scheduler import scheduler
+from src.element.command import Command
+from src.element.message import Message
+from src.element.permissions import Other
+from src.element.rate_limit import Limit
+from src.scheduler.trigger import IntervalTrigger
+from src.utils.permission_helper import PermissionHelper
+from src.utils.token_bucket import TokenBucket
+
+BucketKey = tuple[str, str, str]
+
+
+class CommandRateLimiter:
+    """
+    命令频率限制
+
+    每个命令分别按用户、群和命令本身使用令牌桶限制，任意一个令牌桶不足时拒绝执行，
+    此时不会消耗其他令牌桶的令牌。已经回满的令牌桶会被定时回收，内存占用只与最近活跃的用户和群有关。
+    拥有 Other.Unlimited 权限的用户不受限制，没有命令权限的调用在检查前就会被拒绝，不会消耗令牌
+    """
+    # (范围, 命令注册名, 用户/群id) -> 令牌桶
+    _buckets: dict[BucketKey, TokenBucket] = {}
+    # 已经提示过的被限制用户 -> 提示失效时间，避免每次被拒绝都发送提示
+    _notified: dict[tuple[str, str], float] = {}
+    _rejected: int = 0
+
+    @staticmethod
+    def _limits(command: Command) -> list[tuple[str, Limit]]:
+        config = sys_config.rate_limit
+        rate_limit = command.rate_limit
+        user = rate_limit.user if rate_limit and rate_limit.user else Limit(config.user_rate, config.user_burst)
+        group = rate_limit.group if rate_limit and rate_limit.group else Limit(config.group_rate, config.group_burst)
+        limits = [("user", user), ("group", group)]
+        if rate_limit and rate_limit.command:
+            limits.append(("command", rate_limit.command))
+        return limits
+
+    @classmethod
+    def _bucket(cls, key: BucketKey, limit: Limit) -> TokenBucket:
+        bucket = cls._buckets.get(key)
+        if bucket is None:
+            bucket = cls._buckets[key] = TokenBucket(limit.rate, limit.burst)
+        return bucket
+
+    @classmethod
+    def check(cls, message: Message, command: Command) -> Optional[float]:
+        """
+        检查并消耗一次命令的使用次数
+        Args:
+            message: 命令消息
+            command: 要执行的命令
+        Returns:
+            被限制时返回需要等待的秒数，否则返回None
+        """
+        if not sys_config.rate_limit.enable:
+            return None
+        if PermissionHelper.check_user_permission(message.sender_id, Other.Unlimited):
+            return None
+        ids = {"user": message.sender_id, "group": message.group_id or message.sender_id, "command": ""}
+        buckets = [cls._bucket((scope, command.name, ids[scope]), limit) for scope, limit in cls._limits(command)]
+        wait = max(bucket.wait_time() for bucket in buckets)
+        if wait > 0:
+            cls._rejected += 1
+            logger.debug(f"Command {command.command} from {message.sender_id} rate limited, retry after {wait:.1f}s")
+            return wait
+        for bucket in buckets:
+            bucket.try_acquire()
+        return None
+
+    @classmethod
+    def should_notify(cls, message: Message, command: Command, wait: float) -> bool:
+        """
+        被限制的用户在限制解除前只提示一次
+        """
+        key = (message.sender_id, command.name)
+        now = monotonic()
+        if cls._notified.get(key, 0) > now:
+            return False
+        cls._notified[key] = now + wait
+        return True
+
+    @classmethod
+    def prune(cls) -> None:
+        """
+        回收已经回满的令牌桶和过期的提示记录
+        """
+        full = [key for key, bucket in cls._buckets.items() if bucket.is_full()]
+        for key in full:
+            del cls._buckets[key]
+        now = monotonic()
+        for key in [key for key, expire in cls._notified.items() if expire <= now]:
+            del cls._notified[key]
+        if full:
+            logger.trace(f"Pruned {len(full)} idle rate limit buckets")
+
+    @classmethod
+    def statistics(cls) -> dict[str, int]:
+        return {
+            "buckets": len(cls._buckets),
+            "rejected": cls._rejected
+        }
+
+
+scheduler.add_job(CommandRateLimiter.prune, IntervalTrigger(sys_config.rate_limit.prune_interval),
+                  name="rate_limit_prune")
@@ -0,0 +1,125 @@
+from time import monotonic
+from typing import Generic, Hashable, Optional, TypeVar
+
+from satori import Channel, Event, Guild, Member
+
+from src.base.config import sys_config
+from src.base.logger import logger
+from src.base.scheduler import scheduler
+from src.scheduler.trigger import IntervalTrigger
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    带过期时间的简单缓存
+    """
+
+    def __init__(self) -> None:
+        self._data: dict[K, tuple[float, V]] = {}
+
+    def get(self, key: K) -> Optional[V]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[0] < monotonic():
+            del self._data[key]
+            return None
+        return item[1]
+
+    def set(self, key: K, value: V) -> None:
+        self._data[key] = (monotonic() + sys_config.guild_cache.ttl, value)
+
+    def prune(self) -> int:
+        """
+        清除所有过期的条目
+        Returns:
+            清除的条目数量
+        """
+        now = monotonic()
+        expired = [key for key, (expire, _) in self._data.items() if expire < now]
+        for key in expired:
+            del self._data[key]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class GuildCache:
+    """
+    群组、频道和群成员信息的缓存
+
+    缓存只从收到的事件中顺带获取，不会为了填充缓存而额外调用API，
+    用于在日志中显示群组和成员名称
+    """
+    _guilds: TTLCache[str, Guild] = TTLCache()
+    _channels: TTLCache[str, Channel] = TTLCache()
+    _members: TTLCache[tuple[str, str], Member] = TTLCache()
+
+    @classmethod
+    def update_from_event(cls, event: Event) -> None:
+        """
+        使用事件中携带的群组、频道和成员信息更新缓存
+        Args:
+            event: 收到的事件
+        """
+        if event.guild is not None and event.guild.name:
+            cls._guilds.set(event.guild.id, event.guild)
+        if event.channel is not None and event.channel.name:
+            cls._channels.set(event.channel.id, event.channel)
+        if event.guild is not None and event.member is not None:
+            user = event.member.user or event.user
+            if user is not None:
+                cls._members.set((event.guild.id, user.id), event.member)
+
+    @classmethod
+    def display_name(cls, channel_id: str) -> str:
+        """
+        获取用于日志的群组或频道名称，不会调用API
+        Args:
+            channel_id: 群号或频道id
+        Returns:
+            ``名称(id)``，名称未知时只返回id
+        """
+        target = cls._guilds.get(channel_id) or cls._channels.get(channel_id)
+        if target is None or not target.name:
+            return channel_id
+        return f"{target.name}({channel_id})"
+
+    @classmethod
+    def member_name(cls, guild_id: str, user_id: str) -> str:
+        """
+        获取用于日志的群成员名称，不会调用API
+        Returns:
+            ``名称(id)``，名称未知时只返回id
+        """
+        member = cls._members.get((guild_id, user_id))
+        if member is None:
+            return user_id
+        name = member.nick or (member.user.name if member.user else None)
+        return f"{name}({user_id})" if name else user_id
+
+    @classmethod
+    def prune(cls) -> None:
+        expired = cls._guilds.prune() + cls._channels.prune() + cls._members.prune()
+        if expired:
+            logger.trace(f"Pruned {expired} expired guild cache entries")
+
+    @classmethod
+    def statistics(cls) -> dict[str, int]:
+        """
+        获取缓存的统计信息
+        Returns:
+            缓存的群组、频道和群成员数量
+        """
+        return {
+            "guilds": len(cls._guilds),
+            "channels": len(cls._channels),
+            "members": len(cls._members)
+        }
+
+
+scheduler.add_job(GuildCache.prune, IntervalTrigger(sys_config.guild_cache.ttl), name="guild_cache_prune")
@@ -1,12 +1,19 @@
+from asyncio import TimerHandle, get_running_loop
+from atexit import register
+from copy import deepcopy
 from enum import Enum
 from os import getcwd
 from os.path import join
 from typing import Optional, Union
+from weakref import WeakSet
 
+from src.base.config import sys_config
+from src.base.event_bus import event_bus
 from src.base.logger import logger
+from src.bus.event.event import ServerEvent
 from src.exception.exception import NoKeyError
-from src.utils.file_utils import check_directory, check_file
-from src.utils.json_utils import read_json, write_json
+from src.module.json_storage import JournalStorage, JsonStorage, SnapshotStorage
+from src.utils.file_utils import check_directory
 
 
 class DataType(Enum):
@@ -20,29 +27,44 @@ class DataType(Enum):
 
 class JsonDataBase:
     _stored_data: Union[dict, list]
+    _instances: WeakSet["JsonDataBase"] = WeakSet()
+    # 写入失败后重试的间隔(秒)
+    _retry_delay: float = 5
 
-    def __init__(self, file_name: str, data_type: DataType) -> None:
+    def __init__(self, file_name: str, data_type: DataType, write_delay: Optional[float] = None,
+                 backend: Optional[str] = None) -> None:
         """
         类构造函数\n
         Args:
             file_name: 要使用的文件名，应该位于data文件夹下，如果不存在会自动创建
             data_type: 文件内存储的格式 1:str 2:int 3: float 4: list: 5: dict 除了dict外，其他类型均为list存储
+            write_delay: 合并写入的时间窗口(秒)，窗口内的多次写入只会写一次文件，为0时立即写入，默认使用系统配置
+            backend: 持久化方式 snapshot: 每次写入完整文件 journal: 追加写入修改记录并定期合并，默认使用系统配置
         """
         self._data_path: str = join(getcwd(), "data")
         self._data_type: DataType = DataType(data_type)
+        self._write_delay: float = sys_config.json_database.write_delay if write_delay is None else write_delay
+        self._write_handle: Optional[TimerHandle] = None
+        self._dirty: bool = False
+        JsonDataBase._instances.add(self)
         check_directory(self._data_path, create_if_not_exist=True)
         self._data_file_path: str = join(self._data_path, file_name)
-        if check_file(self._data_file_path):
-            self._stored_data = read_json(self._data_file_path, skip_file_check=True)
+        self._storage: JsonStorage = self._create_storage(backend or sys_config.json_database.backend)
+        if self._storage.exists():
+            self._stored_data = self._storage.load()
             if self._stored_data is None:
                 self._stored_data = {}
             return
-        if DataType(data_type) == DataType.DICT:
-            write_json(self._data_file_path, {})
-            self._stored_data = {}
-            return
-        write_json(self._data_file_path, [])
-        self._stored_data = []
+        self._stored_data = {} if DataType(data_type) == DataType.DICT else []
+        self._storage.save(self._stored_data)
+
+    def _create_storage(self, backend: str) -> JsonStorage:
+        match backend:
+            case "snapshot":
+                return SnapshotStorage(self._data_file_path)
+            case "journal":
+                return JournalStorage(self._data_file_path, sys_config.json_database.journal_compact_threshold)
+        raise ValueError(f"不支持的持久化方式: {backend}")
 
     def edit_data(self, data: Union[str, int, float, list, dict], target: Optional[str] = None,
                   del_data: bool = False) -> bool:
@@ -52,12 +74,13 @@ class JsonDataBase:
         int float str list 四种存储类型无target属性，只有一层深度，均有delData属性\n
         dict 存储类型有target属性，当第一层为list类型时有delData属性\n
         注意，dict套dict时仅支持传入dict类型的参数进行修改，其他参数将会抛出错误\n
+        修改会立即写入文件(不经过write_delay合并)，写入失败时撤销本次修改\n
         Args:
             data: 要修改或删除的数据
             target: 要修改的键名，仅当存储类型为dict的时候需要传入
             del_data: 是否为删除模式，当存储类型为dict以外的四种类型或存储类型为dict且target下为list类型时生效
         Return:
-            bool: True 成功  False 失败
+            bool: True 成功写入文件  False 修改或写入失败，数据保持修改前的状态
         """
 
         def edit() -> None:
@@ -81,23 +104,23 @@ class JsonDataBase:
                         return
                     raise RuntimeError("不支持此类修改")
 
-        backup_data = self._stored_data
+        backup_data = deepcopy(self._stored_data)
         if self.is_dict:
             edit()
             try:
-                self.write_data()
+                self._save()
                 return True
-            except:
+            except Exception as e:
+                logger.error(f"Failed to save file {self._data_file_path}: {e}")
                 self._stored_data = backup_data
-                self.write_data()
                 return False
         try:
             self._stored_data.remove(data) if del_data else self._stored_data.append(data)
-            self.write_data()
+            self._save()
             return True
-        except:
+        except Exception as e:
+            logger.error(f"Failed to edit file {self._data_file_path}: {e!r}")
             self._stored_data = backup_data
-            self.write_data()
             return False
 
     def reload_data(self) -> None:
@@ -105,14 +128,65 @@ class JsonDataBase:
         重新从文件加载数据\n
         """
         logger.trace(f"Reload file {self._data_file_path}")
-        self._stored_data = read_json(self._data_file_path)
+        self.flush()
+        self._stored_data = self._storage.load()
 
     def write_data(self) -> None:
         """
         将本地缓存的内容写入文件\n
+        在事件循环中调用时，会在write_delay秒后合并写入，否则立即写入\n
+        写入失败的修改会保留并在稍后重试，直到写入成功\n
+        """
+        self._dirty = True
+        if self._write_delay <= 0:
+            self._write_now()
+            return
+        try:
+            loop = get_running_loop()
+        except RuntimeError:
+            self._write_now()
+            return
+        if self._write_handle is None:
+            self._write_handle = loop.call_later(self._write_delay, self._write_now)
+
+    def _save(self) -> None:
+        """
+        立即写入文件，失败时抛出异常且不改变待写入状态\n
+        """
+        self._storage.save(self._stored_data)
+        self._dirty = False
+        if self._write_handle is not None:
+            self._write_handle.cancel()
+            self._write_handle = None
+
+    def _write_now(self) -> None:
+        if self._write_handle is not None:
+            self._write_handle.cancel()
+            self._write_handle = None
+        try:
+            self._save()
+        except Exception as e:
+            logger.error(f"Failed to save file {self._data_file_path}, retry later: {e}")
+            try:
+                self._write_handle = get_running_loop().call_later(self._retry_delay, self._write_now)
+            except RuntimeError:
+                # 不在事件循环中时由下一次写入或flush重试
+                pass
+
+    def flush(self) -> None:
+        """
+        立即写入尚未写入文件的修改\n
         """
-        logger.trace(f"Save file {self._data_file_path}")
-        write_json(self._data_file_path, self._stored_data)
+        if self._dirty:
+            self._write_now()
+
+    @classmethod
+    def flush_all(cls, *_, **__) -> None:
+        """
+        写入所有实例尚未写入文件的修改\n
+        """
+        for instance in list(cls._instances):
+            instance.flush()
 
     def query_data(self, data: Union[str, int, float, list, dict], target: Optional[str] = None) -> bool:
         """
@@ -154,3 +228,8 @@ class JsonDataBase:
     @property
     def stored_data(self) -> dict:
         return self._stored_data
+
+
+event_bus.subscribe(ServerEvent.STOPPING, JsonDataBase.flush_all, weight=10)
+# 直接退出进程时(如/bot restart)不会发布STOPPING事件
+register(JsonDataBase.flush_all)
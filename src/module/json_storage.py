@@ -0,0 +1,191 @@
+from abc import ABC, abstractmethod
+from copy import deepcopy
+from json import JSONDecodeError, dumps, loads
+from os import fsync, remove
+from os.path import exists, getsize
+from typing import Any, Optional, Union
+
+from src.base.logger import logger
+from src.exception.exception import JsonFileDamagedError
+from src.utils.json_utils import dump_json, read_json, write_file_atomic
+
+JsonData = Union[dict, list]
+
+
+class JsonStorage(ABC):
+    """
+    JsonDataBase的持久化方式
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self._file_path = file_path
+
+    @abstractmethod
+    def exists(self) -> bool:
+        """
+        文件是否已经存在
+        """
+
+    @abstractmethod
+    def load(self) -> Optional[JsonData]:
+        """
+        从文件加载数据，文件损坏时返回None，损坏且写入会丢失数据时抛出JsonFileDamagedError
+        """
+
+    @abstractmethod
+    def save(self, data: JsonData) -> None:
+        """
+        将数据写入文件，数据没有变化时不写入
+        """
+
+
+class SnapshotStorage(JsonStorage):
+    """
+    每次写入都将全部数据写入文件
+    """
+
+    def __init__(self, file_path: str) -> None:
+        super().__init__(file_path)
+        self._last_content: Optional[str] = None
+
+    def exists(self) -> bool:
+        return exists(self._file_path) or exists(JournalStorage.journal_path(self._file_path))
+
+    def load(self) -> Optional[JsonData]:
+        self._last_content = None
+        if exists(JournalStorage.journal_path(self._file_path)):
+            # 从日志模式切换回来时，先合并残留的日志
+            # 快照损坏时抛出异常并保留日志，避免之后的写入用空数据覆盖快照
+            journal = JournalStorage(self._file_path)
+            data = journal.load()
+            journal.compact(data)
+            remove(journal.journal_path(self._file_path))
+            return data
+        return read_json(self._file_path, skip_file_check=True)
+
+    def save(self, data: JsonData) -> None:
+        content = dump_json(self._file_path, data)
+        if content == self._last_content:
+            logger.trace(f"File {self._file_path} unchanged, skip")
+            return
+        logger.trace(f"Save file {self._file_path}")
+        write_file_atomic(self._file_path, content)
+        self._last_content = content
+
+
+class JournalStorage(JsonStorage):
+    """
+    以追加日志的方式写入修改
+
+    数据由快照文件和日志文件组成，每次写入只将与上次写入相比发生变化的路径以一行紧凑的json追加到日志中，
+    日志记录数超过 compact_threshold 或日志比快照更大时，将全部数据写入快照并清空日志。
+    加载时读取快照并按顺序重放日志，日志末尾不完整的记录会被丢弃
+
+    日志记录格式::
+
+        {"op": "set", "path": ["a", "b"], "value": 1}
+        {"op": "del", "path": ["a", "c"]}
+
+    :param file_path: 快照文件路径，日志文件为快照文件路径加上.journal后缀
+    :param compact_threshold: 触发合并的日志记录数
+    """
+
+    def __init__(self, file_path: str, compact_threshold: int = 1000) -> None:
+        super().__init__(file_path)
+        self._journal_path = self.journal_path(file_path)
+        self._compact_threshold = compact_threshold
+        self._last_data: Optional[JsonData] = None
+        self._records: int = 0
+
+    @staticmethod
+    def journal_path(file_path: str) -> str:
+        return f"{file_path}.journal"
+
+    def exists(self) -> bool:
+        return exists(self._file_path) or exists(self._journal_path)
+
+    @staticmethod
+    def _diff(old: Any, new: Any, path: list, records: list[dict]) -> None:
+        if not isinstance(old, dict) or not isinstance(new, dict):
+            if old != new:
+                records.append({"op": "set", "path": path, "value": new})
+            return
+        for key in old.keys() - new.keys():
+            records.append({"op": "del", "path": [*path, key]})
+        for key, value in new.items():
+            if key not in old:
+                records.append({"op": "set", "path": [*path, key], "value": value})
+            else:
+                JournalStorage._diff(old[key], value, [*path, key], records)
+
+    @staticmethod
+    def _apply(data: JsonData, record: dict) -> JsonData:
+        path = record["path"]
+        if not path:
+            return record["value"] if record["op"] == "set" else {}
+        target = data
+        for key in path[:-1]:
+            child = target.get(key)
+            if not isinstance(child, dict):
+                child = target[key] = {}
+            target = child
+        if record["op"] == "set":
+            target[path[-1]] = record["value"]
+        else:
+            target.pop(path[-1], None)
+        return data
+
+    def load(self) -> JsonData:
+        data = read_json(self._file_path, skip_file_check=True) if exists(self._file_path) else {}
+        if data is None:
+            # 此时写入会先合并为空快照并清空日志，导致全部数据丢失
+            raise JsonFileDamagedError(f"{self._file_path}已损坏，为避免日志被清空，请修复后再启动")
+        self._records = 0
+        if exists(self._journal_path):
+            with open(self._journal_path, "r", encoding="utf-8") as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = loads(line)
+                    except JSONDecodeError:
+                        # 只有最后一行可能因写入中断而不完整
+                        logger.warning(f"Journal {self._journal_path} broken at line {line_number}, "
+                                       f"discard the rest")
+                        break
+                    data = self._apply(data, record)
+                    self._records += 1
+        self._last_data = deepcopy(data)
+        return data
+
+    def compact(self, data: JsonData) -> None:
+        """
+        将全部数据写入快照并清空日志
+        """
+        logger.trace(f"Compact journal {self._journal_path}")
+        write_file_atomic(self._file_path, dump_json(self._file_path, data))
+        # 快照写入后、日志清空前崩溃时，重放日志得到的结果与快照一致
+        with open(self._journal_path, "w", encoding="utf-8"):
+            pass
+        self._records = 0
+        self._last_data = deepcopy(data)
+
+    def save(self, data: JsonData) -> None:
+        if self._last_data is None:
+            self.compact(data)
+            return
+        records: list[dict] = []
+        self._diff(self._last_data, data, [], records)
+        if not records:
+            logger.trace(f"File {self._file_path} unchanged, skip")
+            return
+        logger.trace(f"Append {len(records)} records to {self._journal_path}")
+        with open(self._journal_path, "a", encoding="utf-8") as f:
+            f.write("".join(f"{dumps(record, ensure_ascii=False, separators=(',', ':'))}\n" for record in records))
+            f.flush()
+            fsync(f.fileno())
+        self._records += len(records)
+        self._last_data = deepcopy(data)
+        if self._records >= self._compact_threshold or (
+                exists(self._file_path) and getsize(self._journal_path) > getsize(self._file_path)):
+            self.compact(data)
@@ -0,0 +1,191 @@
+from asyncio import Task, create_task, sleep
+from collections import deque
+from datetime import datetime
+from os import getcwd
+from os.path import relpath
+from sys import _current_frames
+from threading import Event, Lock, Thread, get_ident
+from time import monotonic
+from traceback import extract_stack, format_list
+from types import FrameType
+from typing import Any, Optional
+
+from src.base.config import sys_config
+from src.base.event_bus import event_bus
+from src.base.logger import logger
+from src.bus.event.event import ServerEvent
+
+
+class BlockingRecord:
+    """
+    阻塞事件循环的代码位置及其统计
+    """
+
+    def __init__(self, location: str, stack: str) -> None:
+        self.location = location
+        self.stack = stack
+        self.count: int = 0
+        self.max_lag: float = 0
+        self.total_lag: float = 0
+        self.last_seen: Optional[datetime] = None
+
+    def statistics(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "max_lag": self.max_lag * 1000,
+            "avg_lag": self.total_lag / self.count * 1000 if self.count else 0,
+            "last_seen": self.last_seen,
+            "stack": self.stack
+        }
+
+
+class LoopMonitor:
+    """
+    事件循环延迟监控
+
+    事件循环中的心跳协程每隔 interval 秒记录一次实际唤醒时间与预期时间的差值作为延迟；
+    另一个监视线程在心跳超过 threshold 秒没有更新时采样事件循环所在线程的调用栈，
+    记录阻塞发生的位置，心跳恢复后将本次的延迟计入该位置。
+    只保留延迟最大的 max_records 个位置
+    """
+    _heartbeat_task: Optional[Task] = None
+    _watchdog: Optional[Thread] = None
+    _stop: Event = Event()
+    _lock: Lock = Lock()
+    _loop_thread_id: int = 0
+    _last_beat: float = 0
+    _sampled_beat: float = 0
+    _pending: Optional[BlockingRecord] = None
+    _samples: deque[float] = deque(maxlen=1200)
+    _max_lag: float = 0
+    _blocked_count: int = 0
+    _records: dict[str, BlockingRecord] = {}
+
+    @staticmethod
+    def _locate(frame: FrameType) -> tuple[str, str]:
+        """
+        Returns:
+            (阻塞位置, 调用栈)，阻塞位置优先使用项目内最深的一帧
+        """
+        stack = extract_stack(frame)
+        cwd = getcwd()
+        location = stack[-1]
+        for summary in reversed(stack):
+            path = relpath(summary.filename, cwd)
+            if not path.startswith("..") and "site-packages" not in path:
+                location = summary
+                break
+        return (f"{relpath(location.filename, cwd)}:{location.lineno} in {location.name}",
+                "".join(format_list(stack[-15:])))
+
+    @classmethod
+    def _sample(cls, stalled: float) -> None:
+        frame = _current_frames().get(cls._loop_thread_id)
+        if frame is None:
+            return
+        location, stack = cls._locate(frame)
+        logger.warning(f"Event loop blocked for {stalled * 1000:.0f}ms at {location}\n{stack}")
+        with cls._lock:
+            record = cls._records.get(location)
+            if record is None:
+                record = cls._records[location] = BlockingRecord(location, stack)
+            record.stack = stack
+            cls._pending = record
+
+    @classmethod
+    def _watch(cls) -> None:
+        interval = sys_config.loop_monitor.interval
+        threshold = sys_config.loop_monitor.threshold
+        while not cls._stop.wait(min(interval, threshold) / 2):
+            last_beat = cls._last_beat
+            stalled = monotonic() - last_beat - interval
+            # 同一次阻塞只采样一次
+            if stalled >= threshold and last_beat != cls._sampled_beat:
+                cls._sampled_beat = last_beat
+                cls._sample(stalled)
+
+    @classmethod
+    def _record_lag(cls, lag: float) -> None:
+        cls._samples.append(lag)
+        cls._max_lag = max(cls._max_lag, lag)
+        if lag < sys_config.loop_monitor.threshold:
+            return
+        cls._blocked_count += 1
+        with cls._lock:
+            record, cls._pending = cls._pending, None
+            if record is None:
+                return
+            record.count += 1
+            record.max_lag = max(record.max_lag, lag)
+            record.total_lag += lag
+            record.last_seen = datetime.now()
+            if len(cls._records) > sys_config.loop_monitor.max_records:
+                smallest = min(cls._records.values(), key=lambda item: item.max_lag)
+                del cls._records[smallest.location]
+
+    @classmethod
+    async def _heartbeat(cls) -> None:
+        interval = sys_config.loop_monitor.interval
+        while True:
+            start = monotonic()
+            cls._last_beat = start
+            await sleep(interval)
+            cls._record_lag(max(monotonic() - start - interval, 0))
+
+    @classmethod
+    def start(cls, *_, **__) -> None:
+        """
+        启动监控，必须在事件循环中调用，重复调用不会产生影响
+        """
+        if not sys_config.loop_monitor.enable or cls._heartbeat_task is not None:
+            return
+        cls._loop_thread_id = get_ident()
+        cls._last_beat = monotonic()
+        cls._heartbeat_task = create_task(cls._heartbeat())
+        cls._stop.clear()
+        cls._watchdog = Thread(target=cls._watch, name="loop_monitor", daemon=True)
+        cls._watchdog.start()
+        logger.debug("Loop monitor started")
+
+    @classmethod
+    def stop(cls, *_, **__) -> None:
+        if cls._heartbeat_task is None:
+            return
+        cls._heartbeat_task.cancel()
+        cls._heartbeat_task = None
+        cls._stop.set()
+        cls._watchdog = None
+        logger.debug("Loop monitor stopped")
+
+    @classmethod
+    def statistics(cls) -> dict[str, float]:
+        """
+        获取事件循环延迟的统计信息
+        Returns:
+            最近的平均延迟、P99延迟、历史最大延迟(ms)以及超过阈值的次数
+        """
+        samples = sorted(cls._samples)
+        return {
+            "avg_lag": sum(samples) / len(samples) * 1000 if samples else 0,
+            "p99_lag": samples[int(len(samples) * 0.99)] * 1000 if samples else 0,
+            "max_lag": cls._max_lag * 1000,
+            "blocked_count": cls._blocked_count
+        }
+
+    @classmethod
+    def worst_offenders(cls, limit: int = 10) -> list[tuple[str, dict[str, Any]]]:
+        """
+        获取造成延迟最大的代码位置
+        Args:
+            limit: 最多返回的数量
+        Returns:
+            按最大延迟降序排列的 (阻塞位置, 统计信息)
+        """
+        with cls._lock:
+            records = sorted((record for record in cls._records.values() if record.count),
+                             key=lambda item: item.max_lag, reverse=True)
+            return [(record.location, record.statistics()) for record in records[:limit]]
+
+
+event_bus.subscribe(ServerEvent.STARTED, LoopMonitor.start)
+event_bus.subscribe(ServerEvent.STOPPING, LoopMonitor.stop)
@@ -0,0 +1,87 @@
+from typing import Optional
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+
+from src.base.config import sys_config
+from src.base.logger import logger
+from src.element.response import Response
+
+
+class McsmApiClient:
+    """
+    MCSM API 异步客户端
+
+    所有请求共享同一个连接池，连接在请求结束后保持一段时间以便复用，
+    连接池大小即为同时进行的最大请求数
+    """
+
+    def __init__(self, api_url: str, api_key: str, enable_ssl: bool = False) -> None:
+        """
+        Args:
+            api_url: API地址，以/api结尾
+            api_key: API 接口密钥
+            enable_ssl: 是否校验ssl证书
+        """
+        self._api_url = api_url
+        self._api_key = api_key
+        self._enable_ssl = enable_ssl
+        self._session: Optional[ClientSession] = None
+
+    def build_url(self, path: str) -> str:
+        """
+        拼接API路径，path可以带或不带/api前缀
+        """
+        if path.startswith("/api"):
+            return f"{self._api_url}{path[4:]}"
+        if path.startswith("api"):
+            return f"{self._api_url}{path[3:]}"
+        if path.startswith("/"):
+            return f"{self._api_url}{path}"
+        return f"{self._api_url}/{path}"
+
+    def build_params(self, params: Optional[dict] = None) -> dict:
+        """
+        在请求参数中加入apikey
+        """
+        param = {
+            "apikey": self._api_key
+        }
+        if params is not None:
+            if not isinstance(params, dict):
+                raise ValueError("请求参数错误！")
+            param.update(params)
+        return param
+
+    def _get_session(self) -> ClientSession:
+        if self._session is None or self._session.closed:
+            connector = TCPConnector(limit=sys_config.mcsm.connection_limit,
+                                     keepalive_timeout=sys_config.mcsm.keepalive_timeout,
+                                     ssl=self._enable_ssl)
+            timeout = ClientTimeout(total=sys_config.mcsm.request_timeout,
+                                    connect=sys_config.mcsm.connect_timeout)
+            self._session = ClientSession(connector=connector, timeout=timeout,
+                                          headers={"Content-Type": "application/json; charset=utf-8"})
+        return self._session
+
+    async def call_api(self, path: str, params: Optional[dict] = None) -> Optional[Response]:
+        """
+        对API发起异步请求
+        Args:
+            path: api路径
+            params: 需要在请求中额外添加的参数（除apikey以外的参数）
+        Returns:
+            API返回的内容，请求失败时返回None
+        """
+        url = self.build_url(path)
+        param = self.build_params(params)
+        logger.trace(f"HTTP请求：GET {url}")
+        try:
+            async with self._get_session().get(url, params=param) as res:
+                return Response(await res.json(content_type=None))
+        except (ClientError, TimeoutError, ValueError) as e:
+            logger.error(f"HTTP请求失败：GET {url} {e!r}")
+
+    async def close(self, *_, **__) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
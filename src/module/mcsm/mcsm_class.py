@@ -7,11 +7,14 @@ from typing import Optional
 from requests import get
 
 from src.base.config import main_config, sys_config
+from src.base.event_bus import event_bus
 from src.base.logger import logger
+from src.bus.event.event import ServerEvent
 from src.element.response import Response
 from src.element.result import Result
 from src.exception.exception import IncomingParametersError
 from src.module.json_database import DataType, JsonDataBase
+from src.module.mcsm.mcsm_api_client import McsmApiClient
 from src.module.mcsm.mcsm_info_database_manager import McsmInfoDatabaseManager
 from src.module.mcsm.mcsm_info_json_manager import McsmInfoJsonManager
 from src.module.mcsm.mcsm_info_manager import McsmInfoManager
@@ -25,6 +28,7 @@ class McsmManager(JsonDataBase):
     _enable_SSL: bool = True
     _status_code: list[str] = ["状态未知", "已停止", "停止中", "启动中", "运行中"]
     _info_manager: McsmInfoManager
+    _client: McsmApiClient
 
     def __init__(self, apikey: str, url: str = "http://127.0.0.1:23333", enable_ssl: bool = False,
                  use_database: bool = False) -> None:
@@ -40,6 +44,8 @@ class McsmManager(JsonDataBase):
         self._enable_SSL = False if url.startswith("http://") else enable_ssl
         self._api_url = url if "/api" in url else f"{url}/api"
         self._api_key = apikey
+        self._client = McsmApiClient(self._api_url, self._api_key, self._enable_SSL)
+        event_bus.subscribe(ServerEvent.STOPPING, self._client.close)
         if use_database:
             self._info_manager = McsmInfoDatabaseManager()
         else:
@@ -79,21 +85,8 @@ class McsmManager(JsonDataBase):
         Returns:
             dict: 返回api返回的内容(dict)没有访问成功则抛出异常
         """
-        if path.startswith("/api"):
-            url = f"{self._api_url}{path[4:]}"
-        elif path.startswith("api"):
-            url = f"{self._api_url}{path[3:]}"
-        elif path.startswith("/"):
-            url = f"{self._api_url}{path}"
-        else:
-            url = f"{self._api_url}/{path}"
-        param = {
-            "apikey": self._api_key
-        }
-        if params is not None:
-            if not isinstance(params, dict):
-                raise ValueError("请求参数错误！")
-            param.update(params)
+        url = self._client.build_url(path)
+        param = self._client.build_params(params)
         logger.trace(f"HTTP请求：GET {url}")
         try:
             res = get(url=url, headers={"Content-Type": "application/json; charset=utf-8"},
@@ -102,6 +95,17 @@ class McsmManager(JsonDataBase):
         except OSError as e:
             logger.error(e)
 
+    async def _call_api_async(self, path: str, params: Optional[dict] = None) -> Response:
+        """
+        通过连接池对API发起异步请求\n
+        Args:
+            path: api路径
+            params: 需要在请求中额外添加的参数（除apikey以外的参数）
+        Returns:
+            dict: 返回api返回的内容(dict)没有访问成功则返回None
+        """
+        return await self._client.call_api(path, params)
+
     def get_mcsm_info(self, force_load: bool = False) -> None:
         """
         获取当前面板下所有守护进程UUID以及所有实例名
@@ -112,6 +116,16 @@ class McsmManager(JsonDataBase):
         body = RemoteServices(data.body)
         self._info_manager.update_mcsm_info(body, force_load)
 
+    async def get_mcsm_info_async(self, force_load: bool = False) -> None:
+        """
+        get_mcsm_info的异步版本
+        Args:
+            force_load: 是否强制刷新已储存的uuid
+        """
+        data = await self._call_api_async("service/remote_services")
+        body = RemoteServices(data.body)
+        self._info_manager.update_mcsm_info(body, force_load)
+
     # 第一次封装
     def get_instance_info(self, remote_uuid: str, instance_uuid: str) -> Response:
         """
@@ -122,6 +136,15 @@ class McsmManager(JsonDataBase):
         """
         return self._call_api("/instance", {"uuid": instance_uuid, "remote_uuid": remote_uuid})
 
+    async def get_instance_info_async(self, remote_uuid: str, instance_uuid: str) -> Response:
+        """
+        异步获取实例状态\n
+        Args:
+            remote_uuid: 守护进程uuid
+            instance_uuid: 实例uuid
+        """
+        return await self._call_api_async("/instance", {"uuid": instance_uuid, "remote_uuid": remote_uuid})
+
     def update_instance_status(self, remote_uuid: Optional[str] = None, instance_uuid: Optional[str] = None) -> None:
         """
         刷新所有守护进程的所有实例的运行状态
@@ -142,19 +165,38 @@ class McsmManager(JsonDataBase):
         body = InstanceInfo(data.body)
         self._info_manager.update_instance_status(remote_uuid, instance_uuid, body)
 
-    def start_instance(self, remote_uuid: str, instance_uuid: str) -> Result:
+    async def update_instance_status_async(self, remote_uuid: Optional[str] = None,
+                                           instance_uuid: Optional[str] = None) -> None:
+        """
+        update_instance_status的异步版本
+        Args:
+            remote_uuid: 守护进程uuid，可为空
+            instance_uuid: 实例uuid，可为空
+        """
+        if instance_uuid is None:
+            data = await self._call_api_async("service/remote_services")
+            body = RemoteServices(data.body)
+            self._info_manager.update_remote_status(remote_uuid, body)
+            return
+        if remote_uuid is None:
+            raise RuntimeError("传入参数错误")
+        data = await self.get_instance_info_async(remote_uuid, instance_uuid)
+        body = InstanceInfo(data.body)
+        self._info_manager.update_instance_status(remote_uuid, instance_uuid, body)
+
+    async def start_instance(self, remote_uuid: str, instance_uuid: str) -> Result:
         daemon, server = self._info_manager.check_uuid(remote_uuid, instance_uuid)
         if daemon.is_fail:
             return daemon
         if server.is_fail:
             return server
-        self.update_instance_status(remote_uuid, instance_uuid)
+        await self.update_instance_status_async(remote_uuid, instance_uuid)
         match self._info_manager.get_server_status(daemon.message, instance_uuid):
             case -1:
                 return Result.of_failure("实例状态未知，无法启动")
             case 0:
                 logger.debug(f"启动服务器{server.message}({daemon.message})")
-                res = self._call_api("/protected_instance/open", {"uuid": instance_uuid, "remote_uuid": remote_uuid})
+                res = await self._call_api_async("/protected_instance/open", {"uuid": instance_uuid, "remote_uuid": remote_uuid})
                 if res.success:
                     return Result.of_success("执行成功，实例正在启动")
                 return Result.of_failure(f"实例启动失败，api返回Code: {res.code}")
@@ -165,13 +207,13 @@ class McsmManager(JsonDataBase):
             case 3:
                 return Result.of_failure("实例已在运行")
 
-    def stop_instance(self, remote_uuid: str, instance_uuid: str, force_kill: bool = False) -> Result:
+    async def stop_instance(self, remote_uuid: str, instance_uuid: str, force_kill: bool = False) -> Result:
         daemon, server = self._info_manager.check_uuid(remote_uuid, instance_uuid)
         if daemon.is_fail:
             return daemon
         if server.is_fail:
             return server
-        self.update_instance_status(remote_uuid, instance_uuid)
+        await self.update_instance_status_async(remote_uuid, instance_uuid)
         match self._info_manager.get_server_status(daemon.message, instance_uuid):
             case -1:
                 return Result.of_failure("实例状态未知，无法启动")
@@ -185,23 +227,23 @@ class McsmManager(JsonDataBase):
                     return Result.of_failure("实例正在启动中，无法关闭")
         if force_kill:
             logger.debug(f"强制关闭实例{server.message}({daemon.message})")
-            res = self._call_api("/protected_instance/kill", {"uuid": instance_uuid, "remote_uuid": remote_uuid})
+            res = await self._call_api_async("/protected_instance/kill", {"uuid": instance_uuid, "remote_uuid": remote_uuid})
             if res.success:
                 return Result.of_success("执行成功，强制关闭实例")
             return Result.of_failure(f"强制关闭实例失败，api返回Code: {res.code}")
         logger.debug(f"关闭实例{server.message}({daemon.message})")
-        res = self._call_api("/protected_instance/stop", {"uuid": instance_uuid, "remote_uuid": remote_uuid})
+        res = await self._call_api_async("/protected_instance/stop", {"uuid": instance_uuid, "remote_uuid": remote_uuid})
         if res.success:
             return Result.of_success("执行成功，实例正在关闭")
         return Result.of_failure(f"关闭实例失败，api返回Code: {res.code}")
 
-    def restart_instance(self, remote_uuid: str, instance_uuid: str) -> Result:
+    async def restart_instance(self, remote_uuid: str, instance_uuid: str) -> Result:
         daemon, server = self._info_manager.check_uuid(remote_uuid, instance_uuid)
         if daemon.is_fail:
             return daemon
         if server.is_fail:
             return server
-        self.update_instance_status(remote_uuid, instance_uuid)
+        await self.update_instance_status_async(remote_uuid, instance_uuid)
         match self._info_manager.get_server_status(daemon.message, instance_uuid):
             case -1:
                 return Result.of_failure("实例状态未知，无法重启")
@@ -213,21 +255,21 @@ class McsmManager(JsonDataBase):
                 return Result.of_failure("实例正在启动中，无法重启")
             case 3:
                 logger.debug(f"重启实例{server.message}({daemon.message})")
-                res = self._call_api("/protected_instance/restart", {"uuid": instance_uuid, "remote_uuid": remote_uuid})
+                res = await self._call_api_async("/protected_instance/restart", {"uuid": instance_uuid, "remote_uuid": remote_uuid})
                 if res.success:
                     return Result.of_success("执行成功，实例正在重启")
                 return Result.of_failure(f"重启实例失败，api返回Code: {res.code}")
 
-    def _command(self, instance_uuid: str, remote_uuid: str, command: str) -> float:
-        res = self._call_api("/protected_instance/command", {
+    async def _command(self, instance_uuid: str, remote_uuid: str, command: str) -> float:
+        res = await self._call_api_async("/protected_instance/command", {
             "remote_uuid": remote_uuid,
             "uuid": instance_uuid,
             "command": command
         })
         return res.timestamp / 1000
 
-    def _get_command_output(self, instance_uuid: str, remote_uuid: str, time_stamp: float) -> Result:
-        data = self._call_api("/api/protected_instance/outputlog", {
+    async def _get_command_output(self, instance_uuid: str, remote_uuid: str, time_stamp: float) -> Result:
+        data = await self._call_api_async("/api/protected_instance/outputlog", {
             "remote_uuid": remote_uuid,
             "uuid": instance_uuid,
             "size": 10240
@@ -249,7 +291,7 @@ class McsmManager(JsonDataBase):
         return Result.of_success(res)
 
     # 第二次封装
-    def check_instance_status(self, instance_name: str, remote_name: str = None) -> Result:
+    async def check_instance_status(self, instance_name: str, remote_name: str = None) -> Result:
         daemon, server = self._info_manager.check_name(remote_name, instance_name)
         if server.is_fail:
             return server
@@ -261,7 +303,7 @@ class McsmManager(JsonDataBase):
             if daemon.is_fail:
                 return daemon
             remote_uuid = daemon.message
-        self.update_instance_status(remote_uuid, instance_uuid)
+        await self.update_instance_status_async(remote_uuid, instance_uuid)
         return Result.of_success(f"守护进程名称: {remote_name}\n"
                                  f"实例名称: {instance_name}\n"
                                  f"实例状态: {self._info_manager.status(self._info_manager.get_server_status(remote_name, instance_uuid))}")
@@ -272,24 +314,24 @@ class McsmManager(JsonDataBase):
             return server
         remote_uuid = self._info_manager.get_remote_uuid_by_instance_name(instance_name).message
         instance_uuid = server.message
-        self.update_instance_status(remote_uuid, instance_uuid)
+        await self.update_instance_status_async(remote_uuid, instance_uuid)
         status = self._info_manager.get_server_status(self._info_manager.is_daemon_uuid(remote_uuid).message,
                                                       instance_uuid)
         if status != 3:
             return Result.of_failure(f"实例当前状态是:{self._info_manager.status(status)},无法执行命令")
-        time_stamp = self._command(instance_uuid, remote_uuid, command)
+        time_stamp = await self._command(instance_uuid, remote_uuid, command)
         await sleep(1)
-        return self._get_command_output(instance_uuid, remote_uuid, time_stamp)
+        return await self._get_command_output(instance_uuid, remote_uuid, time_stamp)
 
-    def list_instance(self, remote_name: str = None) -> Result:
+    async def list_instance(self, remote_name: str = None) -> Result:
         if remote_name is None:
-            self.update_instance_status()
+            await self.update_instance_status_async()
             return self._info_manager.list_all_instances()
         daemon, _ = self._info_manager.check_name(remote_name)
         if daemon.is_fail:
             return daemon
         remote_uuid = daemon.message
-        self.update_instance_status(remote_uuid)
+        await self.update_instance_status_async(remote_uuid)
         return self._info_manager.list_remote_instances(remote_uuid, remote_name)
 
     def rename(self, original_name: str, new_name: str) -> Result:
@@ -308,7 +350,7 @@ class McsmManager(JsonDataBase):
             return self._info_manager.rename_remote(original_name, new_name)
         return self._info_manager.rename_instance(original_name, new_name)
 
-    def stop(self, instance_name: str, remote_name: str = None, force_kill: bool = False) -> Result:
+    async def stop(self, instance_name: str, remote_name: str = None, force_kill: bool = False) -> Result:
         daemon, server = self._info_manager.check_name(remote_name, instance_name)
         if server.is_fail:
             return server
@@ -319,9 +361,9 @@ class McsmManager(JsonDataBase):
             remote_uuid = daemon.message
         else:
             remote_uuid = self._info_manager.get_remote_uuid_by_instance_name(instance_name).message
-        return self.stop_instance(remote_uuid, instance_uuid, force_kill)
+        return await self.stop_instance(remote_uuid, instance_uuid, force_kill)
 
-    def start(self, instance_name: str, remote_name: str = None) -> Result:
+    async def start(self, instance_name: str, remote_name: str = None) -> Result:
         daemon, server = self._info_manager.check_name(remote_name, instance_name)
         if server.is_fail:
             return server
@@ -332,9 +374,9 @@ class McsmManager(JsonDataBase):
             remote_uuid = daemon.message
         else:
             remote_uuid = self._info_manager.get_remote_uuid_by_instance_name(instance_name).message
-        return self.start_instance(remote_uuid, instance_uuid)
+        return await self.start_instance(remote_uuid, instance_uuid)
 
-    def restart(self, instance_name: str, remote_name: str = None) -> Result:
+    async def restart(self, instance_name: str, remote_name: str = None) -> Result:
         daemon, server = self._info_manager.check_name(remote_name, instance_name)
         if server.is_fail:
             return server
@@ -345,14 +387,15 @@ class McsmManager(JsonDataBase):
             remote_uuid = daemon.message
         else:
             remote_uuid = self._info_manager.get_remote_uuid_by_instance_name(instance_name).message
-        return self.restart_instance(remote_uuid, instance_uuid)
+        return await self.restart_instance(remote_uuid, instance_uuid)
 
-    def status(self) -> Result:
+    async def status(self) -> Result:
         daemon, instance = self._info_manager.get_number()
+        response = await self._call_api_async("overview")
         return Result.of_success((f"Mcsm:\n "
                                   f"\t状态：{'已启用' if sys_config.mcsm.enable else '未启用'}\n"
                                   f"\t数据引擎: {main_config.database.type}\n"
-                                  f"\tAPI状态: {'正常' if self.test_connect() else '异常'}\n"
+                                  f"\tAPI状态: {'正常' if response is not None and response.success else '异常'}\n"
                                   f"\t数据引擎状态: {'正常' if self._info_manager.test() else '异常'}\n"
                                   f"\t守护进程数量: {daemon}\n"
                                   f"\t实例数量: {instance}\n"))
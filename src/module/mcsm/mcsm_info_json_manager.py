@@ -12,13 +12,31 @@ from src.type.response_body import InstanceInfo, RemoteServices
 class McsmInfoJsonManager(McsmInfoManager, JsonDataBase):
     _daemon_uuid: bidict
     _server: Dict[str, Union[bidict, dict]]
+    # 实例名称 -> (守护进程uuid, 实例uuid)
+    _instance_index: Dict[str, tuple[str, str]]
+    # 实例uuid -> 实例名称
+    _instance_name: Dict[str, str]
 
     def __init__(self):
         JsonDataBase.__init__(self, "mcsm.json", DataType.DICT)
 
+    def _rebuild_index(self) -> None:
+        """
+        根据_server重建实例的全局索引，实例名称重复时保留最先出现的实例
+        """
+        instance_index: Dict[str, tuple[str, str]] = {}
+        instance_name: Dict[str, str] = {}
+        for daemon_uuid, servers in self._server.items():
+            for name, uuid in servers.items():
+                instance_index.setdefault(name, (daemon_uuid, uuid))
+                instance_name.setdefault(uuid, name)
+        self._instance_index = instance_index
+        self._instance_name = instance_name
+
     def test(self) -> bool:
         try:
-            self.write_data()
+            # write_data只会安排延迟写入，需要同步写入才能得知是否成功
+            self._save()
             return True
         except Exception as _:
             return False
@@ -85,6 +103,7 @@ class McsmInfoJsonManager(McsmInfoManager, JsonDataBase):
             self._server = dict(self._stored_data["servers"])
             for k, v in self._server.items():
                 self._server[k] = bidict(v)
+            self._rebuild_index()
         except Exception as e:
             logger.error("MCSM初始化失败")
             logger.error(e)
@@ -102,10 +121,8 @@ class McsmInfoJsonManager(McsmInfoManager, JsonDataBase):
         return Result.of_failure(f"{name}不是一个有效的守护进程名称")
 
     def is_server_name(self, name: str) -> Result:
-        for k, v in self._server.items():
-            for k_, v_ in v.items():
-                if k_ == name:
-                    return Result.of_success(v_)
+        if name in self._instance_index:
+            return Result.of_success(self._instance_index[name][1])
         return Result.of_failure(f"{name}不是一个有效的实例名称")
 
     def is_daemon_uuid(self, uuid: str) -> Result:
@@ -114,17 +131,13 @@ class McsmInfoJsonManager(McsmInfoManager, JsonDataBase):
         return Result.of_failure(f"{uuid}不是一个有效的守护进程UUID")
 
     def is_server_uuid(self, uuid: str) -> Result:
-        for k, v in self._server.items():
-            for k_, v_ in v.inverse.items():
-                if k_ == uuid:
-                    return Result.of_success(v_)
+        if uuid in self._instance_name:
+            return Result.of_success(self._instance_name[uuid])
         return Result.of_failure(f"{uuid}不是一个有效的实例UUID")
 
     def get_remote_uuid_by_instance_name(self, name: str) -> Result:
-        for k, v in self._server.items():
-            for k_, v_ in v.items():
-                if k_ == name:
-                    return Result.of_success(k)
+        if name in self._instance_index:
+            return Result.of_success(self._instance_index[name][0])
         return Result.of_failure(f"{name}不是一个有效的实例名称")
 
     def update_remote_status(self, remote_uuid: str, remote_data: RemoteServices) -> None:
@@ -148,6 +161,8 @@ class McsmInfoJsonManager(McsmInfoManager, JsonDataBase):
         server_list = self._stored_data["servers"][daemon_uuid]
         server_list[new_name] = server_list.pop(original_name)
         self._server[daemon_uuid][new_name] = self._server[daemon_uuid].pop(original_name)
+        # 与update_mcsm_info使用相同的重名规则，重命名后同一名称始终指向同一实例
+        self._rebuild_index()
         self.write_data()
         return Result.of_success(f"修改实例名称[{original_name}] -> [{new_name}]")
 
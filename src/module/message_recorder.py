@@ -0,0 +1,154 @@
+from asyncio import Lock, Task, create_task, to_thread
+from collections import deque
+from threading import Lock as ThreadLock
+from time import perf_counter
+from typing import Optional
+
+from src.base.config import sys_config
+from src.base.event_bus import event_bus
+from src.base.logger import logger
+from src.base.scheduler import scheduler
+from src.bus.event.event import ServerEvent
+from src.database.base_model import database
+from src.database.message_model import Message as MessageModel
+from src.element.message import Message
+from src.scheduler.trigger import IntervalTrigger
+from src.utils.model_utils import ModelUtils
+
+
+class MessageRecorder:
+    """
+    消息记录写回队列
+
+    消息先进入内存队列，当队列长度达到 batch_size 或距离上次写入超过 flush_interval 秒时，
+    使用 insert_many 批量写入数据库，避免每条消息都在事件循环中进行一次数据库往返
+    """
+    _queue: deque[MessageModel] = deque()
+    _flush_lock: Lock = Lock()
+    # 保证同一时间只有一个线程写入数据库
+    _write_lock: ThreadLock = ThreadLock()
+    # 已经交给线程池写入、但结果尚未被flush处理的记录
+    _inflight: Optional[list[MessageModel]] = None
+    _flush_task: Optional[Task] = None
+    _flush_count: int = 0
+    _flushed_rows: int = 0
+    _dropped_rows: int = 0
+    _failed_flush: int = 0
+    _last_flush_latency: float = 0
+    _max_flush_latency: float = 0
+    _total_flush_latency: float = 0
+
+    @classmethod
+    def record(cls, message: Message) -> None:
+        """
+        将一条消息加入写回队列，队列满时丢弃最早的记录
+        Args:
+            message: 要记录的消息
+        """
+        if len(cls._queue) >= sys_config.message_record.max_queue_size:
+            cls._queue.popleft()
+            cls._dropped_rows += 1
+        cls._queue.append(ModelUtils.translate_message_to_model(message))
+        if len(cls._queue) >= sys_config.message_record.batch_size and (
+                cls._flush_task is None or cls._flush_task.done()):
+            cls._flush_task = create_task(cls.flush())
+
+    @classmethod
+    def _take_rows(cls) -> list[MessageModel]:
+        rows = list(cls._queue)
+        cls._queue.clear()
+        return rows
+
+    @classmethod
+    def _requeue(cls, rows: list[MessageModel]) -> None:
+        cls._queue.extendleft(reversed(rows))
+        while len(cls._queue) > sys_config.message_record.max_queue_size:
+            cls._queue.popleft()
+            cls._dropped_rows += 1
+
+    @classmethod
+    def _insert_rows(cls, rows: list[MessageModel]) -> None:
+        batch_size = sys_config.message_record.batch_size
+        with database.atomic():
+            for i in range(0, len(rows), batch_size):
+                (MessageModel
+                 .insert_many([row.__data__ for row in rows[i:i + batch_size]])
+                 .on_conflict_ignore()
+                 .execute())
+
+    @classmethod
+    def _write(cls, rows: list[MessageModel]) -> bool:
+        with cls._write_lock:
+            start = perf_counter()
+            try:
+                cls._insert_rows(rows)
+            except Exception as e:
+                cls._failed_flush += 1
+                logger.error(f"Failed to flush {len(rows)} message records: {e}")
+                return False
+            if cls._inflight is rows:
+                cls._inflight = None
+        latency = perf_counter() - start
+        cls._flush_count += 1
+        cls._flushed_rows += len(rows)
+        cls._last_flush_latency = latency
+        cls._total_flush_latency += latency
+        cls._max_flush_latency = max(cls._max_flush_latency, latency)
+        logger.trace(f"Flushed {len(rows)} message records in {latency * 1000:.2f}ms")
+        return True
+
+    @classmethod
+    async def flush(cls) -> None:
+        """
+        在线程池中将队列中的所有消息记录写入数据库，写入失败的记录会被放回队列
+
+        等待写入时被取消不会中断线程中的写入，尚未确认写入的记录由flush_sync接管
+        """
+        async with cls._flush_lock:
+            rows = cls._take_rows()
+            if not rows:
+                return
+            cls._inflight = rows
+            if not await to_thread(cls._write, rows) and cls._inflight is rows:
+                cls._inflight = None
+                cls._requeue(rows)
+
+    @classmethod
+    def flush_sync(cls, *_, **__) -> None:
+        """
+        同步写入队列中的所有消息记录，用于程序退出前\n
+        会先等待线程池中正在进行的写入完成，并重新写入其中未能写入的记录
+        """
+        with cls._write_lock:
+            inflight, cls._inflight = cls._inflight, None
+        rows = (inflight or []) + cls._take_rows()
+        if rows and not cls._write(rows):
+            logger.error(f"{len(rows)} message records lost")
+
+    @classmethod
+    def queue_depth(cls) -> int:
+        return len(cls._queue)
+
+    @classmethod
+    def statistics(cls) -> dict[str, float]:
+        """
+        获取写回队列的统计信息
+        Returns:
+            队列长度、写入次数、写入行数、丢弃行数、失败次数以及写入耗时(ms)
+        """
+        return {
+            "queue_depth": len(cls._queue),
+            "flush_count": cls._flush_count,
+            "flushed_rows": cls._flushed_rows,
+            "dropped_rows": cls._dropped_rows,
+            "failed_flush": cls._failed_flush,
+            "last_flush_latency": cls._last_flush_latency * 1000,
+            "avg_flush_latency": cls._total_flush_latency / cls._flush_count * 1000 if cls._flush_count else 0,
+            "max_flush_latency": cls._max_flush_latency * 1000
+        }
+
+
+scheduler.add_job(MessageRecorder.flush, IntervalTrigger(sys_config.message_record.flush_interval),
+                  name="message_recorder_flush")
+# 必须在数据库连接关闭之前写入剩余的消息记录
+event_bus.subscribe(ServerEvent.STOPPING, MessageRecorder.flush_sync, weight=10)
@@ -0,0 +1,235 @@
+from asyncio import CancelledError, Future, Task, create_task, get_running_loop, wait
+from collections import deque
+from enum import IntEnum
+from time import monotonic
+from typing import Any, Awaitable, Callable, Optional
+
+from satori import Event
+from satori.model import MessageReceipt
+
+from src.base.config import sys_config
+from src.base.event_bus import event_bus
+from src.base.logger import logger
+from src.bus.bus_metrics import LatencyHistogram
+from src.bus.event.event import ServerEvent
+from src.type.types import MessageType
+from src.utils.token_bucket import TokenBucket
+
+Target = str | Event
+Sender = Callable[[Target, MessageType], Awaitable[list[MessageReceipt]]]
+
+
+class OutboundPriority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+
+
+class OutboundItem:
+    __slots__ = ("target", "message", "sender", "coalesce", "future", "enqueued_at")
+
+    def __init__(self, target: Target, message: MessageType, sender: Sender, coalesce: bool) -> None:
+        self.target = target
+        self.message = message
+        self.sender = sender
+        self.coalesce = coalesce
+        self.future: Future[list[MessageReceipt]] = get_running_loop().create_future()
+        self.enqueued_at = monotonic()
+
+    def can_coalesce(self) -> bool:
+        # 发送目标可以是群号或收到的事件，同一队列中的消息属于同一频道，因此只需要检查消息本身
+        return (self.coalesce and isinstance(self.message, str)
+                and len(self.message) <= sys_config.outbound_queue.coalesce_item_length)
+
+
+class ChannelQueue:
+    """
+    单个频道的发送队列，按优先级依次发送，发送速率由令牌桶限制
+    """
+
+    def __init__(self, channel_id: str) -> None:
+        self.channel_id = channel_id
+        self._lanes: dict[OutboundPriority, deque[OutboundItem]] = {priority: deque() for priority in OutboundPriority}
+        self._bucket = TokenBucket(sys_config.outbound_queue.rate, sys_config.outbound_queue.burst)
+        self._worker: Optional[Task] = None
+
+    def __len__(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    @property
+    def worker(self) -> Optional[Task]:
+        return self._worker
+
+    def put(self, item: OutboundItem, priority: OutboundPriority) -> None:
+        self._lanes[priority].append(item)
+        if self._worker is None or self._worker.done():
+            self._worker = create_task(self._run())
+
+    def cancel(self) -> int:
+        """
+        停止发送并取消队列中剩余的消息
+        Returns:
+            被取消的消息数量
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        cancelled = 0
+        for lane in self._lanes.values():
+            while lane:
+                item = lane.popleft()
+                if not item.future.done():
+                    item.future.cancel()
+                    cancelled += 1
+        return cancelled
+
+    def _pop(self) -> Optional[tuple[OutboundItem, deque[OutboundItem]]]:
+        for lane in self._lanes.values():
+            while lane:
+                item = lane.popleft()
+                # 等待发送的协程已被取消
+                if not item.future.done():
+                    return item, lane
+        return None
+
+    @staticmethod
+    def _take_coalesced(first: OutboundItem, lane: deque[OutboundItem]) -> list[OutboundItem]:
+        items = [first]
+        if not first.can_coalesce():
+            return items
+        length = len(first.message)
+        max_length = sys_config.outbound_queue.coalesce_max_length
+        while lane:
+            item = lane[0]
+            if item.future.done():
+                lane.popleft()
+                continue
+            if not item.can_coalesce() or length + 1 + len(item.message) > max_length:
+                break
+            length += 1 + len(item.message)
+            items.append(lane.popleft())
+        return items
+
+    async def _run(self) -> None:
+        while (popped := self._pop()) is not None:
+            try:
+                await self._bucket.acquire()
+            except CancelledError:
+                popped[0].future.cancel()
+                raise
+            # 等待令牌期间进入队列的短消息会合并为一条发送
+            items = self._take_coalesced(*popped)
+            now = monotonic()
+            for item in items:
+                OutboundQueue.record_wait(now - item.enqueued_at)
+            first = items[0]
+            message = "\n".join(item.message for item in items) if len(items) > 1 else first.message
+            try:
+                receipts = await first.sender(first.target, message)
+            except CancelledError:
+                for item in items:
+                    item.future.cancel()
+                raise
+            except Exception as e:
+                OutboundQueue.record_sent(len(items), False)
+                for item in items:
+                    if not item.future.done():
+                        item.future.set_exception(e)
+                continue
+            OutboundQueue.record_sent(len(items), True)
+            for item in items:
+                if not item.future.done():
+                    item.future.set_result(receipts)
+
+
+class OutboundQueue:
+    """
+    发送消息队列
+
+    每个频道拥有独立的队列和令牌桶，同一频道的消息按优先级和进入队列的顺序发送，
+    等待令牌期间积压的连续短文本消息(包括以事件为目标的命令回复)会被合并为一条消息，使用第一条消息的目标发送，被合并的调用方会得到同一个回执，
+    需要使用回执(如引用或等待回复)的调用方应当传入 coalesce=False
+
+    停止时会在 flush_timeout 秒内尽量发送完队列中的消息，之后剩余的消息会被取消
+    """
+    _channels: dict[str, ChannelQueue] = {}
+    _wait_time: LatencyHistogram = LatencyHistogram()
+    _sent_messages: int = 0
+    _sent_items: int = 0
+    _failed: int = 0
+
+    @classmethod
+    async def send(cls, channel_id: str, target: Target, message: MessageType, sender: Sender,
+                   priority: OutboundPriority = OutboundPriority.NORMAL,
+                   coalesce: Optional[bool] = None) -> list[MessageReceipt]:
+        """
+        将消息加入发送队列并等待发送完成
+        Args:
+            channel_id: 频道id，用于选择队列，同一频道的消息即使发送目标不同也可以合并
+            target: 传递给sender的发送目标
+            message: 消息内容
+            sender: 实际发送消息的函数
+            priority: 优先级
+            coalesce: 是否允许与其他短消息合并，为None时使用配置，需要使用回执时应当传入False
+        Returns:
+            消息回执，被合并的消息共享同一个回执(即合并后那条消息的回执)
+        """
+        if coalesce is None:
+            coalesce = sys_config.outbound_queue.coalesce
+        item = OutboundItem(target, message, sender, coalesce)
+        queue = cls._channels.get(channel_id)
+        if queue is None:
+            queue = cls._channels[channel_id] = ChannelQueue(channel_id)
+        queue.put(item, priority)
+        return await item.future
+
+    @classmethod
+    async def flush(cls, *_, **__) -> None:
+        """
+        等待所有队列发送完成，超过flush_timeout秒后取消剩余的消息
+        """
+        workers = [queue.worker for queue in cls._channels.values()
+                   if queue.worker is not None and not queue.worker.done()]
+        if workers:
+            logger.debug(f"Waiting for {cls.queue_depth()} outbound messages")
+            await wait(workers, timeout=sys_config.outbound_queue.flush_timeout)
+        cancelled = sum(queue.cancel() for queue in cls._channels.values())
+        if cancelled:
+            logger.warning(f"Discarded {cancelled} queued outbound messages on shutdown")
+
+    @classmethod
+    def record_wait(cls, wait_time: float) -> None:
+        cls._wait_time.record(wait_time * 1000)
+
+    @classmethod
+    def record_sent(cls, items: int, success: bool) -> None:
+        if not success:
+            cls._failed += 1
+            return
+        cls._sent_messages += 1
+        cls._sent_items += items
+        if items > 1:
+            logger.trace(f"Coalesced {items} messages into one")
+
+    @classmethod
+    def queue_depth(cls) -> int:
+        return sum(len(queue) for queue in cls._channels.values())
+
+    @classmethod
+    def statistics(cls) -> dict[str, Any]:
+        """
+        获取发送队列的统计信息
+        Returns:
+            队列长度、实际发送的消息数、进入队列的消息数、失败次数以及排队时间(ms)
+        """
+        return {
+            "queue_depth": cls.queue_depth(),
+            "sent_messages": cls._sent_messages,
+            "sent_items": cls._sent_items,
+            "failed": cls._failed,
+            "avg_wait": cls._wait_time.total / cls._wait_time.count if cls._wait_time.count else 0,
+            "p99_wait": cls._wait_time.percentile(99),
+            "max_wait": cls._wait_time.max
+        }
+
+
+event_bus.subscribe(ServerEvent.STOPPING, OutboundQueue.flush)
@@ -1,4 +1,6 @@
-from typing import List, Optional, Union
+from copy import deepcopy
+from functools import wraps
+from typing import Callable, Optional, Union
 
 from src.element.permissions import *
 from src.element.result import Result
@@ -6,6 +8,36 @@ from src.module.json_database import DataType, JsonDataBase
 from src.utils.json_utils import read_json
 
 
+def player_mutation(func: Callable) -> Callable:
+    """
+    修改玩家权限数据的方法修饰器，方法执行后使该玩家的权限缓存失效
+    """
+
+    @wraps(func)
+    def wrapper(self: 'PermissionManager', user_id: str, *args, **kwargs):
+        try:
+            return func(self, user_id, *args, **kwargs)
+        finally:
+            self._invalidate_player(user_id)
+
+    return wrapper
+
+
+def group_mutation(func: Callable) -> Callable:
+    """
+    修改权限组数据的方法修饰器，方法执行后使该权限组及所有继承它的权限组和玩家的权限缓存失效
+    """
+
+    @wraps(func)
+    def wrapper(self: 'PermissionManager', group_name: str, *args, **kwargs):
+        try:
+            return func(self, group_name, *args, **kwargs)
+        finally:
+            self._invalidate_group(group_name)
+
+    return wrapper
+
+
 class PermissionManager(JsonDataBase):
     def __init__(self) -> None:
         """
@@ -17,6 +49,14 @@ class PermissionManager(JsonDataBase):
             self._group_permission._stored_data = read_json("permission.json5")
             self._group_permission.write_data()
         self._permission_node_list: str = str(Root.instance)
+        # 编译后的有效权限集合缓存
+        self._player_cache: dict[str, frozenset[str]] = {}
+        self._group_cache: dict[str, frozenset[str]] = {}
+        # 权限组 -> 依赖该权限组的已缓存权限组/玩家，用于精确失效
+        self._group_dependents: dict[str, set[str]] = {}
+        self._group_players: dict[str, set[str]] = {}
+        # 权限节点 -> 从该节点到根节点的路径
+        self._node_path: dict[str, tuple[str, ...]] = {}
 
     def reload_group_permission(self, over_write: bool = False) -> Result:
         """
@@ -27,6 +67,7 @@ class PermissionManager(JsonDataBase):
             返回执行状态
         """
         try:
+            self._clear_cache()
             if over_write:
                 self._group_permission._stored_data = read_json("permission.json5")
                 self._group_permission.write_data()
@@ -55,6 +96,8 @@ class PermissionManager(JsonDataBase):
             return Result.of_success("重载权限组成功")
         except:
             return Result.of_failure("重载权限组失败")
+        finally:
+            self._clear_cache()
 
     def get_group_permission(self, group_name: str) -> list:
         """
@@ -67,12 +110,7 @@ class PermissionManager(JsonDataBase):
         try:
             if group_name not in self._group_permission._stored_data.keys():
                 return []
-            result: list = []
-            if "parent" in self._group_permission._stored_data[group_name].keys():
-                result += self._get_group_permission(self._group_permission._stored_data[group_name]["parent"])
-            if "permission" in self._group_permission._stored_data[group_name].keys():
-                result += self._group_permission._stored_data[group_name]["permission"]
-            return result
+            return sorted(self._compile_group(group_name))
         except:
             return []
 
@@ -87,15 +125,11 @@ class PermissionManager(JsonDataBase):
         try:
             if user_id not in self._stored_data.keys():
                 return []
-            result: list = []
-            if "group" in self._stored_data[user_id].keys():
-                result += self._get_group_permission(self._stored_data[user_id]["group"])
-            if "permission" in self._stored_data[user_id].keys():
-                result += self._stored_data[user_id]["permission"]
-            return result
+            return sorted(self._compile_player(user_id))
         except:
             return []
 
+    @player_mutation
     def add_player_permission(self, user_id: str, permission: str) -> Result:
         """
         向某个玩家添加一个权限节点\n
@@ -123,6 +157,7 @@ class PermissionManager(JsonDataBase):
         except:
             return Result.of_failure(f"向「{user_id}」添加权限「{permission}」失败")
 
+    @player_mutation
     def remove_player_permission(self, user_id: str, permission: str) -> Result:
         """
         移除某个玩家的某个权限节点\n
@@ -162,8 +197,7 @@ class PermissionManager(JsonDataBase):
         try:
             if user_id not in self._stored_data.keys():
                 return Result.of_failure()
-            data: list = self.get_player_permission(user_id)
-            return Result(self._check_permission(data, permission))
+            return Result(self._check_permission(self._compile_player(user_id), permission))
         except:
             return Result.of_failure()
 
@@ -179,11 +213,13 @@ class PermissionManager(JsonDataBase):
         try:
             if from_id not in self._stored_data.keys():
                 return Result.of_failure(f"无法查询到「{from_id}」的权限记录")
-            self._stored_data[to_id] = self._stored_data[from_id]
+            self._stored_data[to_id] = deepcopy(self._stored_data[from_id])
             self.write_data()
             return Result.of_success(f"成功将「{from_id}」的权限克隆到「{to_id}」")
         except:
             return Result.of_failure("克隆权限时出现错误")
+        finally:
+            self._invalidate_player(to_id)
 
     def get_player_info(self, user_id: str) -> Optional[dict]:
         """
@@ -221,11 +257,13 @@ class PermissionManager(JsonDataBase):
         try:
             if from_group not in self._group_permission._stored_data.keys():
                 return Result.of_failure(f"权限组「{from_group}」不存在")
-            self._group_permission._stored_data[to_group] = self._group_permission._stored_data[from_group]
+            self._group_permission._stored_data[to_group] = deepcopy(self._group_permission._stored_data[from_group])
             self._group_permission.write_data()
             return Result.of_success(f"成功将权限组「{from_group}」的权限克隆到「{from_group}」")
         except:
             return Result.of_failure("克隆权限时出现错误")
+        finally:
+            self._invalidate_group(to_group)
 
     @property
     def permission_node(self) -> str:
@@ -236,6 +274,7 @@ class PermissionManager(JsonDataBase):
         """
         return self._permission_node_list
 
+    @group_mutation
     def add_group_permission(self, group_name: str, permission: str) -> Result:
         """
         向权限组内添加权限\n
@@ -265,6 +304,7 @@ class PermissionManager(JsonDataBase):
         except:
             return Result.of_failure(f"向权限组「{group_name}」添加权限「{permission}」失败")
 
+    @group_mutation
     def remove_group_permission(self, group_name: str, permission: str) -> Result:
         """
         从权限组内移除权限\n
@@ -303,11 +343,11 @@ class PermissionManager(JsonDataBase):
         try:
             if f"-{permission}" in self._group_permission._stored_data[group_name]["permission"]:
                 return Result.of_failure()
-            data = self.get_group_permission(group_name)
-            return Result(self._check_permission(data, permission))
+            return Result(self._check_permission(self._compile_group(group_name), permission))
         except:
             return Result.of_failure()
 
+    @group_mutation
     def add_group_parent(self, group_name: str, parent_group: str) -> Result:
         """
         向某一权限组内添加父权限组\n
@@ -335,6 +375,7 @@ class PermissionManager(JsonDataBase):
         finally:
             self._group_permission.write_data()
 
+    @group_mutation
     def remove_group_parent(self, group_name: str, parent_group: str) -> Result:
         """
         从某一权限组内移除父权限组\n
@@ -357,6 +398,7 @@ class PermissionManager(JsonDataBase):
         except:
             return Result.of_failure(f"移除权限组「{group_name}」父权限组「{parent_group}」失败")
 
+    @player_mutation
     def add_player_parent(self, user_id: str, parent_group: str) -> Result:
         """
         为玩家添加继承权限组\n
@@ -384,6 +426,7 @@ class PermissionManager(JsonDataBase):
         finally:
             self.write_data()
 
+    @player_mutation
     def remove_player_parent(self, user_id: str, parent_group: str) -> Result:
         """
         移除玩家继承的权限组\n
@@ -406,6 +449,7 @@ class PermissionManager(JsonDataBase):
         except:
             return Result.of_failure(f"移除用户「{user_id}」权限组「{parent_group}」失败")
 
+    @group_mutation
     def del_group(self, group_name: str) -> Result:
         """
         删除权限组\n
@@ -423,6 +467,7 @@ class PermissionManager(JsonDataBase):
         except:
             return Result.of_failure(f"删除权限组「{group_name}」失败")
 
+    @player_mutation
     def del_player(self, user_id: str) -> Result:
         """
         删除某一玩家\n
@@ -440,6 +485,7 @@ class PermissionManager(JsonDataBase):
         except:
             return Result.of_failure(f"删除用户「{user_id}」失败")
 
+    @player_mutation
     def set_player_parent(self, user_id: str, group_name: Union[str, list] = None) -> Result:
         """
         为某一玩家设置权限组\n
@@ -465,6 +511,7 @@ class PermissionManager(JsonDataBase):
         except:
             return Result.of_failure(f"设置「{user_id}」的权限组失败")
 
+    @group_mutation
     def create_group(self, group_name: str, group: str = None) -> Result:
         """
         创建权限组\n
@@ -499,35 +546,115 @@ class PermissionManager(JsonDataBase):
             "permission": []
         }
         self.write_data()
+        self._invalidate_player(user_id)
         return Result.of_success(f"用户「{user_id}」添加成功")
 
-    @staticmethod
-    def _check_permission(data: list, permission: Tree | str) -> bool:
-        check_list: List[Tree] = []
-        Root.instance.search(permission, check_list)
-        check_list.reverse()
-        for i in check_list:
-            if f"-{i.root}" in data:
+    def _check_permission(self, data: frozenset[str], permission: Tree | str) -> bool:
+        """
+        沿权限节点到根节点的路径检查权限，越靠近目标节点的设置优先级越高\n
+        Args:
+            data: 编译后的有效权限集合
+            permission: 权限节点
+        Returns:
+            拥有True 未拥有False
+        """
+        for node in self._get_node_path(permission):
+            if f"-{node}" in data:
                 return False
-            if i.root in data:
+            if node in data:
                 return True
+        return False
 
-    def _get_group_permission(self, group_name: Union[list, str]) -> list:
+    def _get_node_path(self, permission: Tree | str) -> tuple[str, ...]:
         """
-        获取权限组的所有权限（包括继承的权限组）\n
+        获取从权限节点到根节点的路径，结果会被缓存\n
+        Args:
+            permission: 权限节点
+        Returns:
+            路径上的节点名，从目标节点开始
+        """
+        key = permission.root if isinstance(permission, Tree) else permission
+        if key not in self._node_path:
+            check_list: list[Tree] = []
+            Root.instance.search(permission, check_list)
+            self._node_path[key] = tuple(node.root for node in reversed(check_list))
+        return self._node_path[key]
+
+    def _get_group_closure(self, group_name: Union[list, str]) -> list[str]:
+        """
+        获取权限组及其所有祖先权限组的组名（包括尚不存在的组名）\n
         Args:
             group_name: 要查询的组名，可以单个也可以用列表
         Returns:
-            返回权限节点列表
+            返回权限组名列表
+        """
+        stack: list[str] = [group_name] if isinstance(group_name, str) else list(group_name)
+        result: list[str] = []
+        visited: set[str] = set()
+        while stack:
+            name = stack.pop()
+            if name in visited:
+                continue
+            visited.add(name)
+            result.append(name)
+            stack.extend(self._group_permission._stored_data.get(name, {}).get("parent", []))
+        return result
+
+    def _collect_permission(self, group_names: list[str]) -> set[str]:
+        result: set[str] = set()
+        for name in group_names:
+            if name in self._group_permission._stored_data:
+                result.update(self._group_permission._stored_data[name].get("permission", []))
+        return result
+
+    def _compile_group(self, group_name: str) -> frozenset[str]:
         """
+        编译权限组的有效权限集合（包括继承的权限组）\n
+        Args:
+            group_name: 权限组名
+        Returns:
+            有效权限集合
+        """
+        if group_name in self._group_cache:
+            return self._group_cache[group_name]
+        closure = self._get_group_closure(group_name)
+        result = frozenset(self._collect_permission(closure))
+        for name in closure:
+            self._group_dependents.setdefault(name, set()).add(group_name)
+        self._group_cache[group_name] = result
+        return result
+
+    def _compile_player(self, user_id: str) -> frozenset[str]:
+        """
+        编译玩家的有效权限集合（包括所属权限组的权限）\n
+        Args:
+            user_id: 玩家id
+        Returns:
+            有效权限集合
+        """
+        if user_id in self._player_cache:
+            return self._player_cache[user_id]
+        closure = self._get_group_closure(self._stored_data[user_id].get("group", []))
+        result = self._collect_permission(closure)
+        result.update(self._stored_data[user_id].get("permission", []))
+        for name in closure:
+            self._group_players.setdefault(name, set()).add(user_id)
+        self._player_cache[user_id] = frozenset(result)
+        return self._player_cache[user_id]
+
+    def _invalidate_player(self, user_id: str) -> None:
+        self._player_cache.pop(user_id, None)
+
+    def _invalidate_group(self, group_name: str) -> None:
+        affected = self._group_dependents.pop(group_name, set())
+        affected.add(group_name)
+        for name in affected:
+            self._group_cache.pop(name, None)
+            for user_id in self._group_players.pop(name, set()):
+                self._player_cache.pop(user_id, None)
 
-        result = []
-        name: str
-        if not isinstance(group_name, list):
-            group_name = [group_name]
-        for name in group_name:
-            if name in self._group_permission._stored_data.keys():
-                if "parent" in self._group_permission._stored_data[name].keys():
-                    result += self._get_group_permission(self._group_permission._stored_data[name]["parent"])
-                result += self._group_permission._stored_data[name]["permission"]
-        return list(set(result))
+    def _clear_cache(self) -> None:
+        self._player_cache.clear()
+        self._group_cache.clear()
+        self._group_dependents.clear()
+        self._group_players.clear()
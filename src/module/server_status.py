@@ -1,14 +1,32 @@
+from asyncio import Task, create_task, gather, shield, wait_for
 from re import sub
-from typing import Optional
+from time import monotonic
+from typing import Optional, Union
 
 from mcstatus import JavaServer
+from mcstatus.status_response import JavaStatusResponse
 
+from src.base.config import sys_config
 from src.base.logger import logger
+from src.base.scheduler import scheduler
 from src.database.server_model import ServerList
+from src.scheduler.trigger import IntervalTrigger
+
+StatusResult = Union[JavaStatusResponse, Exception]
 
 
 class ServerStatus:
+    """
+    服务器状态查询
+
+    查询结果会按服务器地址缓存 cache_ttl 秒，过期后的 stale_ttl 秒内仍会直接返回旧结果并在后台刷新，
+    查询失败的结果只缓存 error_ttl 秒，且过期后不会再返回；
+    同一地址同时只会有一个查询，其他请求共享该查询的结果；后台任务会定期刷新所有已启用的服务器
+    """
     _server: Optional[dict] = None
+    # 服务器地址 -> (查询时间, 查询结果)
+    _cache: dict[str, tuple[float, StatusResult]] = {}
+    _inflight: dict[str, Task] = {}
 
     @classmethod
     def reload_server_list(cls) -> None:
@@ -20,10 +38,110 @@ class ServerStatus:
                 ServerList.select().where(ServerList.enable == 1).order_by(ServerList.priority.desc())}
 
     @staticmethod
-    def check_ip(ip: str) -> str:
+    async def _fetch_status(ip: str) -> JavaStatusResponse:
+        server = await JavaServer.async_lookup(ip, sys_config.server_status.timeout)
+        return await server.async_status()
+
+    @classmethod
+    async def fetch_status(cls, ip: str) -> JavaStatusResponse:
+        """
+        异步获取服务器状态，查询超过超时时间会抛出TimeoutError
+        Args:
+            ip: 服务器地址
+        Returns:
+            服务器状态
+        """
+        return await wait_for(cls._fetch_status(ip), sys_config.server_status.timeout)
+
+    @classmethod
+    async def _update_cache(cls, ip: str) -> StatusResult:
         try:
-            server = JavaServer.lookup(ip)
-            server_status = server.status()
+            status = await cls.fetch_status(ip)
+        except Exception as error:
+            # 不保留调用栈，避免缓存引用查询时的栈帧
+            status = error.with_traceback(None)
+        cls._cache[ip] = (monotonic(), status)
+        return status
+
+    @classmethod
+    def _refresh(cls, ip: str) -> Task:
+        """
+        刷新某一地址的缓存，如果该地址已经在查询中则复用该查询
+        """
+        task = cls._inflight.get(ip)
+        if task is None:
+            task = create_task(cls._update_cache(ip))
+            cls._inflight[ip] = task
+            task.add_done_callback(lambda _: cls._inflight.pop(ip, None))
+        return task
+
+    @staticmethod
+    def _raise_cached(error: Exception) -> None:
+        """
+        每次抛出新的异常，缓存中的异常对象不会被重复抛出而累积调用栈
+        """
+        try:
+            new_error = type(error)(*error.args)
+        except Exception:
+            new_error = ConnectionError(repr(error))
+        raise new_error from error
+
+    @classmethod
+    async def get_status(cls, ip: str) -> JavaStatusResponse:
+        """
+        获取服务器状态，优先使用缓存，查询失败时抛出对应的异常
+        Args:
+            ip: 服务器地址
+        Returns:
+            服务器状态
+        """
+        entry = cls._cache.get(ip)
+        if entry is not None:
+            fetched_at, status = entry
+            age = monotonic() - fetched_at
+            if isinstance(status, Exception):
+                if age >= sys_config.server_status.error_ttl:
+                    entry = None
+            elif age >= sys_config.server_status.cache_ttl:
+                if age >= sys_config.server_status.cache_ttl + sys_config.server_status.stale_ttl:
+                    entry = None
+                else:
+                    cls._refresh(ip)
+        if entry is None:
+            status = await shield(cls._refresh(ip))
+        if isinstance(status, Exception):
+            cls._raise_cached(status)
+        return status
+
+    @classmethod
+    async def collect_status(cls, servers: dict[str, str]) -> dict[str, Union[JavaStatusResponse, BaseException]]:
+        """
+        并发查询多个服务器的状态，每个服务器单独计算超时，查询失败的服务器返回对应的异常
+        Args:
+            servers: 服务器名 -> 服务器地址
+        Returns:
+            服务器名 -> 服务器状态或异常，查询被取消时为CancelledError
+        """
+        results = await gather(*(cls.get_status(ip) for ip in servers.values()), return_exceptions=True)
+        return dict(zip(servers.keys(), results))
+
+    @classmethod
+    async def refresh_all(cls) -> None:
+        """
+        刷新所有已启用服务器的状态，并清除已完全过期的缓存
+        """
+        if cls._server is None:
+            cls.reload_server_list()
+        expire = sys_config.server_status.cache_ttl + sys_config.server_status.stale_ttl
+        now = monotonic()
+        for ip in [ip for ip, (fetched_at, _) in cls._cache.items() if now - fetched_at >= expire]:
+            del cls._cache[ip]
+        await gather(*(cls._refresh(ip) for ip in cls._server.values()))
+
+    @classmethod
+    async def check_ip(cls, ip: str) -> str:
+        try:
+            server_status = await cls.get_status(ip)
             players = server_status.players
             version = server_status.version
             return (f"Server Version: {version.name}\n"
@@ -38,29 +156,39 @@ class ServerStatus:
             return f"Can't connect to server: {ip}"
 
     @classmethod
-    def get_online_player(cls, full: bool = False) -> str:
+    async def get_online_player(cls, full: bool = False) -> str:
         if cls._server is None:
             cls.reload_server_list()
         output_message = ["[服务器状态]", "", "在线玩家列表: "]
         player_max = 0
         player_online = 0
-        for server_name in cls._server:
-            try:
-                server_status = JavaServer.lookup(cls._server[server_name]).status()
-                player_max += server_status.players.max
-                player_online += server_status.players.online
-                message = f"{server_name}({server_status.players.online}): "
-                if server_status.players.sample:
-                    if full:
-                        message += f"{','.join([player.name for player in server_status.players.sample])}"
-                    else:
-                        message += (f"{','.join([player.name for player in server_status.players.sample[:10]])}"
-                                    f"{' ... ' if len(server_status.players.sample) > 10 else ''}")
-                output_message.append(message)
-            except Exception as error:
+        for server_name, server_status in (await cls.collect_status(cls._server)).items():
+            if isinstance(server_status, TimeoutError):
+                logger.error(f"Check server timeout: {server_name}")
+                output_message.append(f"{server_name}(0): 服务器连接超时")
+                continue
+            # CancelledError不是Exception的子类
+            if isinstance(server_status, BaseException):
                 logger.error(f"Can't check server: {server_name}")
-                logger.error(error)
+                logger.error(server_status)
                 output_message.append(f"{server_name}(0): 服务器连接失败")
+                continue
+            player_max += server_status.players.max
+            player_online += server_status.players.online
+            message = f"{server_name}({server_status.players.online}): "
+            if server_status.players.sample:
+                if full:
+                    message += f"{','.join([player.name for player in server_status.players.sample])}"
+                else:
+                    message += (f"{','.join([player.name for player in server_status.players.sample[:10]])}"
+                                f"{' ... ' if len(server_status.players.sample) > 10 else ''}")
+            output_message.append(message)
 
         output_message[1] = f"在线人数: {player_online}/{player_max}"
         return "\n".join(output_message)
+
+
+if sys_config.server_status.refresh_interval > 0:
+    scheduler.add_job(ServerStatus.refresh_all,
+                      IntervalTrigger(sys_config.server_status.refresh_interval, run_immediately=True),
+                      name="server_status_refresh")
@@ -0,0 +1,214 @@
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from time import monotonic
+from typing import Optional
+
+from peewee import IntegrityError
+
+from src.base.config import sys_config
+from src.base.event_bus import event_bus
+from src.base.logger import logger
+from src.base.scheduler import scheduler
+from src.bus.event.event import ServerEvent
+from src.database.user_model import User
+from src.element.message import Message
+from src.scheduler.trigger import IntervalTrigger
+
+
+class UserCache:
+    """
+    用户信息的LRU缓存
+
+    最近出现过的用户保存在内存中，缓存数量超过 max_size 时淘汰最久未使用的用户；
+    查询不到的用户会在 negative_ttl 秒内缓存为不存在，避免重复查询。
+    处罚相关字段的修改先写入缓存并标记为脏数据，由定时任务批量写回数据库，被淘汰的脏数据会立即写回
+
+    缓存可能在线程池中被访问，锁只保护缓存本身，数据库读写都在锁外进行
+    """
+    # user_id -> User，值为过期时间(monotonic)时表示用户不存在
+    _cache: OrderedDict[str, User | float] = OrderedDict()
+    _dirty: dict[str, User] = {}
+    _lock: Lock = Lock()
+    _hits: int = 0
+    _misses: int = 0
+    _write_backs: int = 0
+
+    @classmethod
+    def _put(cls, user_id: str, value: User | float) -> tuple[User | float, list[User]]:
+        """
+        写入缓存，其他线程已经缓存了该用户时保留已有的用户，需要在锁内调用
+        Returns:
+            (缓存中的值, 被淘汰的脏数据)，被淘汰的脏数据需要在锁外写回
+        """
+        if isinstance(current := cls._cache.get(user_id), User):
+            value = current
+        cls._cache[user_id] = value
+        cls._cache.move_to_end(user_id)
+        evicted: list[User] = []
+        while len(cls._cache) > sys_config.user_cache.max_size:
+            evicted_id, _ = cls._cache.popitem(last=False)
+            if (dirty := cls._dirty.pop(evicted_id, None)) is not None:
+                evicted.append(dirty)
+        return value, evicted
+
+    @classmethod
+    def _lookup(cls, user_id: str) -> tuple[bool, Optional[User]]:
+        """
+        Returns:
+            (是否命中缓存, 用户)，命中缓存且用户为None表示用户不存在
+        """
+        value = cls._cache.get(user_id)
+        if value is None:
+            return False, None
+        if isinstance(value, User):
+            cls._cache.move_to_end(user_id)
+            return True, value
+        if value > monotonic():
+            return True, None
+        del cls._cache[user_id]
+        return False, None
+
+    @classmethod
+    def get(cls, user_id: str) -> Optional[User]:
+        """
+        获取用户
+        Args:
+            user_id: 用户id
+        Returns:
+            用户不存在时返回None
+        """
+        with cls._lock:
+            hit, user = cls._lookup(user_id)
+            if hit:
+                cls._hits += 1
+                return user
+            cls._misses += 1
+        user = User.get_or_none(User.user_id == user_id)
+        with cls._lock:
+            value, evicted = cls._put(user_id, user if user is not None
+                                      else monotonic() + sys_config.user_cache.negative_ttl)
+        cls._write_back(evicted)
+        return value if isinstance(value, User) else None
+
+    @classmethod
+    def get_or_create(cls, message: Message) -> User:
+        """
+        获取消息发送者，不存在时创建
+        Args:
+            message: 消息
+        Returns:
+            消息发送者
+        """
+        user_id = message.sender_id
+        with cls._lock:
+            hit, user = cls._lookup(user_id)
+            if hit and user is not None:
+                cls._hits += 1
+                return user
+            cls._misses += 1
+        try:
+            # 缓存为不存在时可以直接创建，无需再查询一次
+            if hit:
+                user = User.create(user_id=user_id, user_name=message.sender_name)
+            else:
+                user = User.get_or_create(message)
+        except IntegrityError:
+            # 其他线程同时创建了该用户
+            user = User.get(User.user_id == user_id)
+        with cls._lock:
+            value, evicted = cls._put(user_id, user)
+        cls._write_back(evicted)
+        return value
+
+    @classmethod
+    def update_punishment(cls, user: User, *, punish_level: Optional[int] = None,
+                          under_punishment: Optional[bool] = None,
+                          punishment_end_date: Optional[datetime] = None) -> None:
+        """
+        修改用户的处罚信息，修改会在下一次写回时保存到数据库
+        Args:
+            user: 要修改的用户
+            punish_level: 累积处罚等级
+            under_punishment: 是否处于处罚中
+            punishment_end_date: 处罚结束时间
+        """
+        with cls._lock:
+            if punish_level is not None:
+                user.punish_level = punish_level
+            if under_punishment is not None:
+                user.under_punishment = under_punishment
+                if not under_punishment:
+                    user.punishment_end_date = None
+            if punishment_end_date is not None:
+                user.punishment_end_date = punishment_end_date
+            cls._dirty[user.user_id] = user
+            _, evicted = cls._put(user.user_id, user)
+        cls._write_back(evicted)
+
+    @classmethod
+    def _write_back(cls, users: list[User]) -> None:
+        """
+        在锁外将用户写回数据库，写回失败的用户会重新标记为脏数据
+        """
+        for index, user in enumerate(users):
+            try:
+                user.save(only=[User.punish_level, User.under_punishment, User.punishment_end_date])
+            except Exception as e:
+                logger.error(f"Failed to write back {len(users) - index} users: {e}")
+                with cls._lock:
+                    for failed in users[index:]:
+                        cls._dirty.setdefault(failed.user_id, failed)
+                return
+            with cls._lock:
+                cls._write_backs += 1
+
+    @classmethod
+    def flush(cls, *_, **__) -> None:
+        """
+        将所有脏数据写回数据库，写回失败的用户会在下一次写回时重试
+        """
+        with cls._lock:
+            if not cls._dirty:
+                return
+            users = list(cls._dirty.values())
+            cls._dirty.clear()
+        cls._write_back(users)
+        logger.trace(f"Wrote back {len(users)} users")
+
+    @classmethod
+    def invalidate(cls, user_id: Optional[str] = None) -> None:
+        """
+        使缓存失效，脏数据会先写回
+        Args:
+            user_id: 用户id，为None时清空全部缓存
+        """
+        cls.flush()
+        with cls._lock:
+            if user_id is None:
+                cls._cache.clear()
+            else:
+                cls._cache.pop(user_id, None)
+
+    @classmethod
+    def statistics(cls) -> dict[str, float]:
+        """
+        获取缓存的统计信息
+        Returns:
+            缓存数量、脏数据数量、命中次数、未命中次数、命中率以及写回次数
+        """
+        total = cls._hits + cls._misses
+        return {
+            "size": len(cls._cache),
+            "dirty": len(cls._dirty),
+            "hits": cls._hits,
+            "misses": cls._misses,
+            "hit_rate": cls._hits / total if total else 0,
+            "write_backs": cls._write_backs
+        }
+
+
+scheduler.add_job(UserCache.flush, IntervalTrigger(sys_config.user_cache.flush_interval),
+                  name="user_cache_flush", offload=True)
+# 必须在数据库连接关闭之前写回剩余的修改
+event_bus.subscribe(ServerEvent.STOPPING, UserCache.flush, weight=10)
@@ -0,0 +1,122 @@
+from asyncio import iscoroutinefunction, to_thread
+from datetime import datetime
+from threading import Condition
+from time import perf_counter
+from typing import Any, Callable, Optional
+
+from src.scheduler.trigger import Trigger
+
+
+class Job:
+    """
+    定时任务，记录任务的运行统计信息
+
+    :param func: 任务函数，可以是同步函数或协程函数，不接收参数
+    :param trigger: 触发器
+    :param name: 任务名称，同一调度器中唯一
+    :param jitter: 每次触发时随机延迟的最大秒数，用于错开同时触发的任务
+    :param allow_overlap: 上一次运行尚未结束时是否允许再次运行
+    :param offload: 同步任务是否在线程池中运行，不在线程池中运行的同步任务会阻塞事件循环
+    """
+
+    def __init__(self, func: Callable[[], Any], trigger: Trigger, name: str, *, jitter: float = 0,
+                 allow_overlap: bool = False, offload: bool = False) -> None:
+        self.func = func
+        self.trigger = trigger
+        self.name = name
+        self.jitter = jitter
+        self.allow_overlap = allow_overlap
+        self.offload = offload
+        self.running: int = 0
+        self.next_run: Optional[datetime] = None
+        self.last_run: Optional[datetime] = None
+        self.last_error: Optional[BaseException] = None
+        self.run_count: int = 0
+        self.error_count: int = 0
+        self.skipped_count: int = 0
+        self.last_duration: float = 0
+        self.max_duration: float = 0
+        self.total_duration: float = 0
+        self._is_coroutine = iscoroutinefunction(func)
+        # 正在线程池中运行的次数，关闭后尚未开始的运行会被跳过
+        self._offloaded: int = 0
+        self._closed: bool = False
+        self._condition = Condition()
+
+    def _call_offloaded(self) -> None:
+        with self._condition:
+            if self._closed:
+                return
+            self._offloaded += 1
+        try:
+            self.func()
+        finally:
+            with self._condition:
+                self._offloaded -= 1
+                self._condition.notify_all()
+
+    def open(self) -> None:
+        """
+        允许任务在线程池中运行
+        """
+        with self._condition:
+            self._closed = False
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        阻止尚未开始的运行进入线程池，并等待正在线程池中运行的任务结束
+
+        取消等待线程池的协程并不会中断已经开始运行的同步函数，因此需要在取消前等待
+
+        :param timeout: 最长等待的秒数，为None时一直等待
+        :return: 是否在超时前结束
+        """
+        with self._condition:
+            self._closed = True
+            return self._condition.wait_for(lambda: self._offloaded == 0, timeout)
+
+    async def run(self) -> None:
+        """
+        运行一次任务并记录耗时，异常会被记录后重新抛出
+        """
+        self.running += 1
+        self.last_run = datetime.now()
+        start = perf_counter()
+        try:
+            if self._is_coroutine:
+                await self.func()
+            elif self.offload:
+                await to_thread(self._call_offloaded)
+            else:
+                self.func()
+        except Exception as e:
+            self.error_count += 1
+            self.last_error = e
+            raise
+        finally:
+            duration = perf_counter() - start
+            self.running -= 1
+            self.run_count += 1
+            self.last_duration = duration
+            self.total_duration += duration
+            self.max_duration = max(self.max_duration, duration)
+
+    def statistics(self) -> dict[str, Any]:
+        """
+        获取任务的运行统计信息
+
+        :return: 运行次数、失败次数、跳过次数、耗时(ms)以及上次和下次运行时间
+        """
+        return {
+            "run_count": self.run_count,
+            "error_count": self.error_count,
+            "skipped_count": self.skipped_count,
+            "last_duration": self.last_duration * 1000,
+            "avg_duration": self.total_duration / self.run_count * 1000 if self.run_count else 0,
+            "max_duration": self.max_duration * 1000,
+            "last_run": self.last_run,
+            "next_run": self.next_run
+        }
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: {self.name} {self.trigger}>"
@@ -0,0 +1,166 @@
+from asyncio import Task, create_task, current_task, sleep
+from datetime import datetime
+from random import uniform
+from typing import Any, Callable, Optional
+
+from src.base.logger import logger
+from src.scheduler.job import Job
+from src.scheduler.trigger import Trigger
+
+
+class Scheduler:
+    """
+    运行在事件循环中的定时任务调度器
+
+    每个任务由一个独立的协程根据触发器等待下一次运行，任务本身在新的Task中执行，
+    因此耗时较长的任务不会推迟其他任务；默认情况下任务上一次运行尚未结束时会跳过本次运行
+
+    示例::
+
+        scheduler = Scheduler()
+
+        @scheduler.scheduled_job(IntervalTrigger(30), name="update")
+        async def update():
+            ...
+
+        scheduler.start()
+    """
+
+    def __init__(self) -> None:
+        self._jobs: dict[str, Job] = {}
+        self._job_tasks: dict[str, Task] = {}
+        self._running_tasks: set[Task] = set()
+        self._started: bool = False
+
+    def add_job(self, func: Callable[[], Any], trigger: Trigger, *, name: Optional[str] = None, jitter: float = 0,
+                allow_overlap: bool = False, offload: bool = False) -> Job:
+        """
+        添加定时任务，调度器已启动时任务会立即开始调度
+
+        参数详细信息请查看 :py:class:`Job`
+
+        :return: 创建的任务
+        """
+        if name is None:
+            name = func.__qualname__
+        if name in self._jobs:
+            raise ValueError(f"Job {name} already exists")
+        job = Job(func, trigger, name, jitter=jitter, allow_overlap=allow_overlap, offload=offload)
+        self._jobs[name] = job
+        if self._started:
+            self._schedule(job)
+        logger.debug(f"Job added: {job}")
+        return job
+
+    def scheduled_job(self, trigger: Trigger, **kwargs) -> Callable:
+        """
+        添加定时任务的修饰器，参数与 :py:func:`Scheduler.add_job` 相同
+        """
+
+        def decorator(func: Callable[[], Any]) -> Callable[[], Any]:
+            self.add_job(func, trigger, **kwargs)
+            return func
+
+        return decorator
+
+    def remove_job(self, name: str) -> bool:
+        """
+        移除定时任务，正在运行中的任务不会被中断
+
+        :param name: 任务名称
+        :return: 任务是否存在
+        """
+        if self._jobs.pop(name, None) is None:
+            return False
+        task = self._job_tasks.pop(name, None)
+        if task is not None:
+            task.cancel()
+        return True
+
+    def get_job(self, name: str) -> Optional[Job]:
+        return self._jobs.get(name)
+
+    @property
+    def jobs(self) -> list[Job]:
+        return list(self._jobs.values())
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    def _schedule(self, job: Job) -> None:
+        self._job_tasks[job.name] = create_task(self._job_loop(job))
+
+    async def _run_job(self, job: Job) -> None:
+        try:
+            await job.run()
+        except Exception as e:
+            logger.error(f"Job {job.name} raised an exception: {e!r}")
+
+    async def _job_loop(self, job: Job) -> None:
+        previous: Optional[datetime] = None
+        while True:
+            now = datetime.now()
+            fire_time = job.trigger.next_fire_time(previous, now)
+            if fire_time is None:
+                break
+            job.next_run = fire_time
+            delay = (fire_time - now).total_seconds()
+            if job.jitter > 0:
+                delay += uniform(0, job.jitter)
+            await sleep(max(delay, 0))
+            # 以计划时间而不是实际运行时间计算下一次触发，避免误差累积
+            previous = fire_time
+            if job.running and not job.allow_overlap:
+                job.skipped_count += 1
+                logger.warning(f"Job {job.name} is still running, skip this run")
+                continue
+            task = create_task(self._run_job(job))
+            self._running_tasks.add(task)
+            task.add_done_callback(self._running_tasks.discard)
+        job.next_run = None
+        if self._job_tasks.get(job.name) is current_task():
+            del self._job_tasks[job.name]
+
+    def start(self, *_, **__) -> None:
+        """
+        启动调度器，必须在事件循环中调用，重复调用不会产生影响
+        """
+        if self._started:
+            return
+        self._started = True
+        for job in self._jobs.values():
+            job.open()
+            self._schedule(job)
+        logger.debug(f"Scheduler started with {len(self._jobs)} jobs")
+
+    def shutdown(self, *_, timeout: float = 10, **__) -> None:
+        """
+        停止调度器并取消所有正在运行的任务
+
+        正在线程池中运行的同步任务无法被取消，会先等待其结束(最多timeout秒)，
+        避免任务在之后关闭数据库等资源时仍在运行
+
+        :param timeout: 等待每个线程池任务结束的最长秒数
+        """
+        if not self._started:
+            return
+        self._started = False
+        for job in self._jobs.values():
+            if not job.close(timeout):
+                logger.warning(f"Job {job.name} is still running in thread pool after {timeout}s")
+        for task in [*self._job_tasks.values(), *self._running_tasks]:
+            task.cancel()
+        self._job_tasks.clear()
+        self._running_tasks.clear()
+        for job in self._jobs.values():
+            job.next_run = None
+        logger.debug("Scheduler stopped")
+
+    def statistics(self) -> dict[str, dict[str, Any]]:
+        """
+        获取所有任务的运行统计信息
+
+        :return: 任务名称 -> 统计信息
+        """
+        return {name: job.statistics() for name, job in self._jobs.items()}
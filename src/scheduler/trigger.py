@@ -0,0 +1,154 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+class Trigger(ABC):
+    """
+    触发器基类，决定任务下一次运行的时间
+    """
+
+    @abstractmethod
+    def next_fire_time(self, previous: Optional[datetime], now: datetime) -> Optional[datetime]:
+        """
+        计算下一次触发时间
+
+        :param previous: 上一次触发时间，首次计算时为None
+        :param now: 当前时间
+        :return: 下一次触发时间，返回None表示任务不再运行
+        """
+
+
+class IntervalTrigger(Trigger):
+    """
+    按固定间隔触发
+
+    :param seconds: 触发间隔(秒)
+    :param run_immediately: 是否在调度器启动时立即运行一次
+    """
+
+    def __init__(self, seconds: float, run_immediately: bool = False) -> None:
+        if seconds <= 0:
+            raise ValueError("触发间隔必须大于0")
+        self._interval = timedelta(seconds=seconds)
+        self._run_immediately = run_immediately
+
+    def next_fire_time(self, previous: Optional[datetime], now: datetime) -> Optional[datetime]:
+        if previous is None:
+            return now if self._run_immediately else now + self._interval
+        next_time = previous + self._interval
+        # 错过的触发直接跳过，不进行补偿
+        if next_time < now:
+            missed = (now - next_time) // self._interval + 1
+            next_time += self._interval * missed
+        return next_time
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: {self._interval.total_seconds()}s>"
+
+
+class OnceTrigger(Trigger):
+    """
+    只触发一次
+
+    :param delay: 调度器启动后延迟多少秒触发
+    """
+
+    def __init__(self, delay: float = 0) -> None:
+        self._delay = timedelta(seconds=delay)
+
+    def next_fire_time(self, previous: Optional[datetime], now: datetime) -> Optional[datetime]:
+        if previous is not None:
+            return None
+        return now + self._delay
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: +{self._delay.total_seconds()}s>"
+
+
+class CronTrigger(Trigger):
+    """
+    cron风格的触发器，精确到分钟
+
+    表达式由空格分隔的5个字段组成: 分 时 日 月 周，
+    每个字段支持 ``*``、``a``、``a-b``、``*/n``、``a-b/n`` 以及用逗号分隔的组合，
+    周字段中0和7都表示周日
+
+    示例::
+
+        CronTrigger("*/5 * * * *")  # 每5分钟
+        CronTrigger("0 4 * * 1")  # 每周一4:00
+
+    :param expression: cron表达式
+    """
+    _ranges: tuple[tuple[int, int], ...] = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str) -> None:
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron表达式必须包含5个字段: {expression}")
+        self._expression = expression
+        minute, hour, day, month, weekday = (self._parse_field(field, *bounds)
+                                             for field, bounds in zip(fields, self._ranges))
+        self._minute = minute
+        self._hour = hour
+        self._day = day
+        self._month = month
+        self._weekday = {0 if item == 7 else item for item in weekday}
+        # 与cron一致，日和周同时被限制时满足其一即可
+        self._day_restricted = fields[2] != "*"
+        self._weekday_restricted = fields[4] != "*"
+
+    @staticmethod
+    def _parse_field(field: str, minimum: int, maximum: int) -> frozenset[int]:
+        values: set[int] = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"步长必须大于0: {field}")
+            if part == "*":
+                start, end = minimum, maximum
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(part)
+                end = maximum if step != 1 else start
+            if start < minimum or end > maximum or start > end:
+                raise ValueError(f"字段超出范围[{minimum}, {maximum}]: {field}")
+            values.update(range(start, end + 1, step))
+        return frozenset(values)
+
+    def _match_day(self, time: datetime) -> bool:
+        day_match = time.day in self._day
+        weekday_match = (time.weekday() + 1) % 7 in self._weekday
+        if self._day_restricted and self._weekday_restricted:
+            return day_match or weekday_match
+        return day_match and weekday_match
+
+    def next_fire_time(self, previous: Optional[datetime], now: datetime) -> Optional[datetime]:
+        time = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # 最多向后查找约5年，防止如2月30日这类永远不会触发的表达式造成死循环
+        limit = time + timedelta(days=366 * 5)
+        while time < limit:
+            if time.month not in self._month:
+                year, month = divmod(time.month, 12)
+                time = time.replace(year=time.year + year, month=month + 1, day=1, hour=0, minute=0)
+                continue
+            if not self._match_day(time):
+                time = time.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if time.hour not in self._hour:
+                time = time.replace(minute=0) + timedelta(hours=1)
+                continue
+            if time.minute not in self._minute:
+                time += timedelta(minutes=1)
+                continue
+            return time
+        return None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: {self._expression}>"
@@ -2,6 +2,89 @@ class SysConfig:
     class Mcsm:
         enable: bool
         use_database: bool
+        request_timeout: float = 10
+        connect_timeout: float = 5
+        connection_limit: int = 10
+        keepalive_timeout: float = 30
+
+        def __init__(self, data: dict):
+            self.__dict__ = data
+
+    class MessageRecord:
+        batch_size: int = 100
+        flush_interval: float = 5
+        max_queue_size: int = 10000
+
+        def __init__(self, data: dict):
+            self.__dict__ = data
+
+    class ServerStatus:
+        timeout: float = 3
+        cache_ttl: float = 30
+        stale_ttl: float = 60
+        error_ttl: float = 5
+        refresh_interval: float = 20
+
+        def __init__(self, data: dict):
+            self.__dict__ = data
+
+    class JsonDatabase:
+        write_delay: float = 1
+        backend: str = "snapshot"
+        journal_compact_threshold: int = 1000
+
+        def __init__(self, data: dict):
+            self.__dict__ = data
+
+    class UserCache:
+        max_size: int = 1024
+        negative_ttl: float = 60
+        flush_interval: float = 10
+
+        def __init__(self, data: dict):
+            self.__dict__ = data
+
+    class LoopMonitor:
+        enable: bool = True
+        interval: float = 0.5
+        threshold: float = 0.2
+        max_records: int = 20
+
+        def __init__(self, data: dict):
+            self.__dict__ = data
+
+    class GuildCache:
+        ttl: float = 600
+
+        def __init__(self, data: dict):
+            self.__dict__ = data
+
+    class OutboundQueue:
+        enable: bool = True
+        rate: float = 1
+        burst: float = 5
+        coalesce: bool = True
+        coalesce_item_length: int = 100
+        coalesce_max_length: int = 500
+        flush_timeout: float = 5
+
+        def __init__(self, data: dict):
+            self.__dict__ = data
+
+    class RateLimit:
+        enable: bool = True
+        user_rate: float = 0.2
+        user_burst: float = 5
+        group_rate: float = 1
+        group_burst: float = 10
+        prune_interval: float = 60
+
+        def __init__(self, data: dict):
+            self.__dict__ = data
+
+    class CommandCache:
+        enable: bool = True
+        prune_interval: float = 60
 
         def __init__(self, data: dict):
             self.__dict__ = data
@@ -9,7 +92,25 @@ class SysConfig:
     log_level: str
     dev: bool
     mcsm: Mcsm | dict
+    message_record: MessageRecord | dict
+    server_status: ServerStatus | dict
+    json_database: JsonDatabase | dict
+    user_cache: UserCache | dict
+    loop_monitor: LoopMonitor | dict
+    guild_cache: GuildCache | dict
+    outbound_queue: OutboundQueue | dict
+    rate_limit: RateLimit | dict
+    command_cache: CommandCache | dict
 
     def __init__(self, data: dict):
         self.__dict__ = data
         self.mcsm = self.Mcsm(self.mcsm)
+        self.message_record = self.MessageRecord(data.get("message_record", {}))
+        self.server_status = self.ServerStatus(data.get("server_status", {}))
+        self.json_database = self.JsonDatabase(data.get("json_database", {}))
+        self.user_cache = self.UserCache(data.get("user_cache", {}))
+        self.loop_monitor = self.LoopMonitor(data.get("loop_monitor", {}))
+        self.guild_cache = self.GuildCache(data.get("guild_cache", {}))
+        self.outbound_queue = self.OutboundQueue(data.get("outbound_queue", {}))
+        self.rate_limit = self.RateLimit(data.get("rate_limit", {}))
+        self.command_cache = self.CommandCache(data.get("command_cache", {}))
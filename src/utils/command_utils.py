@@ -1,3 +1,4 @@
+from re import DOTALL, Match, Pattern, compile
 from typing import Optional, Union
 
 from src.element.message import Message
@@ -8,7 +9,91 @@ def is_command(command: str) -> bool:
     return command.startswith("/")
 
 
-def command_split(command: Union[Message, str]) -> Optional[list[str]]:
+class CommandTokens(list[str]):
+    """
+    命令分词结果，可以当作list[str]使用
+
+    spans记录了每个参数在原始命令中的位置(包含引号和转义符)，
+    source[spans[i][0]:spans[i][1]] 即为第i个参数的原始文本，只在第一次访问时计算
+    """
+    __slots__ = ("source", "start", "_spans")
+
+    def __init__(self, tokens: list[str], source: str, start: int = 1) -> None:
+        super().__init__(tokens)
+        self.source = source
+        self.start = start
+        self._spans: Optional[list[tuple[int, int]]] = None
+
+    @property
+    def spans(self) -> list[tuple[int, int]]:
+        if self._spans is None:
+            self._spans = [match.span() for match in _TOKEN.finditer(self.source, self.start)
+                           if _EMPTY_QUOTE.fullmatch(match.group()) is None]
+        return self._spans
+
+    def rest(self, index: int) -> str:
+        """
+        获取从第index个参数开始的原始文本，保留其中的空白、引号和转义符
+        Args:
+            index: 参数下标
+        Returns:
+            原始文本，下标超出范围时返回空字符串
+        """
+        if index >= len(self):
+            return ""
+        return self.source[self.spans[index][0]:]
+
+
+# 一个参数由连续的引号字符串、转义字符和普通字符组成，全部使用占有量词避免回溯
+_TOKEN: Pattern = compile(r"""(?:"(?:[^"\\]|\\.)*+"|'(?:[^'\\]|\\.)*+'|\\.|\\$|[^\s"'\\]++)++""", DOTALL)
+_PIECE: Pattern = compile(r""""((?:[^"\\]|\\.)*+)"|'((?:[^'\\]|\\.)*+)'|\\(.)|\\$""", DOTALL)
+_ESCAPE: Pattern = compile(r"\\(.)", DOTALL)
+_EMPTY_QUOTE: Pattern = compile(r"""(?:""|'')+""")
+# 不含转义且每个参数要么整体被引号包裹要么不含引号时，可以直接用分组取出参数内容
+_SIMPLE: Pattern = compile(r"""(?:\s*+(?:"[^"\\]*+"|'[^'\\]*+'|[^\s"'\\]++)(?=\s|$))*+\s*+""")
+_SIMPLE_TOKEN: Pattern = compile(r"""\s*+(?:"([^"\\]*+)"|'([^'\\]*+)'|([^\s"'\\]++))""")
+
+
+def _unquote(match: Match) -> str:
+    double, single, escaped = match.groups()
+    if escaped is not None:
+        return escaped
+    quoted = double if double is not None else single
+    if quoted is None:
+        # 末尾单独的反斜杠
+        return "\\"
+    return _ESCAPE.sub(r"\1", quoted) if "\\" in quoted else quoted
+
+
+def tokenize(message: str, start: int = 1) -> CommandTokens:
+    """
+    将命令按空白分割为参数
+
+    支持单引号和双引号包裹含空白的参数，引号中可以包含另一种引号；
+    反斜杠会转义其后的任意字符，如 \\" 和 \\空格；
+    引号内容为空的参数会被忽略
+    Args:
+        message: 命令文本
+        start: 开始分割的位置，默认跳过命令开头的/
+    Returns:
+        分词结果
+    Raises:
+        QuotationUnmatchedError: 引号不匹配
+    """
+    if "\"" not in message and "'" not in message and "\\" not in message:
+        return CommandTokens(message[start:].split(), message, start)
+    if _SIMPLE.fullmatch(message, start) is not None:
+        tokens = [double or single or plain for double, single, plain in _SIMPLE_TOKEN.findall(message, start)]
+        return CommandTokens([token for token in tokens if token], message, start)
+    # 去掉所有参数后只能剩下空白，否则说明有未闭合的引号
+    remain = _TOKEN.sub("", message[start:])
+    if remain and not remain.isspace():
+        raise QuotationUnmatchedError
+    tokens = [_PIECE.sub(_unquote, token) for token in _TOKEN.findall(message, start)]
+    return CommandTokens([token for token in tokens if token], message, start)
+
+
+def command_split(command: Union[Message, str]) -> Optional[CommandTokens]:
     if isinstance(command, Message):
         if not command.is_command or command.message == "":
             return None
@@ -17,31 +102,4 @@ def command_split(command: Union[Message, str]) -> Optional[list[str]]:
         if not is_command(command) or command == "":
             return None
         message = command
-    res = []
-    msg = message[1:]
-    temp = ""
-    is_quoted = False
-    quote_char = None
-    for i in msg:
-        if i in ['"', "'"]:
-            if not is_quoted:
-                is_quoted = True
-                quote_char = i
-            elif quote_char == i:
-                is_quoted = False
-                quote_char = None
-            continue
-        if is_quoted:
-            temp += i
-        else:
-            if i.isspace():
-                if len(temp) != 0:
-                    res.append(temp)
-                    temp = ""
-            else:
-                temp += i
-    if is_quoted:
-        raise QuotationUnmatchedError
-    if temp != "":
-        res.append(temp)
-    return res
+    return tokenize(message)
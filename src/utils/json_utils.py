@@ -1,5 +1,6 @@
 from json import dumps as js_dumps, load as js_load
 from logging import getLogger
+from os import fsync, replace
 from typing import Optional, Union
 
 from json5 import dumps as js5_dumps, load as js5_load
@@ -29,13 +30,30 @@ def read_json(filename: str, *,
         return None
 
 
+def dump_json(filename: str, data: Union[dict, list]) -> str:
+    """
+    按文件后缀将数据序列化为json或json5文本
+    """
+    if filename.endswith(".json"):
+        return js_dumps(data, indent=4, ensure_ascii=False)
+    return js5_dumps(data, indent=4, ensure_ascii=False)
+
+
+def write_file_atomic(filename: str, content: str) -> None:
+    """
+    先写入临时文件再替换目标文件，写入过程中程序崩溃也不会留下损坏的文件
+    """
+    temp_file = f"{filename}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        f.write(content)
+        f.flush()
+        fsync(f.fileno())
+    replace(temp_file, filename)
+
+
 def write_json(filename: str, data: Union[dict, list]) -> None:
     try:
-        with open(filename, "w", encoding="utf-8") as f:
-            if filename.endswith(".json"):
-                f.write(js_dumps(data, indent=4, ensure_ascii=False))
-            else:
-                f.write(js5_dumps(data, indent=4, ensure_ascii=False))
+        write_file_atomic(filename, dump_json(filename, data))
     except Exception as e:
         logger.error(e)
         logger.error(f"{filename}已损坏,请检查")
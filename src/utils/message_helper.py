@@ -1,12 +1,14 @@
 from typing import List, Optional, Union, overload
 
-from satori import At, Element, Event, Guild, Quote
+from satori import At, Element, Event, Quote
 from satori.client import Account
 from satori.model import MessageReceipt
 
 from src.base.config import sys_config
 from src.base.logger import logger
 from src.element.message import Message
+from src.module.guild_cache import GuildCache
+from src.module.outbound_queue import OutboundPriority, OutboundQueue
 from src.type.types import MessageType
 
 
@@ -19,29 +21,55 @@ class MessageHelper:
 
     @classmethod
     @overload
-    async def send_message(cls, channel_id: str, message: str) -> List[MessageReceipt]:
+    async def send_message(cls, channel_id: str, message: str, *,
+                           priority: OutboundPriority = OutboundPriority.NORMAL,
+                           coalesce: Optional[bool] = None) -> List[MessageReceipt]:
         ...
 
     @classmethod
     @overload
-    async def send_message(cls, channel_id: str, message: list[str | Element]) -> List[MessageReceipt]:
+    async def send_message(cls, channel_id: str, message: list[str | Element], *,
+                           priority: OutboundPriority = OutboundPriority.NORMAL,
+                           coalesce: Optional[bool] = None) -> List[MessageReceipt]:
         ...
 
     @classmethod
     @overload
-    async def send_message(cls, channel_id: Event, message: str) -> List[MessageReceipt]:
+    async def send_message(cls, channel_id: Event, message: str, *,
+                           priority: OutboundPriority = OutboundPriority.NORMAL,
+                           coalesce: Optional[bool] = None) -> List[MessageReceipt]:
         ...
 
     @classmethod
     @overload
-    async def send_message(cls, channel_id: Event, message: list[str | Element]) -> List[MessageReceipt]:
+    async def send_message(cls, channel_id: Event, message: list[str | Element], *,
+                           priority: OutboundPriority = OutboundPriority.NORMAL,
+                           coalesce: Optional[bool] = None) -> List[MessageReceipt]:
         ...
 
     @classmethod
-    async def send_message(cls, channel_id: Union[str, Event],
-                           message: MessageType) -> list[MessageReceipt]:
+    async def send_message(cls, channel_id: Union[str, Event], message: MessageType, *,
+                           priority: OutboundPriority = OutboundPriority.NORMAL,
+                           coalesce: Optional[bool] = None) -> list[MessageReceipt]:
+        """
+        发送消息，启用发送队列时消息会先进入对应频道的队列
+        Args:
+            channel_id: 群号或收到的事件
+            message: 消息内容
+            priority: 发送优先级，同一频道中高优先级的消息先发送
+            coalesce: 是否允许与其他短消息合并发送，合并后共享同一个回执，需要使用回执时应当传入False
+        Returns:
+            消息回执
+        """
         if cls._account is None:
             raise ValueError("Account is not set")
+        if not sys_config.outbound_queue.enable:
+            return await cls._send_now(channel_id, message)
+        key = channel_id if isinstance(channel_id, str) else (channel_id.channel or channel_id.guild).id
+        return await OutboundQueue.send(key, channel_id, message, cls._send_now, priority, coalesce)
+
+    @classmethod
+    async def _send_now(cls, channel_id: Union[str, Event], message: MessageType) -> list[MessageReceipt]:
         if sys_config.dev:
             if isinstance(message, str):
                 message = f"{'-' * 5}Dev{'-' * 5}\n{message}"
@@ -49,10 +77,10 @@ class MessageHelper:
                 message = [f"{'-' * 5}Dev{'-' * 5}\n"] + message
         log_message = Message.parse(message)
         if isinstance(channel_id, str):
-            channel: Guild = await cls._account.guild_get(guild_id=channel_id)
-            logger.info(f'[消息]->{channel.name}({channel.id}): {log_message}')
+            logger.info(f'[消息]->{GuildCache.display_name(channel_id)}: {log_message}')
             return await cls._account.send_message(channel_id, message)
         if isinstance(channel_id, Event):
+            GuildCache.update_from_event(channel_id)
             logger.info(f'[消息]->{channel_id.guild.name}({channel_id.guild.id}): {log_message}')
             return await cls._account.send(channel_id, message)
 
@@ -78,8 +106,10 @@ class MessageHelper:
         #     logger.error(e)
 
     @classmethod
-    async def mute_member(cls, message: Message) -> None:
+    async def mute_member(cls, message: Message, duration: int = 60) -> None:
         try:
-            await cls._account.guild_member_mute(message.group_id, message.sender_id, 60)
+            await cls._account.guild_member_mute(message.group_id, message.sender_id, duration)
+            logger.info(f"[禁言]{GuildCache.display_name(message.group_id)}: "
+                        f"{GuildCache.member_name(message.group_id, message.sender_id)}")
         except Exception as e:
             logger.error(e)
@@ -1,15 +1,16 @@
-from asyncio import AbstractEventLoop, new_event_loop, run_coroutine_threadsafe
-from asyncio import Event as AsyncEvent
-from threading import Timer
+from asyncio import Future, Task, TimerHandle, create_task, get_running_loop
 from typing import Awaitable, Callable, Optional
 
 from satori import Event
 from satori.client import Account, App
 from typing_extensions import Any
 
+from src.base.logger import logger
 from src.element.message import Message
 from src.type.types import ReplyType
 
+ReplyKey = tuple[Optional[str], str]
+
 
 class Reply:
     def __init__(self, app: App, target_message: Message, callback: Callable[[ReplyType], Awaitable[Any]],
@@ -17,53 +18,114 @@ class Reply:
                  reject_checker: Optional[Callable[[str], bool]] = None):
         self._target_message: Message = target_message
         self._callback: Callable[[ReplyType], Awaitable[Any]] = callback
-        self._timer: Optional[Timer] = None
+        self._timer: Optional[TimerHandle] = None
         if timeout != -1:
             self._enable_timeout = True
             self._timeout = timeout
         else:
             self._enable_timeout = False
         self._app: App = app
-        self._loop: AbstractEventLoop = new_event_loop()
         self._accept_checker: Callable[[str], bool] = accept_checker if accept_checker else lambda msg: msg == "是"
         self._reject_checker: Callable[[str], bool] = reject_checker if reject_checker else lambda msg: msg == "否"
 
+    @property
+    def key(self) -> ReplyKey:
+        return self._target_message.group_id, self._target_message.sender_id
+
     def start(self) -> None:
         if self._enable_timeout:
-            self._timer = Timer(self._timeout, self.stop_timeout)
-            self._timer.start()
-        self._app.event_callbacks.append(self.handler)
+            self._timer = get_running_loop().call_later(self._timeout, self.stop_timeout)
+        ReplyMessageSender.add_reply(self)
 
     def stop_timeout(self) -> None:
-        run_coroutine_threadsafe(self._callback(ReplyType.TIMEOUT), self._loop)
         self.stop()
+        ReplyMessageSender.run_callback(self._callback(ReplyType.TIMEOUT))
 
     def stop(self) -> None:
-        if self._timer.is_alive():
+        if self._timer is not None:
             self._timer.cancel()
-        self._app.event_callbacks.remove(self.handler)
-
-    async def handler(self, account: Account, event: Event) -> None:
-        now_message: Message = Message(event)
-        if (now_message.sender_id == self._target_message.sender_id
-                and now_message.group_id == self._target_message.group_id):
-            if self._accept_checker(now_message.message):
-                await self._callback(ReplyType.ACCEPT)
-                self.stop()
-                return
-            if self._reject_checker(now_message.message):
-                await self._callback(ReplyType.REJECT)
-                self.stop()
-                return
-        return
+            self._timer = None
+        ReplyMessageSender.remove_reply(self)
+
+    async def handler(self, message: Message) -> bool:
+        """
+        处理同一群中同一用户发送的消息
+        Args:
+            message: 收到的消息
+        Returns:
+            消息是否被接受或拒绝
+        """
+        if self._accept_checker(message.message):
+            self.stop()
+            await self._callback(ReplyType.ACCEPT)
+            return True
+        if self._reject_checker(message.message):
+            self.stop()
+            await self._callback(ReplyType.REJECT)
+            return True
+        return False
 
 
 class ReplyMessageSender:
+    """
+    等待用户回复的调度器
+
+    所有等待中的回复按 (群号, 发送者) 建立索引，只向app注册一个事件处理函数，
+    每条消息只需要查找一次索引；超时使用事件循环的定时器实现
+    """
     _app: App
+    _pending: dict[ReplyKey, list[Reply]] = {}
+    _callback_tasks: set[Task] = set()
 
     @classmethod
     def set_app(cls, app: App):
         cls._app = app
+        app.event_callbacks.append(cls._dispatch)
+
+    @classmethod
+    def add_reply(cls, reply: Reply) -> None:
+        cls._pending.setdefault(reply.key, []).append(reply)
+
+    @classmethod
+    def remove_reply(cls, reply: Reply) -> None:
+        replies = cls._pending.get(reply.key)
+        if replies is None or reply not in replies:
+            return
+        replies.remove(reply)
+        if not replies:
+            del cls._pending[reply.key]
+
+    @classmethod
+    def run_callback(cls, coroutine: Awaitable[Any]) -> None:
+        """
+        在事件循环中执行回调函数，并保存任务的引用直到其完成
+        """
+        task = create_task(coroutine)
+        cls._callback_tasks.add(task)
+        task.add_done_callback(cls._callback_tasks.discard)
+
+    @classmethod
+    async def _dispatch(cls, _: Account, event: Event) -> None:
+        if not cls._pending:
+            return
+        message = Message.from_event(event)
+        replies = cls._pending.get((message.group_id, message.sender_id))
+        if replies is None:
+            return
+        # 处理过程中回复会将自身移出列表
+        for reply in replies.copy():
+            try:
+                await reply.handler(message)
+            except Exception as e:
+                logger.error(f"Reply callback raised an exception: {e!r}")
+
+    @classmethod
+    def pending_count(cls) -> int:
+        """
+        Returns:
+            等待中的回复数量
+        """
+        return sum(len(replies) for replies in cls._pending.values())
 
     @classmethod
     def create_reply(cls, target_message: Message, callback: Callable[[ReplyType], Awaitable[Any]],
@@ -76,17 +138,17 @@ class ReplyMessageSender:
     async def wait_reply_async(cls, target_message: Message, timeout: int,
                                accept_checker: Optional[Callable[[str], bool]] = None,
                                reject_checker: Optional[Callable[[str], bool]] = None) -> ReplyType:
-        res_event = AsyncEvent()
-        res: Optional[ReplyType] = None
+        future: Future[ReplyType] = get_running_loop().create_future()
 
         async def callback(reply_type: ReplyType) -> None:
-            nonlocal res_event, res
-            res_event.set()
-            res = reply_type
-
-        Reply(cls._app, target_message, callback, timeout,
-              accept_checker, reject_checker).start()
-
-        await res_event.wait()
-
-        return res
+            if not future.done():
+                future.set_result(reply_type)
+
+        reply = Reply(cls._app, target_message, callback, timeout,
+                      accept_checker, reject_checker)
+        reply.start()
+        try:
+            return await future
+        finally:
+            # 等待的协程被取消时不再保留回复
+            reply.stop()
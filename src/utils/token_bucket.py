@@ -0,0 +1,58 @@
+from asyncio import sleep
+from time import monotonic
+
+
+class TokenBucket:
+    """
+    令牌桶
+
+    :param rate: 每秒生成的令牌数
+    :param capacity: 令牌桶容量，即允许的突发数量
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = monotonic()
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """
+        获取距离下一个令牌可用的时间，不消耗令牌
+
+        :return: 需要等待的秒数，令牌可用时为0
+        """
+        self._refill()
+        return 0 if self._tokens >= 1 else (1 - self._tokens) / self._rate
+
+    def try_acquire(self) -> bool:
+        """
+        尝试获取一个令牌，不会等待
+
+        :return: 是否获取成功
+        """
+        self._refill()
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    async def acquire(self) -> None:
+        """
+        获取一个令牌，令牌不足时等待，只能有一个协程同时等待
+        """
+        while (wait := self.wait_time()) > 0:
+            await sleep(wait)
+        self._tokens -= 1
+
+    def is_full(self) -> bool:
+        """
+        令牌桶是否已满，已满的令牌桶与新建的令牌桶没有区别，可以被回收
+        """
+        self._refill()
+        return self._tokens >= self._capacity